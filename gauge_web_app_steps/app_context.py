@@ -15,6 +15,9 @@ from .config import local_config, saucelabs_config
 
 app_context_key = "_app_ctx"
 timeout_key = "_timeout"
+polling_key = "_polling"
+step_context_key = "_step_ctx"
+element_cache_key = "_element_cache"
 
 class AppContext:
     """
@@ -30,7 +33,9 @@ class AppContext:
         self._report_driver_options()
         spec : Specification = ctx.specification
         self.driver = self._create_driver(spec.name, suite_id)
-        self.image_path = ImagePath(config.get_browser().value, config.is_headless())
+        if config.is_css_pixel_screenshots():
+            self._override_device_scale_factor()
+        self.image_path = ImagePath(config.get_browser().value, config.is_headless(), spec.name)
         self.images = Images(self.report)
         self.diff_formats = config.get_diff_formats()
         self.mobile = config.get_operating_system().is_mobile()
@@ -40,6 +45,19 @@ class AppContext:
         driver_factory = DriverFactory.create_driver_factory(spec_name, suite_id)
         return driver_factory.create_driver()
 
+    def _override_device_scale_factor(self) -> None:
+        """Makes Chromium based browsers render one pixel per CSS pixel. Other drivers get their screenshots downsampled."""
+        # mobile browsers keep their device metrics
+        mobile = config.get_operating_system().is_mobile()
+        if config.get_browser().is_chromium() and not mobile and hasattr(self.driver, "execute_cdp_cmd"):
+            self.driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", {
+                "width": 0,  # 0 keeps the current size
+                "height": 0,
+                "deviceScaleFactor": 1,
+                "mobile": False,
+            })
+            self.report.log_debug("device scale factor is set to 1")
+
     def _report_driver_options(self) -> None:
         operating_system = config.get_operating_system()
         self.report.log(f"platform: {config.get_platform().value}")
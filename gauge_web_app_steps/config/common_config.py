@@ -48,6 +48,70 @@ def is_whole_page_screenshot() -> bool:
     return os.environ.get("screenshot_whole_page_no_scroll", "False").lower() in ("true", "1")
 
 
+def is_deferred_comparison() -> bool:
+    return os.environ.get("screenshot_deferred_comparison", "False").lower() in ("true", "1")
+
+
+def is_update_baselines() -> bool:
+    return os.environ.get("screenshot_update_baselines", "False").lower() in ("true", "1")
+
+
+def get_max_failed_pages(default=0) -> int:
+    return int(os.environ.get("screenshot_max_failed_pages", default))
+
+
+def get_ssim_floor(default=0.0) -> float:
+    return float(os.environ.get("screenshot_ssim_floor", default))
+
+
+def get_comparison_workers() -> Optional[int]:
+    workers = int(os.environ.get("screenshot_comparison_workers", 0))
+    # 0 lets the process pool use all available cores
+    return workers if workers > 0 else None
+
+
+def get_ssim_engine() -> str:
+    return os.environ.get("ssim_engine", "skimage").lower()
+
+
+def get_ssim_workers(default=1) -> int:
+    workers = int(os.environ.get("ssim_workers", default))
+    # 0 uses all available cores
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def is_ssim_pyramid() -> bool:
+    return os.environ.get("ssim_pyramid", "False").lower() in ("true", "1")
+
+
+def get_ssim_pyramid_band(default=0.02) -> float:
+    return float(os.environ.get("ssim_pyramid_band", default))
+
+
+def get_pixel_tolerance_level(default=16) -> int:
+    return int(os.environ.get("pixel_tolerance_level", default))
+
+
+def is_pixel_tolerance_antialiasing() -> bool:
+    return os.environ.get("pixel_tolerance_antialiasing", "True").lower() in ("true", "1")
+
+
+def get_verdict_cache_file() -> Optional[str]:
+    return os.environ.get("screenshot_verdict_cache")
+
+
+def get_verdict_cache_size(default=10000) -> int:
+    return int(os.environ.get("screenshot_verdict_cache_size", default))
+
+
+def is_css_pixel_screenshots() -> bool:
+    return os.environ.get("screenshot_css_pixels", "False").lower() in ("true", "1")
+
+
+def get_stable_capture_timeout(default=0.0) -> float:
+    return float(os.environ.get("screenshot_stable_capture_timeout", default))
+
+
 def get_time_pattern() -> str:
     return os.environ.get("time_pattern", "%Y-%m-%d_%H-%M-%S")
 
@@ -68,6 +132,14 @@ def get_expected_screenshot_dir() -> str:
     return os.environ.get("expected_screenshot_dir", "expected_screenshots")
 
 
+def get_screenshot_dir_sharding() -> str:
+    return os.environ.get("screenshot_dir_sharding", "none").lower()
+
+
+def is_baseline_manifest() -> bool:
+    return os.environ.get("screenshot_baseline_manifest", "False").lower() in ("true", "1")
+
+
 def get_failure_screenshot_dir() -> str:
     return os.environ.get("failure_screenshot_dir", os.path.join("reports", "html-report", "images"))
 
@@ -81,10 +153,50 @@ def get_implicit_timeout(default=5) -> float:
     return float(os.environ.get("driver_implicit_timeout", default))
 
 
+def is_explicit_waits_only() -> bool:
+    return os.environ.get("driver_explicit_waits_only", "False").lower() in ("true", "1")
+
+
+def get_polling(default="fixed") -> str:
+    return os.environ.get("driver_polling", default)
+
+
+def get_poll_interval(default=0.25) -> float:
+    return float(os.environ.get("driver_poll_interval", default))
+
+
+def get_poll_initial_interval(default=0.005) -> float:
+    return float(os.environ.get("driver_poll_initial_interval", default))
+
+
+def is_element_cache() -> bool:
+    return os.environ.get("driver_element_cache", "False").lower() in ("true", "1")
+
+
+def is_locator_telemetry() -> bool:
+    return os.environ.get("driver_locator_telemetry", "False").lower() in ("true", "1")
+
+
+def is_xpath_to_css() -> bool:
+    return os.environ.get("driver_xpath_to_css", "False").lower() in ("true", "1")
+
+
+def is_element_snapshot() -> bool:
+    return os.environ.get("driver_element_snapshot", "False").lower() in ("true", "1")
+
+
+def is_in_page_wait() -> bool:
+    return os.environ.get("driver_in_page_wait", "False").lower() in ("true", "1")
+
+
 def get_scroll_wait_time(default=0.7) -> float:
     return float(os.environ.get("driver_scroll_wait_time", default))
 
 
+def get_scroll_stable_frames(default=3) -> int:
+    return int(os.environ.get("driver_scroll_stable_frames", default))
+
+
 def get_operating_system(default=OperatingSystem.MACOS) -> OperatingSystem:
     config_os = os.environ.get("driver_operating_system", default.value)
     return OperatingSystem.parse(config_os)
@@ -0,0 +1,134 @@
+#
+# Copyright IBM Corp. 2019-
+# SPDX-License-Identifier: MIT
+#
+
+import json
+import os
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from getgauge.python import data_store
+
+from .config import common_config as config
+from .images import Images
+from .report import Report
+
+deferred_comparisons_key = "_deferred_comparisons"
+
+
+@dataclass
+class DeferredComparison:
+    """A screenshot comparison, that has been registered during a step and is evaluated later."""
+    expected: str
+    actual: str
+    threshold: float
+    diff_formats: str
+    spec: str = ""
+    scenario: str = ""
+    step: str = ""
+    ssim: float | None = None
+    error: str | None = None
+
+    def failed(self) -> bool:
+        return self.error is not None or self.ssim is None or self.ssim < self.threshold
+
+    def location(self) -> str:
+        return " / ".join(part for part in (self.spec, self.scenario, self.step) if part)
+
+    def failure_message(self) -> str:
+        if self.error is not None:
+            return f"{self.location()}: comparison of {self.actual} failed: {self.error}"
+        return f"{self.location()}: SSIM {self.ssim} is less than threshold {self.threshold} for {self.actual}"
+
+
+class DeferredComparisons:
+    """
+    Collects screenshot comparisons during the suite run, so that browser sessions do not wait for them.
+    All comparisons are evaluated at the end of the suite in a process pool.
+    """
+
+    def __init__(self, comparisons: list[DeferredComparison] = None) -> None:
+        self.comparisons = comparisons if comparisons is not None else []
+
+    def register(self, comparison: DeferredComparison) -> None:
+        self.comparisons.append(comparison)
+
+    def evaluate(self, workers: int = None) -> list[DeferredComparison]:
+        """Evaluates all registered comparisons and returns the failed ones."""
+        if not self.comparisons:
+            return []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            self.comparisons = list(executor.map(_evaluate, self.comparisons))
+        return [c for c in self.comparisons if c.failed()]
+
+    def save(self, file_path: str) -> None:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump([asdict(c) for c in self.comparisons], f, indent=2)
+
+    @staticmethod
+    def load(file_path: str) -> "DeferredComparisons":
+        with open(file_path, encoding="utf-8") as f:
+            return DeferredComparisons([DeferredComparison(**c) for c in json.load(f)])
+
+
+def deferred_comparisons() -> DeferredComparisons:
+    """The comparisons of this suite run."""
+    if deferred_comparisons_key not in data_store.suite:
+        data_store.suite[deferred_comparisons_key] = DeferredComparisons()
+    return data_store.suite[deferred_comparisons_key]
+
+
+def evaluate_deferred_comparisons() -> None:
+    """
+    Evaluates the comparisons, that were registered during the suite run, and writes a summary report.
+    Raises an AssertionError, listing all failed comparisons with their specs and steps.
+    """
+    comparisons = deferred_comparisons()
+    if not comparisons.comparisons:
+        return
+    failed = comparisons.evaluate(config.get_comparison_workers())
+    summary_file = _summary_file_path()
+    comparisons.save(summary_file)
+    print(f"Evaluated {len(comparisons.comparisons)} deferred screenshot comparisons, summary: {summary_file}")
+    assert len(failed) == 0, "Deferred screenshot comparisons failed:\n\t{}".format(
+        "\n\t".join(c.failure_message() for c in failed))
+
+
+def _evaluate(comparison: DeferredComparison) -> DeferredComparison:
+    try:
+        comparison.ssim = Images(Report()).adapt_and_compare_images(
+            comparison.expected, comparison.actual, comparison.diff_formats, threshold=comparison.threshold)
+    except Exception as e:
+        comparison.error = str(e)
+    return comparison
+
+
+def _summary_file_path() -> str:
+    reports_dir = os.environ.get("gauge_reports_dir", "reports")
+    if not os.path.isabs(reports_dir):
+        reports_dir = os.path.join(os.environ.get("GAUGE_PROJECT_ROOT", ""), reports_dir)
+    # parallel streams run in separate processes and write separate summaries
+    return os.path.join(reports_dir, "visual-comparisons", f"deferred_comparisons_{os.getpid()}.json")
+
+
+def main(file_paths: list[str]) -> int:
+    """
+    Evaluates the comparisons of previously written summaries again:
+    `python -m gauge_web_app_steps.deferred_comparison reports/visual-comparisons/*.json`
+    """
+    failed_total = 0
+    for file_path in file_paths:
+        comparisons = DeferredComparisons.load(file_path)
+        failed = comparisons.evaluate(config.get_comparison_workers())
+        comparisons.save(file_path)
+        for comparison in failed:
+            print(comparison.failure_message())
+        failed_total += len(failed)
+    return 1 if failed_total > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -28,5 +28,9 @@ class Browser(Enum):
         }
         return self in supported[operating_system]
 
+    def is_chromium(self) -> bool:
+        """Checks if the browser is based on Chromium and can be controlled with the Chrome DevTools Protocol."""
+        return self in (Browser.CHROME, Browser.EDGE, Browser.OPERA)
+
     def __str__(self) -> str:
         return self.value
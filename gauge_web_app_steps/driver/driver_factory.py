@@ -64,6 +64,10 @@ class DriverFactory(ABC):
     def create_driver(self) -> Remote:
         pass
 
+    def _implicit_wait(self) -> float:
+        # without implicit waits, lookups return at once and only the steps wait, each with its own timeout
+        return 0 if config.is_explicit_waits_only() else config.get_implicit_timeout()
+
     def _create_browser_options(self) -> ArgOptions | AppiumOptions:
         if config.get_operating_system().is_mobile():
             operating_system = config.get_operating_system()
@@ -140,7 +144,7 @@ class LocalDriverFactory(DriverFactory):
             Browser.OPERA: lambda: Chrome(service=service, options=browser_options),
             Browser.SAFARI: lambda: Safari(service=service, options=browser_options)
         }[browser]()
-        driver.implicitly_wait(config.get_implicit_timeout())
+        driver.implicitly_wait(self._implicit_wait())
         driver.set_page_load_timeout(config.get_page_load_timeout())
         return driver
 
@@ -155,7 +159,7 @@ class LocalDriverFactory(DriverFactory):
         options = self._create_browser_options()
         capabilities_options = options.load_capabilities(capabilities)
         driver = MobileRemote(local_config.get_mobile_appium_server_url(), options=capabilities_options)
-        driver.implicitly_wait(config.get_implicit_timeout())
+        driver.implicitly_wait(self._implicit_wait())
         driver.set_page_load_timeout(config.get_page_load_timeout())
         return driver
 
@@ -297,7 +301,7 @@ class SaucelabsDriverFactory(DriverFactory):
         for arg in config.get_custom_args():
             browser_options.add_argument(arg)
         driver = Remote(saucelabs_config.get_executor(), options=browser_options)
-        driver.implicitly_wait(config.get_implicit_timeout())
+        driver.implicitly_wait(self._implicit_wait())
         driver.set_page_load_timeout(config.get_page_load_timeout())
         return driver
 
@@ -355,7 +359,7 @@ class SaucelabsDriverFactory(DriverFactory):
         else:
             driver = MobileRemote(saucelabs_config.get_executor(), options=capabilities_options)
             driver.set_page_load_timeout(config.get_page_load_timeout())
-        driver.implicitly_wait(config.get_implicit_timeout())
+        driver.implicitly_wait(self._implicit_wait())
         return driver
 
     def _get_platform_name(self, operating_system: OperatingSystem, operating_system_version: str) -> str:
@@ -0,0 +1,154 @@
+#
+# Copyright IBM Corp. 2019-
+# SPDX-License-Identifier: MIT
+#
+
+import functools
+import re
+
+from dataclasses import dataclass
+from getgauge.python import data_store
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver import Remote
+
+from .app_context import AppContext, app_context_key, timeout_key
+from .config import common_config as config
+from .element_lookup import polling_strategy
+from .page_wait import LOCATE_FUNCTION, READ_FUNCTIONS, is_displayed_atom
+from .polling import PollStats, poll
+from .report import Report
+
+PROPERTIES = ("text", "value", "enabled", "selected", "displayed", "focused")
+PROPERTY_PREFIXES = ("attribute:", "css:")
+OPERATORS = ("equals", "does not equal", "contains", "does not contain", "regexp")
+
+
+@dataclass
+class ElementAssertion:
+    """An expectation on a property of the first element of a marker."""
+    by: str
+    by_value: str
+    marker: tuple[str, str]
+    property: str
+    operator: str
+    expected: str
+
+    def passes(self, result: dict) -> bool:
+        """Whether the result of the script passes. Regular expressions must match at the beginning, like with re.match."""
+        if self.operator != "regexp":
+            return result["passed"]
+        return result["error"] is None and result["actual"] is not None and re.match(self.expected, result["actual"]) is not None
+
+    def failure(self, actual: str | None, error: str | None) -> str:
+        if error is not None:
+            return f"element {self.by} = {self.by_value}: {error}"
+        if actual is None:
+            return f"element {self.by} = {self.by_value}: {self.property} not found"
+        return f"element {self.by} = {self.by_value}: {self.property} expected to {_VERBS[self.operator]} {self.expected}, actual {actual}"
+
+
+_VERBS = {
+    "equals": "equal",
+    "does not equal": "not equal",
+    "contains": "contain",
+    "does not contain": "not contain",
+    "regexp": "match",
+}
+
+
+# Evaluates the given assertions and returns one result per assertion: whether it passed,
+# the actual value of the property and an error, f.i. because of an unsupported locator.
+# Regular expressions are matched in Python, like in the other steps, so their rows only return the actual value.
+_ASSERTIONS_SCRIPT = LOCATE_FUNCTION + READ_FUNCTIONS + """
+var isDisplayed = IS_DISPLAYED;
+function read(element, property) {
+    if (property === 'text') {
+        return element.localName.toLowerCase() === 'input' ? element.value : readText(element);
+    }
+    if (property === 'value') { return readValue(element); }
+    if (property === 'enabled') { return String(readEnabled(element)); }
+    if (property === 'selected') { return String(readSelected(element)); }
+    if (property === 'displayed') { return String(isDisplayed(element)); }
+    if (property === 'focused') { return String(readFocused(element)); }
+    if (property.indexOf('attribute:') === 0) { return readAttribute(element, property.substring('attribute:'.length)); }
+    if (property.indexOf('css:') === 0) { return readCssProperty(element, property.substring('css:'.length)); }
+    throw new Error('unsupported property ' + property);
+}
+function passes(operator, actual, expected) {
+    if (actual === null) { return false; }
+    switch (operator) {
+        case 'equals': return actual === expected;
+        case 'does not equal': return actual !== expected;
+        case 'contains': return actual.indexOf(expected) >= 0;
+        case 'does not contain': return actual.indexOf(expected) < 0;
+        case 'regexp': return null;
+    }
+    throw new Error('unsupported operator ' + operator);
+}
+return arguments[0].map(function(assertion) {
+    try {
+        var element = locate(assertion[0], assertion[1]);
+        if (element === null) {
+            return {passed: false, actual: null, error: 'not found'};
+        }
+        var actual = read(element, assertion[2]);
+        return {passed: passes(assertion[3], actual, assertion[4]), actual: actual, error: null};
+    } catch (e) {
+        return {passed: false, actual: null, error: e.message};
+    }
+});
+"""
+
+
+def check_property_and_operator(prop: str, operator: str, expected: str = None) -> None:
+    assert prop in PROPERTIES or prop.startswith(PROPERTY_PREFIXES),\
+        f"unsupported property '{prop}', expected one of {', '.join(PROPERTIES)}, attribute:<name> or css:<name>"
+    assert operator in OPERATORS, f"unsupported operator '{operator}', expected one of {', '.join(OPERATORS)}"
+    if operator == "regexp" and expected is not None:
+        try:
+            re.compile(expected)
+        except re.error as e:
+            raise AssertionError(f"invalid regexp '{expected}': {e}")
+
+
+def assert_elements(assertions: list[ElementAssertion]) -> list[str]:
+    """
+    Evaluates all assertions in the browser with one script per check. Passed assertions are not checked again,
+    the others until they pass or the timeout is reached. Returns the failures of all assertions, that did not pass.
+    """
+    pending = list(assertions)
+    results = {}
+    def all_passed() -> bool:
+        evaluated = _driver().execute_script(_assertions_script(), [
+            [a.marker[0], a.marker[1], a.property, a.operator, a.expected] for a in pending])
+        results.update(zip(map(id, pending), evaluated))
+        pending[:] = [a for a, result in zip(pending, evaluated) if not a.passes(result)]
+        return len(pending) == 0
+    timeout = data_store.scenario.get(timeout_key, config.get_implicit_timeout())
+    stats = PollStats()
+    try:
+        poll(all_passed, timeout, polling_strategy(), stats=stats)
+    except TimeoutException:
+        pass
+    finally:
+        _report().log_debug(f"{len(assertions)} element assertions checked {stats.polls} times in {stats.waited:.3f}s")
+    failures = []
+    for assertion in pending:
+        result = results.get(id(assertion), {"actual": None, "error": "could not be evaluated"})
+        failures.append(assertion.failure(result["actual"], result["error"]))
+    return failures
+
+
+@functools.cache
+def _assertions_script() -> str:
+    return _ASSERTIONS_SCRIPT.replace("IS_DISPLAYED", is_displayed_atom(), 1)
+
+
+def _driver() -> Remote:
+    app_ctx: AppContext = data_store.spec[app_context_key]
+    return app_ctx.driver
+
+
+def _report() -> Report:
+    app_ctx: AppContext = data_store.spec[app_context_key]
+    return app_ctx.report
@@ -3,39 +3,51 @@
 # SPDX-License-Identifier: MIT
 #
 
+import functools
 import time
 
 from appium.webdriver.webelement import WebElement as AppiumElement
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Callable, List, TypeVar
 from getgauge.python import data_store
 from selenium.webdriver import Remote
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException, WebDriverException
-from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
 from selenium.webdriver.remote.webelement import WebElement
 
-from .app_context import AppContext, app_context_key, timeout_key
+from .app_context import AppContext, app_context_key, element_cache_key, polling_key, timeout_key
 from .bymapper import ByMapper
 from .config import common_config as config
+from .page_wait import READ_FUNCTIONS, PageCondition, await_in_page, is_displayed_atom
+from .polling import PollingStrategy, PollStats, ExponentialPolling, create_polling_strategy, poll
 from .report import Report
+from .selector import Selector
 from .substitute import substitute
+from .telemetry import record_lookup
+from .xpath_to_css import xpath_to_css
 
 
 T = TypeVar('T')
 
 
-def find_element(by_param: str, by_value_param: str, immediately=False) -> WebElement | None:
+def find_element(by_param: str, by_value_param: str, immediately=False, cached=True) -> WebElement | None:
+    """
+    Elements, that are not looked up immediately, are taken from the element cache, if it is enabled.
+    Cached elements re-resolve themselves in their own commands, but not when they are passed to scripts or actions.
+    Steps, that pass elements to scripts without checking them first, should not use the cache.
+    """
     by = substitute(by_param)
     by_value = substitute(by_value_param)
     marker = get_marker(by, by_value)
     if immediately:
         try:
-            return _driver().find_element(*marker)
+            return _immediately(marker, lambda: _driver().find_element(*marker))
         except WebDriverException:
             return None
+    elif cached:
+        return wait_until(lambda driver: _cached_element(driver, marker), marker=marker)
     else:
-        return wait_until(lambda driver: driver.find_element(*marker))
+        return wait_until(lambda driver: driver.find_element(*marker), marker=marker)
 
 
 def find_elements(by_param: str, by_value_param: str, immediately=False) -> List[WebElement] | None:
@@ -44,14 +56,17 @@ def find_elements(by_param: str, by_value_param: str, immediately=False) -> List
     marker = get_marker(by, by_value)
     try:
         if immediately:
-            return _driver().find_elements(*marker)
+            return _immediately(marker, lambda: _driver().find_elements(*marker))
         else:
-            return wait_until(lambda driver: driver.find_elements(*marker))
+            return wait_until(lambda driver: driver.find_elements(*marker), marker=marker)
     except WebDriverException:
         return []
 
 
 def get_text_from_element(by_param: str, by_value_param: str, immediately=False) -> str | None:
+    if _is_snapshot():
+        snapshot = element_snapshot(by_param, by_value_param, immediately=immediately)
+        return snapshot.input_text if snapshot is not None else None
     element = find_element(by_param, by_value_param, immediately)
     if element is None:
         return None
@@ -73,17 +88,149 @@ def find_attribute(by_param: str, by_value_param: str, attribute: str, immediate
         Empty attributes will return 'true', never an empty string.
         If the attribute does not exist, it will return `False`.
         """
-        element = driver.find_element(*marker)
-        value = element.get_dom_attribute(attribute)
+        element = driver.find_element(*marker) if immediately else _cached_element(driver, marker)
+        if _is_snapshot():
+            value = _take_snapshot(element, attributes=[attribute]).attributes[attribute]
+        else:
+            value = element.get_dom_attribute(attribute)
         return value if value is not None else False
     if immediately:
         try:
-            res = _element_attribute(_driver())
+            res = _immediately(marker, lambda: _element_attribute(_driver()))
             return res if res else None
         except WebDriverException:
             return None
     else:
-        return wait_until(_element_attribute)
+        return wait_until(_element_attribute, marker=marker)
+
+
+@dataclass
+class ElementSnapshot:
+    """The state of an element, which is read by a single script."""
+    tag_name: str
+    text: str
+    value: str | None
+    selected_value: str | None
+    enabled: bool
+    selected: bool
+    displayed: bool
+    focused: bool
+    rect: dict[str, float]
+    attributes: dict[str, str | None] = field(default_factory=dict)
+    css: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def input_text(self) -> str:
+        """The value of input fields, otherwise the text."""
+        return self.value if self.tag_name == "input" and self.value is not None else self.text
+
+
+# The visibility is checked by the same atom, that Selenium uses.
+_SNAPSHOT_SCRIPT = READ_FUNCTIONS + """
+var element = arguments[0];
+var isDisplayed = IS_DISPLAYED;
+var tagName = element.localName.toLowerCase();
+var attributes = {};
+arguments[1].forEach(function(name) { attributes[name] = readAttribute(element, name); });
+var css = {};
+arguments[2].forEach(function(name) { css[name] = readCssProperty(element, name); });
+var selectedOption = tagName === 'select' ? element.querySelector('option:checked') : null;
+var rect = element.getBoundingClientRect();
+return {
+    tagName: tagName,
+    text: readText(element),
+    value: readValue(element),
+    selectedValue: selectedOption !== null ? selectedOption.value : null,
+    enabled: readEnabled(element),
+    selected: readSelected(element),
+    displayed: isDisplayed(element),
+    focused: readFocused(element),
+    rect: {x: rect.left + window.pageXOffset, y: rect.top + window.pageYOffset, width: rect.width, height: rect.height},
+    attributes: attributes,
+    css: css
+};
+"""
+
+
+def element_snapshot(
+        by_param: str,
+        by_value_param: str,
+        attributes: list[str] = (),
+        css_properties: list[str] = (),
+        immediately=False
+) -> ElementSnapshot | None:
+    """
+    Looks up the element and reads its state, the given attributes and computed css properties in one script.
+    Returns None, if the element is looked up immediately and does not exist.
+    """
+    element = find_element(by_param, by_value_param, immediately)
+    if element is None:
+        return None
+    try:
+        return _take_snapshot(element, attributes, css_properties)
+    except WebDriverException:
+        if immediately:
+            return None
+        raise
+
+
+def is_element_enabled(by: str, by_value: str) -> bool:
+    if _is_snapshot():
+        return element_snapshot(by, by_value).enabled
+    return find_element(by, by_value).is_enabled()
+
+
+def is_element_selected(by: str, by_value: str) -> bool:
+    if _is_snapshot():
+        return element_snapshot(by, by_value).selected
+    return find_element(by, by_value).is_selected()
+
+
+def is_element_focused(by: str, by_value: str) -> bool:
+    if _is_snapshot():
+        return element_snapshot(by, by_value).focused
+    return find_element(by, by_value, cached=False) == _driver().switch_to.active_element
+
+
+def get_css_property(by: str, by_value: str, css_property: str) -> str:
+    # the drivers format values differently, f.i. colors, so css properties are always read by the driver
+    return find_element(by, by_value).value_of_css_property(css_property)
+
+
+def get_selected_value(by: str, by_value: str) -> str | None:
+    if _is_snapshot():
+        return element_snapshot(by, by_value).selected_value
+    return Selector.get_selected_value(find_element(by, by_value))
+
+
+def _is_snapshot() -> bool:
+    # scripts can not be executed in native apps
+    return config.is_element_snapshot() and not config.is_app_test()
+
+
+def _take_snapshot(element: WebElement, attributes: list[str] = (), css_properties: list[str] = ()) -> ElementSnapshot:
+    def snapshot() -> dict:
+        return _driver().execute_script(_snapshot_script(), element, list(attributes), list(css_properties))
+    # the script is not an element command, so cached elements are resolved explicitly, when they became stale
+    state = element._resolving(snapshot) if isinstance(element, _StaleElementResolver) else snapshot()
+    return ElementSnapshot(
+        tag_name=state["tagName"],
+        text=state["text"],
+        value=state["value"],
+        selected_value=state["selectedValue"],
+        enabled=state["enabled"],
+        selected=state["selected"],
+        displayed=state["displayed"],
+        focused=state["focused"],
+        rect=state["rect"],
+        attributes=state["attributes"],
+        css=state["css"],
+    )
+
+
+@functools.cache
+def _snapshot_script() -> str:
+    return _SNAPSHOT_SCRIPT.replace("IS_DISPLAYED", is_displayed_atom(), 1)
 
 
 @dataclass
@@ -93,30 +240,214 @@ class ViewportOffset:
     left: int
 
 
-def wait_for_idle_element(by: str, by_value: str):
-    element = find_element(by, by_value)
-    previous_offset = _offset(element)
-    def element_stable(_: Remote):
-        time.sleep(0.2)
-        potentially_moving_element = find_element(by, by_value)
-        current_offset = _offset(potentially_moving_element)
-        print(f"Got offset: {current_offset}")
+# Resolves with true, as soon as the element's position in the viewport did not change for a number of animation frames,
+# with false after the timeout, and with null, when the element has been removed from the document.
+_IDLE_ELEMENT_SCRIPT = """
+var element = arguments[0];
+var requiredStableFrames = arguments[1];
+var maxWaitMillis = arguments[2];
+var done = arguments[arguments.length - 1];
+var finished = false;
+var lastOffset = null;
+var stableFrames = 0;
+function finish(result) {
+    if (finished) { return; }
+    finished = true;
+    done(result);
+}
+function onFrame() {
+    if (finished) { return; }
+    if (!element.isConnected) {
+        finish(null);
+        return;
+    }
+    var rect = element.getBoundingClientRect();
+    var offset = Math.round(rect.top) + ',' + Math.round(rect.left);
+    stableFrames = offset === lastOffset ? stableFrames + 1 : 0;
+    lastOffset = offset;
+    if (stableFrames >= requiredStableFrames) {
+        finish(true);
+    } else {
+        window.requestAnimationFrame(onFrame);
+    }
+}
+setTimeout(function() { finish(false); }, maxWaitMillis);
+window.requestAnimationFrame(onFrame);
+"""
+
+
+def wait_for_idle_element(by: str, by_value: str, element: WebElement = None) -> None:
+    """
+    Waits until the element stopped moving, f.i. after it has been scrolled into view.
+    Browsers watch the element themselves, native apps are polled.
+    """
+    timeout = data_store.scenario.get(timeout_key, config.get_implicit_timeout())
+    if not config.is_app_test():
+        if element is None:
+            element = find_element(by, by_value, cached=False)
+        try:
+            idle = _driver().execute_async_script(_IDLE_ELEMENT_SCRIPT, element, config.get_scroll_stable_frames(), int(timeout * 1000))
+        except WebDriverException as e:
+            # f.i. the element became stale or the script timeout is too short
+            _report().log_debug(f"watching element {by} = {by_value} in the page failed, polling instead: {e}")
+            idle = None
+        if idle is not None:
+            if not idle:
+                # Best effort approach
+                _report().log_debug(f"element {by} = {by_value} keeps moving after scrolling into view")
+            return
+    _poll_idle_element(by, by_value)
+
+
+def _poll_idle_element(by: str, by_value: str) -> None:
+    previous_offset = None
+    def element_stable(_: Remote) -> bool:
+        # the offset is read by a script, which does not re-resolve cached elements
+        current_offset = _offset(find_element(by, by_value, cached=False))
         nonlocal previous_offset
-        if previous_offset == current_offset:
-            return True
+        stable = previous_offset == current_offset
         previous_offset = current_offset
-        return False
+        return stable
     try:
-        wait_until(element_stable)
+        # the first checks follow quickly, but the offsets must not be compared too close to each other
+        wait_until(element_stable, polling=ExponentialPolling(0.05, 0.2))
     except TimeoutException:
         # Best effort approach
-        _report().log_debug(f"element {element} keeps moving after scrolling into view")
+        _report().log_debug(f"element {by} = {by_value} keeps moving after scrolling into view")
 
 
-def wait_until(condition: Callable[[Remote], T], message: str = "") -> T:
+def wait_until(
+        condition: Callable[[Remote], T],
+        message: str = "",
+        page_condition: PageCondition = None,
+        polling: PollingStrategy = None,
+        marker: tuple[str, str] = None
+) -> T:
+    """
+    Polls the condition until it is met, by default with the polling strategy of the scenario or the configuration.
+    If a page condition is given and in-page waiting is enabled,
+    the browser waits for it by itself and the condition is only checked, when the page condition holds or timed out.
+    The wait is recorded for the locator telemetry, if the condition looks up the element of a marker.
+    """
+    if marker is None and page_condition is not None:
+        marker = page_condition.marker
+    start = time.time()
+    stats = PollStats()
+    found = False
+    try:
+        result = _wait_until(condition, message, page_condition, polling, stats)
+        found = True
+        return result
+    finally:
+        if marker is not None:
+            record_lookup(marker, stats.polls, time.time() - start, stats.checking, found, waited=True)
+
+
+def _wait_until(condition: Callable[[Remote], T], message: str, page_condition: PageCondition, polling: PollingStrategy, stats: PollStats) -> T:
     timeout = data_store.scenario.get(timeout_key, config.get_implicit_timeout())
-    return WebDriverWait(_driver(), timeout=timeout, poll_frequency=0.25, ignored_exceptions=[WebDriverException])\
-        .until(condition, message)
+    if page_condition is not None and config.is_in_page_wait() and not config.is_app_test():
+        start = time.time()
+        try:
+            held = await_in_page(_driver(), page_condition, timeout)
+        except WebDriverException as e:
+            _report().log_debug(f"waiting in the page failed, polling instead: {e}")
+            held = None
+        if held is not None:
+            # the browser's evaluation can differ slightly from the driver's, so the condition has the final say
+            check_start = time.time()
+            result = _check(condition)
+            stats.polls += 1
+            stats.checking += time.time() - check_start
+            if result:
+                return result
+            if not held:
+                raise TimeoutException(message)
+        timeout = max(0.0, timeout - (time.time() - start))
+    driver = _driver()
+    strategy = polling if polling is not None else polling_strategy()
+    poll_stats = PollStats()
+    try:
+        return poll(lambda: condition(driver), timeout, strategy, message, poll_stats)
+    finally:
+        _report().log_debug(f"condition checked {poll_stats.polls} times in {poll_stats.waited:.3f}s")
+        stats.polls += poll_stats.polls
+        stats.checking += poll_stats.checking
+
+
+def _immediately(marker: tuple[str, str], lookup: Callable[[], T]) -> T:
+    """Runs a single lookup of the marker and records it for the locator telemetry."""
+    start = time.time()
+    found = False
+    try:
+        result = lookup()
+        found = bool(result)
+        return result
+    finally:
+        elapsed = time.time() - start
+        record_lookup(marker, 1, elapsed, elapsed, found, waited=False)
+
+
+def polling_strategy() -> PollingStrategy:
+    """The polling strategy set for the current scenario or else the configured one."""
+    name = data_store.scenario.get(polling_key, config.get_polling())
+    return create_polling_strategy(name, config.get_poll_interval(), config.get_poll_initial_interval())
+
+
+def _check(condition: Callable[[Remote], T]) -> T | bool:
+    try:
+        return condition(_driver())
+    except WebDriverException:
+        return False
+
+
+def invalidate_element_cache() -> None:
+    """Forgets all cached elements. This is needed, whenever the document or the browsing context changes."""
+    cache = data_store.spec.get(element_cache_key)
+    if cache:
+        cache.clear()
+
+
+def _cached_element(driver: Remote, marker: tuple[str, str]) -> WebElement:
+    if not config.is_element_cache():
+        return driver.find_element(*marker)
+    cache: dict[tuple[str, str], WebElement] = data_store.spec.setdefault(element_cache_key, {})
+    element = cache.get(marker)
+    if element is None:
+        found = driver.find_element(*marker)
+        element = _resolving_class(type(found))(found.parent, found.id)
+        element.marker = marker
+        cache[marker] = element
+    return element
+
+
+class _StaleElementResolver(object):
+    """
+    Mixin for cached elements: when the element became stale, f.i. because the page re-rendered it,
+    it is looked up again with its marker and the command is repeated once.
+    """
+    marker: tuple[str, str]
+
+    def _execute(self, command, params=None):
+        return self._resolving(lambda: super(_StaleElementResolver, self)._execute(command, params))
+
+    def is_displayed(self) -> bool:
+        # the atom is executed as script, so the element's own command is bypassed
+        return self._resolving(lambda: super(_StaleElementResolver, self).is_displayed())
+
+    def get_attribute(self, name) -> str | None:
+        return self._resolving(lambda: super(_StaleElementResolver, self).get_attribute(name))
+
+    def _resolving(self, command: Callable[[], T]) -> T:
+        try:
+            return command()
+        except StaleElementReferenceException:
+            self._id = self._parent.find_element(*self.marker).id
+            return command()
+
+
+@functools.cache
+def _resolving_class(element_class: type) -> type:
+    return type(f"Resolving{element_class.__name__}", (_StaleElementResolver, element_class), {})
 
 
 def get_marker(by_string: str, by_value: str) -> tuple[str, str]:
@@ -124,6 +455,11 @@ def get_marker(by_string: str, by_value: str) -> tuple[str, str]:
     if mapped_by == By.ID:
         mapped_by = By.CSS_SELECTOR
         by_value = f"#{by_value}"
+    elif mapped_by == By.XPATH and config.is_xpath_to_css() and not config.is_app_test():
+        css = xpath_to_css(by_value)
+        if css is not None:
+            _report().log_debug(f"rewrote xpath {by_value} to css selector {css}")
+            return By.CSS_SELECTOR, css
     return mapped_by, by_value
 
 
@@ -4,25 +4,46 @@
 #
 
 import os
-import errno
+import re
 
 from datetime import datetime
+from functools import lru_cache
 from string import Template
 
 from .config import common_config as config
+from .manifest import BaselineEntry, BaselineManifest
+
+
+class _FileTemplate(Template):
+    delimiter = "%"
+
+
+# the baselines do not change during a run, so their manifests are loaded once per process
+_baseline_manifests: dict[str, BaselineManifest] = {}
+
+
+@lru_cache(maxsize=16)
+def _file_template(pattern: str) -> _FileTemplate:
+    return _FileTemplate(pattern)
 
 
 class ImagePath(object):
+    """
+    Resolves the paths of screenshot files.
+    Directories are resolved and created only once per instance, which lives as long as a spec.
+    """
 
-    def __init__(self, browser: str, headless: bool):
+    def __init__(self, browser: str, headless: bool, spec_name: str = None):
         self.browser_name = browser
         self.headless = headless
+        self.spec_name = spec_name
+        self._resolved_dirs: dict[tuple[str, bool], str] = {}
 
     def create_failure_screenshot_file_path(self) -> str:
         now = datetime.now()
         date_str = now.strftime("%Y-%m-%d_%H-%M-%S-%f")
 
-        failure_screenshot_dir = self._create_screenshot_dir(config.get_failure_screenshot_dir())
+        failure_screenshot_dir = self._resolve_screenshot_dir(config.get_failure_screenshot_dir())
         screenshot_file = "fail_{}.png".format(date_str)
         screenshot_file_path = os.path.join(failure_screenshot_dir, screenshot_file)
         return screenshot_file_path
@@ -53,12 +74,36 @@ class ImagePath(object):
         expected_screenshot_full_path = self._create_screenshot_file_path(expected_screenshot_dir, image_file_name, running_number)
         return expected_screenshot_full_path
 
+    def expected_screenshot_exists(self, expected_screenshot_full_path: str) -> bool:
+        manifest = self.baseline_manifest()
+        if manifest is not None:
+            return manifest.contains(expected_screenshot_full_path)
+        return os.path.isfile(expected_screenshot_full_path)
+
+    def expected_screenshot_entry(self, expected_screenshot_full_path: str) -> BaselineEntry | None:
+        """The manifest entry of an expected screenshot or None, if there is no manifest or no such baseline."""
+        manifest = self.baseline_manifest()
+        return manifest.get(expected_screenshot_full_path) if manifest is not None else None
+
+    def baseline_manifest(self) -> BaselineManifest | None:
+        # baselines are rewritten when they are updated, which would make the manifest outdated
+        if not config.is_baseline_manifest() or config.is_update_baselines():
+            return None
+        expected_screenshot_dir = self._expected_screenshot_dir()
+        manifest = _baseline_manifests.get(expected_screenshot_dir)
+        if manifest is None:
+            manifest = BaselineManifest.load(expected_screenshot_dir)
+            _baseline_manifests[expected_screenshot_dir] = manifest
+        return manifest
+
     def _create_screenshot_file_path(self, screenshot_dir: str, image_file_name: str, running_number=None) -> str:
         filename_without_ext = image_file_name if not image_file_name.endswith(".png") else image_file_name[:-len(".png")]
+        # screenshots in CSS pixels have their own baselines
+        browser_key = f"{self.browser_name}@1x" if config.is_css_pixel_screenshots() else self.browser_name
         if running_number is None:
-            file_name_parts = [self.browser_name, "_", filename_without_ext, ".png"]
+            file_name_parts = [browser_key, "_", filename_without_ext, ".png"]
         else:
-            file_name_parts = [self.browser_name, "_", filename_without_ext, "_", str(running_number), ".png"]
+            file_name_parts = [browser_key, "_", filename_without_ext, "_", str(running_number), ".png"]
         if self.headless:
             file_name_parts.insert(0, "headless_")
         file_name = "".join(file_name_parts)
@@ -72,10 +117,7 @@ class ImagePath(object):
         return date_str
 
     def _filename(self, name) -> str:
-        pattern = config.get_file_name_pattern()
-        class FileTemplate(Template):
-            delimiter = "%"
-        template = FileTemplate(pattern)
+        template = _file_template(config.get_file_name_pattern())
         subs = template.safe_substitute({
                 "name"    : name if not name.endswith(".png") else name[:-len(".png")],
                 "ext"     : "png",
@@ -85,27 +127,43 @@ class ImagePath(object):
         return subs if subs.endswith(".png") else "{}.png".format(subs)
 
     def _screenshot_dir(self) -> str:
-        return self._create_screenshot_dir(config.get_screenshot_dir())
+        return self._resolve_screenshot_dir(config.get_screenshot_dir(), sharded=True)
 
     def _actual_screenshot_dir(self) -> str:
-        return self._create_screenshot_dir(config.get_actual_screenshot_dir())
+        return self._resolve_screenshot_dir(config.get_actual_screenshot_dir(), sharded=True)
 
     def _expected_screenshot_dir(self) -> str:
-        return self._create_screenshot_dir(config.get_expected_screenshot_dir())
-
-    def _create_screenshot_dir(self, screenshot_dir) -> str:
+        # baselines are shared by all streams and specs, so they are never sharded
+        return self._resolve_screenshot_dir(config.get_expected_screenshot_dir())
+
+    def _resolve_screenshot_dir(self, screenshot_dir: str, sharded=False) -> str:
+        key = (screenshot_dir, sharded)
+        resolved_dir = self._resolved_dirs.get(key)
+        if resolved_dir is None:
+            resolved_dir = self._create_screenshot_dir(screenshot_dir, self._shard() if sharded else None)
+            self._resolved_dirs[key] = resolved_dir
+        return resolved_dir
+
+    def _shard(self) -> str | None:
+        """The subdirectory, that keeps the number of files per directory small in large parallel runs."""
+        sharding = config.get_screenshot_dir_sharding()
+        if sharding == "stream":
+            # every parallel stream of Gauge runs in its own process
+            return f"stream_{os.getpid()}"
+        elif sharding == "spec" and self.spec_name:
+            return re.sub(r"[^\w.-]+", "_", self.spec_name)
+        return None
+
+    def _create_screenshot_dir(self, screenshot_dir, shard: str = None) -> str:
         if not os.path.isabs(screenshot_dir):
             project_root = os.environ.get("GAUGE_PROJECT_ROOT")
             screenshot_dir = os.path.join(project_root, screenshot_dir)
+        if shard:
+            screenshot_dir = os.path.join(screenshot_dir, shard)
         screenshot_dir = os.path.abspath(screenshot_dir)
         return self._create_dir(screenshot_dir)
 
     def _create_dir(self, dir_) -> str:
-        try:
-            os.makedirs(dir_)
-        except OSError as e:
-            # the directory might already exist. If not it is created.
-            if e.errno != errno.EEXIST:
-                raise
-            pass
+        # the directory might already exist. If not it is created.
+        os.makedirs(dir_, exist_ok=True)
         return dir_
@@ -18,7 +18,10 @@ from skimage import transform as skimg_transform
 from skimage import util as skimg_util
 from skimage.metrics import structural_similarity as compare_ssim
 
+from .config import common_config as config
+from .manifest import file_sha256
 from .report import Report
+from .ssim import structural_similarity as integral_ssim, tiled_structural_similarity
 
 
 class Images(object):
@@ -29,6 +32,17 @@ class Images(object):
     def __init__(self, report_: Report):
         self.report = report_
 
+    def comparison_key(self, threshold: float = None) -> str:
+        """Identifies the parameters, that determine the SSIM of a comparison. Used to cache results."""
+        # the diff formats only determine the diff images, not the SSIM
+        key = "ssim;data_range=255"
+        if config.get_ssim_engine() != "skimage":
+            key += f";engine={config.get_ssim_engine()}"
+        if config.is_ssim_pyramid():
+            # a coarse SSIM was only decided against this threshold, a stricter one might need the full resolution
+            key += f";pyramid_band={config.get_ssim_pyramid_band()};threshold={threshold}"
+        return key
+
     def crop_image_file(
             self,
             screenshot_file_path: str,
@@ -52,11 +66,11 @@ class Images(object):
             the offset of the browser's viewport
         """
         img = skimg_io.imread(screenshot_file_path)
-        img = self._crop_image(img, location, size, pixel_ratio, viewport_offset)
+        img = self.crop_image(img, location, size, pixel_ratio, viewport_offset)
         skimg_io.imsave(screenshot_file_path, img, check_contrast=False)
         self.report.log_image_info("screenshot {}".format(screenshot_file_path), img)
 
-    def _crop_image(
+    def crop_image(
             self,
             image,
             location,
@@ -64,6 +78,7 @@ class Images(object):
             pixel_ratio: int,
             viewport_offset
     ):
+        """Crops the image in memory. See *crop_image_file* for the parameters."""
         if pixel_ratio != 1:
             self.report.log("pixel ratio is %s" % (pixel_ratio,))
         start_x = int(location["x"]) * pixel_ratio
@@ -80,7 +95,9 @@ class Images(object):
             actual_screenshot_full_path: str,
             diff_formats="full",
             append_images=False,
-            output_path=""
+            output_path="",
+            expected_sha256: str = None,
+            threshold: float = None
     ) -> float:
         """
         Calculates the SSIM between 2 images. Does rescaling and padding of the actual image, if necessary.
@@ -94,7 +111,156 @@ class Images(object):
             The name of the color should a valid HTML color name: https://www.w3.org/TR/html401/types.html#h-6.5.
         append_images: if true, the diff image will be append to the expected screenshot
         output_path : optional path for the diff image, if not set it is equal to the path of the actual screenshot
+        expected_sha256 : optional content hash of the expected image, f.i. from the baseline manifest.
+            If the actual image has the same hash, both are identical and no image is decoded.
+        threshold : optional threshold of the assertion. In pyramid mode, clear passes and failures are decided at coarse resolutions.
+        """
+        if self._has_hash(actual_screenshot_full_path, expected_sha256):
+            return 1.0
+        img_actual, img_expected, channel_axis = self._read_adapted_images(expected_screenshot_full_path, actual_screenshot_full_path)
+        coarse = self._coarse_ssim(img_actual, img_expected, channel_axis, threshold)
+        if coarse is not None and coarse[0] >= threshold:
+            return coarse[0]
+        if coarse is not None:
+            # a clear failure is not compared at full resolution, so its diff images have the coarse resolution
+            _, img_actual, img_expected = coarse
+        img_list = []
+        if append_images:
+            img_list.append(img_expected)
+        ssim, diff_images = self._compute_ssim_and_diff(img_actual, img_expected, diff_formats, channel_axis=channel_axis)
+        if ssim < 1.0:
+            self._save_diff_image(expected_screenshot_full_path, actual_screenshot_full_path, output_path,
+                                  diff_images, img_list)
+        self.report.log_debug("SSIM: {}\n".format(ssim))
+        return ssim
+
+    def adapt_and_compare_pixels(
+            self,
+            expected_screenshot_full_path: str,
+            actual_screenshot_full_path: str,
+            diff_formats="",
+            output_path="",
+            expected_sha256: str = None
+    ) -> float:
+        """
+        Calculates the percentage of pixels, that differ by more than the configured tolerance level in any channel.
+        Differences, that look like anti-aliasing, are ignored if configured: a pixel is anti-aliased in either image,
+        if it is not in a flat region, and its darkest and brightest neighbours have at least 3 identical neighbours
+        in both images, like pixelmatch decides it.
+        Does rescaling and padding of the actual image, if necessary, just like *adapt_and_compare_images*.
+        Prints a diff image to the report, that marks differing pixels red and anti-aliased pixels yellow.
+        Parameters
+        ----------
+        expected_screenshot_full_path : str
+        actual_screenshot_full_path : str
+        diff_formats : str
+            Optionally a color format for an additional diff image, see *adapt_and_compare_images*.
+            The SSIM formats gradient and full are ignored.
+        output_path : optional path for the diff image, if not set it is equal to the path of the actual screenshot
+        expected_sha256 : optional content hash of the expected image, see *adapt_and_compare_images*.
+        """
+        if self._has_hash(actual_screenshot_full_path, expected_sha256):
+            return 0.0
+        img_actual, img_expected, channel_axis = self._read_adapted_images(expected_screenshot_full_path, actual_screenshot_full_path)
+        level = config.get_pixel_tolerance_level()
+        # the signed difference of 8 bit values needs 16 bits
+        delta = np.abs(img_actual.astype(np.int16) - img_expected.astype(np.int16))
+        differs = delta.max(axis=channel_axis) > level if channel_axis == 2 else delta > level
+        anti_aliased = np.zeros_like(differs)
+        if config.is_pixel_tolerance_antialiasing() and differs.any():
+            # only the differing pixels are examined
+            ys, xs = np.nonzero(differs)
+            ignored = self._is_anti_aliased(img_actual, img_expected, ys, xs) | self._is_anti_aliased(img_expected, img_actual, ys, xs)
+            anti_aliased[ys[ignored], xs[ignored]] = True
+            differs &= ~anti_aliased
+        difference = 100.0 * np.count_nonzero(differs) / differs.size
+        self.report.log_debug(f"{difference}% of the pixels differ by more than {level}, "
+                              f"{np.count_nonzero(anti_aliased)} anti-aliased pixels were ignored")
+        if difference > 0.0:
+            diff_images = {"pixels": self._pixel_diff_image(img_expected, differs, anti_aliased)}
+            if "color:" in diff_formats:
+                color_name = re.search("color:([a-z]*)", diff_formats).group(1)
+                diff_images[color_name] = self._diff_images_color(img_expected, img_actual, color_name)
+            self._save_diff_image(expected_screenshot_full_path, actual_screenshot_full_path, output_path, diff_images, [])
+        return difference
+
+    def _is_anti_aliased(self, img: np.ndarray, img_other: np.ndarray, ys: np.ndarray, xs: np.ndarray) -> np.ndarray:
+        """
+        Whether the pixels at the given coordinates look like anti-aliasing in the image, like pixelmatch decides it:
+        a pixel is not in a flat region, has darker and brighter neighbours, and either the darkest
+        or the brightest neighbour lies in a region of identical colors in both images.
         """
+        brightness = self._brightness(img)
+        height, width = brightness.shape
+        center = brightness[ys, xs]
+        zeroes = self._border_count(ys, xs, height, width)
+        min_delta = np.zeros_like(center)
+        max_delta = np.zeros_like(center)
+        min_ys, min_xs, max_ys, max_xs = ys.copy(), xs.copy(), ys.copy(), xs.copy()
+        for neighbour_ys, neighbour_xs, inside in self._neighbours(ys, xs, height, width):
+            delta = np.where(inside, brightness[neighbour_ys, neighbour_xs] - center, 0.0)
+            zeroes += inside & (delta == 0)
+            darker = inside & (delta < min_delta)
+            min_delta = np.where(darker, delta, min_delta)
+            min_ys, min_xs = np.where(darker, neighbour_ys, min_ys), np.where(darker, neighbour_xs, min_xs)
+            brighter = inside & (delta > max_delta)
+            max_delta = np.where(brighter, delta, max_delta)
+            max_ys, max_xs = np.where(brighter, neighbour_ys, max_ys), np.where(brighter, neighbour_xs, max_xs)
+        # more than 2 neighbours of the same brightness mean a flat region, that anti-aliasing does not produce
+        candidates = (zeroes <= 2) & (min_delta < 0) & (max_delta > 0)
+        darkest_flat = self._has_many_siblings(img, min_ys, min_xs) & self._has_many_siblings(img_other, min_ys, min_xs)
+        brightest_flat = self._has_many_siblings(img, max_ys, max_xs) & self._has_many_siblings(img_other, max_ys, max_xs)
+        return candidates & (darkest_flat | brightest_flat)
+
+    def _has_many_siblings(self, img: np.ndarray, ys: np.ndarray, xs: np.ndarray) -> np.ndarray:
+        """Whether the pixels at the given coordinates have at least 3 neighbours of an identical color."""
+        height, width = img.shape[:2]
+        center = img[ys, xs]
+        zeroes = self._border_count(ys, xs, height, width)
+        for neighbour_ys, neighbour_xs, inside in self._neighbours(ys, xs, height, width):
+            identical = img[neighbour_ys, neighbour_xs] == center
+            zeroes += inside & (identical.all(axis=-1) if img.ndim == 3 else identical)
+        return zeroes > 2
+
+    def _neighbours(self, ys: np.ndarray, xs: np.ndarray, height: int, width: int):
+        """Yields the coordinates of each of the 8 neighbours, clipped to the image, and whether they lie inside."""
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                if dy == dx == 0:
+                    continue
+                neighbour_ys, neighbour_xs = ys + dy, xs + dx
+                inside = (neighbour_ys >= 0) & (neighbour_ys < height) & (neighbour_xs >= 0) & (neighbour_xs < width)
+                yield np.clip(neighbour_ys, 0, height - 1), np.clip(neighbour_xs, 0, width - 1), inside
+
+    def _border_count(self, ys: np.ndarray, xs: np.ndarray, height: int, width: int) -> np.ndarray:
+        # like in pixelmatch, pixels at the border of the image count one identical neighbour in advance
+        return ((ys == 0) | (ys == height - 1) | (xs == 0) | (xs == width - 1)).astype(np.int32)
+
+    def _brightness(self, img: np.ndarray) -> np.ndarray:
+        """The luma of each pixel with colors blended onto white by their alpha, as in pixelmatch."""
+        if img.ndim == 2:
+            return img.astype(np.float64)
+        rgb = img[..., :3].astype(np.float64)
+        if self._img_has_alpha(img):
+            alpha = img[..., 3:4].astype(np.float64) / 255
+            rgb = 255 + (rgb - 255) * alpha
+        return rgb @ np.array([0.29889531, 0.58662247, 0.11448223])
+
+    def _pixel_diff_image(self, img_expected: np.ndarray, differs: np.ndarray, anti_aliased: np.ndarray) -> np.ndarray:
+        # the expected image is faded, so that the marked pixels stand out
+        diff = img_as_ubyte(self._transform_to_rgb_float(img_expected) * 0.3 + 0.7)
+        diff[anti_aliased] = [255, 255, 0]
+        diff[differs] = [255, 0, 0]
+        return diff
+
+    def _has_hash(self, actual_screenshot_full_path: str, expected_sha256: str | None) -> bool:
+        if expected_sha256 is not None and file_sha256(actual_screenshot_full_path) == expected_sha256:
+            self.report.log_debug(f"{actual_screenshot_full_path} has the same content hash as the expected image")
+            return True
+        return False
+
+    def _read_adapted_images(self, expected_screenshot_full_path: str, actual_screenshot_full_path: str):
+        """Reads both images and aligns the actual image to the expected image. Returns both images and the channel axis."""
         img_expected = skimg_io.imread(expected_screenshot_full_path)
         img_actual_raw = skimg_io.imread(actual_screenshot_full_path)
         img_actual = self._align_alpha_channel_of_actual_image(img_expected, img_actual_raw)
@@ -108,15 +274,37 @@ class Images(object):
             skimg_io.imsave(actual_screenshot_full_path, img_actual, check_contrast=False)
         self.report.log_image_info("actual", img_actual)
         self.report.log_image_info("expected", img_expected)
-        img_list = []
-        if append_images:
-            img_list.append(img_expected)
-        ssim, diff_images = self._compute_ssim_and_diff(img_actual, img_expected, diff_formats, channel_axis=channel_axis)
-        if ssim < 1.0:
-            self._save_diff_image(expected_screenshot_full_path, actual_screenshot_full_path, output_path,
-                                  diff_images, img_list)
-        self.report.log_debug("SSIM: {}\n".format(ssim))
-        return ssim
+        return img_actual, img_expected, channel_axis
+
+    def _coarse_ssim(
+            self,
+            img_actual,
+            img_expected,
+            channel_axis,
+            threshold
+    ) -> tuple[float, np.ndarray, np.ndarray] | None:
+        """
+        Compares downscaled images in pyramid mode. If the SSIM clearly passes or fails the threshold,
+        returns it with the downscaled actual and expected images.
+        Returns None, if the images must be compared at full resolution.
+        """
+        if threshold is None or not config.is_ssim_pyramid():
+            return None
+        band = config.get_ssim_pyramid_band()
+        for factor in (4, 2):
+            factors = (factor, factor, 1) if channel_axis == 2 else (factor, factor)
+            # the downscaled images keep 8 bits, so that diff images can be created from them
+            small_actual = skimg_transform.downscale_local_mean(img_actual, factors).round().astype(np.uint8)
+            small_expected = skimg_transform.downscale_local_mean(img_expected, factors).round().astype(np.uint8)
+            if min(small_actual.shape[:2]) < 7:
+                # compare_ssim needs at least 7 pixels for its window
+                continue
+            ssim = self._ssim(small_actual, small_expected, channel_axis=channel_axis)
+            if ssim >= threshold + band or ssim < threshold - band:
+                self.report.log_debug(f"SSIM {ssim} at 1/{factor} resolution decided the comparison")
+                return ssim, small_actual, small_expected
+        self.report.log_debug("full resolution decides the comparison")
+        return None
 
     def _align_alpha_channel_of_actual_image(self, img_expected: np.ndarray, img_actual: np.ndarray) -> np.ndarray:
         expected_has_alpha = self._img_has_alpha(img_expected)
@@ -235,10 +423,10 @@ class Images(object):
             ssim, gradient = compare_ssim(img_actual, img_expected, channel_axis=channel_axis, gradient=True, data_range=255)
             diff_images["gradient"] = self._ssim_img_to_ubyte(gradient)
         elif "full" in diff_formats:
-            ssim, full = compare_ssim(img_actual, img_expected, channel_axis=channel_axis, full=True, data_range=255)
+            ssim, full = self._ssim(img_actual, img_expected, channel_axis=channel_axis, full=True)
             diff_images["full"] = self._ssim_img_to_ubyte(full)
         if ssim is None:
-            ssim = compare_ssim(img_actual, img_expected, channel_axis=channel_axis, data_range=255)
+            ssim = self._ssim(img_actual, img_expected, channel_axis=channel_axis)
         if ssim < 1.0 and "red" in diff_formats:
             warn("The diff_format 'red' is deprecated. please use a key value pair: 'color=red'", DeprecationWarning)
             red = self._diff_images_color(img_expected, img_actual, "red")
@@ -249,6 +437,17 @@ class Images(object):
             diff_images[color_name] = colored
         return ssim, diff_images
 
+    def _ssim(self, img1, img2, channel_axis, full=False):
+        """
+        Computes the SSIM with the configured engine, on several threads if configured.
+        The gradient is only supported by compare_ssim.
+        """
+        ssim_function = integral_ssim if config.get_ssim_engine() == "integral" else compare_ssim
+        workers = config.get_ssim_workers()
+        if workers > 1:
+            return tiled_structural_similarity(ssim_function, img1, img2, workers, channel_axis=channel_axis, full=full, data_range=255)
+        return ssim_function(img1, img2, channel_axis=channel_axis, full=full, data_range=255)
+
     def _ssim_img_to_ubyte(self, img: np.ndarray) -> np.ndarray:
         """ the returned image of *compare_ssim* has a weird format and must be converted back to uint8. """
         img = img * 0.5
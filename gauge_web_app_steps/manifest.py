@@ -0,0 +1,222 @@
+#
+# Copyright IBM Corp. 2019-
+# SPDX-License-Identifier: MIT
+#
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+import numpy as np
+
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from skimage import color as skimg_color
+from skimage import io as skimg_io
+from skimage import transform as skimg_transform
+from typing import Iterator
+
+MANIFEST_FILE_NAME = "manifest.json"
+_LOCK_FILE_NAME = ".manifest.lock"
+# a lock, that is older, was left behind by a stream, that was killed while indexing
+_LOCK_STALE_SECONDS = 600
+
+# [headless_]<browser>_<name>[_<page>].png, browser names do not contain underscores.
+# A numeric suffix is only a page, if the first page of the same baseline exists.
+_BASELINE_FILE_PATTERN = re.compile(r"^(?P<key>(?:headless_)?[^_]+)_(?P<name>.+?)(?:_(?P<page>\d+))?\.png$")
+
+
+@dataclass
+class BaselineEntry:
+    """Index data of one expected screenshot."""
+    file_name: str
+    key: str
+    name: str
+    page: int | None
+    mtime: float
+    size: int
+    width: int
+    height: int
+    channels: int
+    sha256: str
+    phash: str
+
+
+class BaselineManifest(object):
+    """
+    An index of the expected screenshots, kept as JSON file in the expected screenshot directory.
+    It spares probing the file system for every page and allows comparisons to take shortcuts,
+    f.i. when the actual screenshot has the same content hash as the baseline.
+    Only new and changed files are indexed again, when the manifest is refreshed.
+    """
+
+    def __init__(self, baseline_dir: str, entries: dict[str, BaselineEntry] = None) -> None:
+        self.baseline_dir = baseline_dir
+        self.entries = entries if entries is not None else {}
+
+    @staticmethod
+    def load(baseline_dir: str) -> "BaselineManifest":
+        """
+        Loads the manifest of the given directory and brings it up to date with the files on disk.
+        Parallel streams index the baselines only once: the first one, that finds the manifest outdated,
+        indexes them under a lock file, the others wait for it and read its manifest.
+        """
+        manifest = BaselineManifest._read(baseline_dir)
+        if not manifest.is_outdated():
+            return manifest
+        with _lock(baseline_dir):
+            manifest = BaselineManifest._read(baseline_dir)
+            if manifest.refresh():
+                manifest.save()
+        return manifest
+
+    @staticmethod
+    def _read(baseline_dir: str) -> "BaselineManifest":
+        manifest_path = os.path.join(baseline_dir, MANIFEST_FILE_NAME)
+        entries = {}
+        if os.path.isfile(manifest_path):
+            try:
+                with open(manifest_path, encoding="utf-8") as f:
+                    entries = {e["file_name"]: BaselineEntry(**e) for e in json.load(f)}
+            except (ValueError, TypeError, KeyError):
+                # a broken or outdated manifest is simply rebuilt
+                entries = {}
+        return BaselineManifest(baseline_dir, entries)
+
+    def is_outdated(self) -> bool:
+        """Whether baselines were added, changed or removed since the manifest was saved. No file is decoded."""
+        found = set()
+        for dir_entry in self._scan():
+            found.add(dir_entry.name)
+            if self._is_changed(dir_entry):
+                return True
+        return found != set(self.entries.keys())
+
+    def refresh(self) -> bool:
+        """Indexes new and changed baselines and drops removed ones. Returns True if anything changed."""
+        changed = False
+        found = set()
+        for dir_entry in self._scan():
+            found.add(dir_entry.name)
+            if self._is_changed(dir_entry):
+                self.entries[dir_entry.name] = self._index(dir_entry.path, dir_entry.stat())
+                changed = True
+        for removed in set(self.entries.keys()) - found:
+            del self.entries[removed]
+            changed = True
+        # added or removed first pages change, which files of a baseline are pages
+        for entry in self.entries.values():
+            key, name, page = _parse_file_name(entry.file_name, found)
+            if (entry.key, entry.name, entry.page) != (key, name, page):
+                entry.key, entry.name, entry.page = key, name, page
+                changed = True
+        return changed
+
+    def _scan(self) -> Iterator[os.DirEntry]:
+        with os.scandir(self.baseline_dir) as dir_entries:
+            for dir_entry in dir_entries:
+                if dir_entry.is_file() and not dir_entry.name.startswith(".") and dir_entry.name.endswith(".png"):
+                    yield dir_entry
+
+    def _is_changed(self, dir_entry: os.DirEntry) -> bool:
+        entry = self.entries.get(dir_entry.name)
+        stat = dir_entry.stat()
+        return entry is None or entry.mtime != stat.st_mtime or entry.size != stat.st_size
+
+    def save(self) -> None:
+        # parallel streams might load the manifest at the same time, so it is replaced atomically
+        handle, tmp_path = tempfile.mkstemp(prefix=".manifest", suffix=".json", dir=self.baseline_dir)
+        with os.fdopen(handle, "w", encoding="utf-8") as f:
+            json.dump([asdict(e) for e in sorted(self.entries.values(), key=lambda e: e.file_name)], f, indent=1)
+        os.replace(tmp_path, os.path.join(self.baseline_dir, MANIFEST_FILE_NAME))
+
+    def get(self, screenshot_path: str) -> BaselineEntry | None:
+        return self.entries.get(os.path.basename(screenshot_path))
+
+    def contains(self, screenshot_path: str) -> bool:
+        return self.get(screenshot_path) is not None
+
+    def page_count(self, screenshot_path: str) -> int:
+        """The number of consecutive pages, that exist for the baseline of the given page or single screenshot."""
+        entry = self.get(screenshot_path)
+        if entry is None:
+            return 0
+        pages = {e.page for e in self.entries.values() if e.key == entry.key and e.name == entry.name}
+        count = 0
+        while count + 1 in pages:
+            count += 1
+        return count
+
+    def _index(self, file_path: str, stat: os.stat_result) -> BaselineEntry:
+        file_name = os.path.basename(file_path)
+        # the page is determined, when all files are known
+        key, name, page = _parse_file_name(file_name, {file_name})
+        img = skimg_io.imread(file_path)
+        height, width = img.shape[:2]
+        channels = img.shape[2] if img.ndim == 3 else 1
+        return BaselineEntry(
+            file_name=file_name,
+            key=key,
+            name=name,
+            page=page,
+            mtime=stat.st_mtime,
+            size=stat.st_size,
+            width=width,
+            height=height,
+            channels=channels,
+            sha256=file_sha256(file_path),
+            phash=perceptual_hash(img),
+        )
+
+
+def _parse_file_name(file_name: str, file_names: set[str]) -> tuple[str, str, int | None]:
+    """The key, name and page of a baseline file, f.i. `logo_2.png` is only page 2, if `logo_1.png` exists."""
+    match = _BASELINE_FILE_PATTERN.match(file_name)
+    if match is None:
+        return "", file_name[:-len(".png")], None
+    key, name, page = match.group("key"), match.group("name"), match.group("page")
+    if page is not None and f"{key}_{name}_1.png" in file_names:
+        return key, name, int(page)
+    return key, file_name[len(key) + 1:-len(".png")], None
+
+
+@contextmanager
+def _lock(baseline_dir: str) -> Iterator[None]:
+    """An exclusive lock across processes, that works on all platforms, because the lock file is created exclusively."""
+    lock_path = os.path.join(baseline_dir, _LOCK_FILE_NAME)
+    while True:
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > _LOCK_STALE_SECONDS:
+                    os.remove(lock_path)
+                    continue
+            except FileNotFoundError:
+                continue
+            time.sleep(0.1)
+    try:
+        yield
+    finally:
+        os.remove(lock_path)
+
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def perceptual_hash(img: np.ndarray) -> str:
+    """A difference hash of 64 bits: similar images have hashes with a small hamming distance."""
+    if img.ndim == 3:
+        img = skimg_color.rgba2rgb(img) if img.shape[2] == 4 else img
+        img = skimg_color.rgb2gray(img)
+    small = skimg_transform.resize(img, (8, 9), anti_aliasing=True)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return "{:016x}".format(int("".join("1" if b else "0" for b in bits), 2))
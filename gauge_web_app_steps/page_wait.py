@@ -0,0 +1,184 @@
+#
+# Copyright IBM Corp. 2019-
+# SPDX-License-Identifier: MIT
+#
+
+import functools
+import pkgutil
+
+from dataclasses import dataclass
+from selenium.webdriver import Remote
+
+VISIBLE = "visible"
+INVISIBLE = "invisible"
+TEXT_EQUALS = "text_equals"
+TEXT_NOT_EQUALS = "text_not_equals"
+TEXT_CONTAINS = "text_contains"
+TEXT_NOT_CONTAINS = "text_not_contains"
+ATTRIBUTE_EXISTS = "attribute_exists"
+ATTRIBUTE_EQUALS = "attribute_equals"
+ATTRIBUTE_CONTAINS = "attribute_contains"
+ATTRIBUTE_NOT_CONTAINS = "attribute_not_contains"
+
+
+@dataclass
+class PageCondition:
+    """A condition on the first element of a marker, which the browser can evaluate by itself."""
+    marker: tuple[str, str]
+    kind: str
+    expected: str | None = None
+    attribute: str | None = None
+
+
+# Finds the first element of a Selenium locator in the current document, like the driver does.
+# Locators, that only Appium supports, raise an error.
+LOCATE_FUNCTION = """
+function locate(using, value) {
+    function firstLink(partial) {
+        var links = document.getElementsByTagName('a');
+        for (var i = 0; i < links.length; i++) {
+            var text = links[i].innerText.trim();
+            if (partial ? text.indexOf(value) >= 0 : text === value) { return links[i]; }
+        }
+        return null;
+    }
+    switch (using) {
+        case 'css selector': return document.querySelector(value);
+        case 'xpath': return document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        case 'tag name': return document.getElementsByTagName(value)[0] || null;
+        case 'class name': return document.getElementsByClassName(value)[0] || null;
+        case 'name': return document.getElementsByName(value)[0] || null;
+        case 'link text': return firstLink(false);
+        case 'partial link text': return firstLink(true);
+    }
+    throw new Error('unsupported locator ' + using);
+}
+"""
+
+
+# Reads the state of an element like WebDriver, shared by all scripts, that read elements.
+# Empty boolean attributes are read as "true" and colors of css properties are given as rgba, like the Selenium atoms do.
+# The text is taken from innerText, which matches the driver's visible text in most but not all cases.
+READ_FUNCTIONS = """
+var booleanAttributes = ['allowfullscreen', 'async', 'autofocus', 'autoplay', 'checked', 'controls', 'default', 'defer',
+    'disabled', 'formnovalidate', 'hidden', 'inert', 'ismap', 'itemscope', 'loop', 'multiple', 'muted', 'nomodule',
+    'novalidate', 'open', 'playsinline', 'readonly', 'required', 'reversed', 'selected'];
+var colorProperties = ['background-color', 'border-top-color', 'border-right-color', 'border-bottom-color',
+    'border-left-color', 'color', 'outline-color'];
+function readText(element) {
+    var text = element.innerText !== undefined ? element.innerText : element.textContent;
+    return text.replace(/\\u00a0/g, ' ').trim();
+}
+function readValue(element) {
+    return element.value === undefined || element.value === null ? null : String(element.value);
+}
+function readEnabled(element) {
+    return !element.matches(':disabled');
+}
+function readSelected(element) {
+    var tagName = element.localName.toLowerCase();
+    var type = (element.getAttribute('type') || '').toLowerCase();
+    var checkable = tagName === 'input' && (type === 'checkbox' || type === 'radio');
+    return tagName === 'option' ? element.selected : (checkable ? element.checked : false);
+}
+function readFocused(element) {
+    return element.getRootNode().activeElement === element;
+}
+function readAttribute(element, name) {
+    var value = element.getAttribute(name);
+    return value !== null && booleanAttributes.indexOf(name.toLowerCase()) >= 0 ? 'true' : value;
+}
+function readCssProperty(element, name) {
+    var value = window.getComputedStyle(element).getPropertyValue(name);
+    var rgb = colorProperties.indexOf(name) >= 0 ? /^rgb\\((\\d+), (\\d+), (\\d+)\\)$/.exec(value) : null;
+    return rgb !== null ? 'rgba(' + rgb[1] + ', ' + rgb[2] + ', ' + rgb[3] + ', 1)' : value;
+}
+"""
+
+
+# Resolves with true as soon as the condition holds, with false after the timeout
+# and with null, if the condition can not be evaluated in the page, f.i. because of an unsupported locator.
+# The condition is checked in the next animation frame after DOM mutations. Changes without mutations,
+# like typed input values or style sheet animations, are caught by a slower interval.
+_PAGE_CONDITION_SCRIPT = LOCATE_FUNCTION + """
+var using = arguments[0][0];
+var value = arguments[0][1];
+var kind = arguments[1];
+var expected = arguments[2];
+var attribute = arguments[3];
+var timeoutMillis = arguments[4];
+var done = arguments[arguments.length - 1];
+var finished = false;
+var scheduled = false;
+var observer = null;
+var interval = null;
+function finish(result) {
+    if (finished) { return; }
+    finished = true;
+    if (observer) { observer.disconnect(); }
+    clearInterval(interval);
+    done(result);
+}
+function visible(element) {
+    var style = window.getComputedStyle(element);
+    return element.getClientRects().length > 0 && style.visibility !== 'hidden' && style.opacity !== '0';
+}
+function text(element) {
+    return element.tagName.toLowerCase() === 'input' ? element.value : element.innerText;
+}
+function holds() {
+    var element = locate(using, value);
+    switch (kind) {
+        case 'visible': return element !== null && visible(element);
+        case 'invisible': return element === null || !visible(element);
+    }
+    if (element === null) { return false; }
+    var found = attribute === null ? text(element) : element.getAttribute(attribute);
+    switch (kind) {
+        case 'text_equals': case 'attribute_equals': return found === expected;
+        case 'text_not_equals': return found !== expected;
+        case 'text_contains': case 'attribute_contains': return found !== null && found.indexOf(expected) >= 0;
+        case 'text_not_contains': case 'attribute_not_contains': return found !== null && found.indexOf(expected) < 0;
+        case 'attribute_exists': return found !== null;
+    }
+    throw new Error('unsupported condition ' + kind);
+}
+function check() {
+    scheduled = false;
+    if (finished) { return; }
+    try {
+        if (holds()) { finish(true); }
+    } catch (e) {
+        finish(null);
+    }
+}
+function schedule() {
+    if (!scheduled) {
+        scheduled = true;
+        window.requestAnimationFrame(check);
+    }
+}
+check();
+if (!finished) {
+    observer = new MutationObserver(schedule);
+    observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    interval = setInterval(check, 100);
+    setTimeout(function() { finish(false); }, timeoutMillis);
+}
+"""
+
+
+@functools.cache
+def is_displayed_atom() -> str:
+    """Selenium's JavaScript function, that decides whether an element is displayed."""
+    return pkgutil.get_data("selenium", "webdriver/remote/isDisplayed.js").decode("utf8")
+
+
+def await_in_page(driver: Remote, condition: PageCondition, timeout: float) -> bool | None:
+    """
+    Waits inside the browser until the condition holds. Returns True as soon as it holds, False after the timeout,
+    and None, if the browser can not evaluate the condition.
+    WebDriver errors are raised, f.i. when the script timeout is shorter than the timeout or the page is left.
+    """
+    return driver.execute_async_script(
+        _PAGE_CONDITION_SCRIPT, list(condition.marker), condition.kind, condition.expected, condition.attribute, int(timeout * 1000))
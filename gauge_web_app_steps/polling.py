@@ -0,0 +1,118 @@
+#
+# Copyright IBM Corp. 2019-
+# SPDX-License-Identifier: MIT
+#
+
+import random
+import time
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Callable, Iterator, TypeVar
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+T = TypeVar('T')
+
+
+class PollingStrategy(ABC):
+    """Determines the intervals between the checks of a condition."""
+
+    @abstractmethod
+    def intervals(self) -> Iterator[float]:
+        pass
+
+
+class FixedPolling(PollingStrategy):
+    """Checks the condition in constant intervals."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+
+    def intervals(self) -> Iterator[float]:
+        while True:
+            yield self.interval
+
+
+class ExponentialPolling(PollingStrategy):
+    """Starts with a short interval, which is doubled after each check, up to a maximum."""
+
+    def __init__(self, initial_interval: float, max_interval: float, factor: float = 2.0) -> None:
+        self.initial_interval = min(initial_interval, max_interval)
+        self.max_interval = max_interval
+        self.factor = factor
+
+    def intervals(self) -> Iterator[float]:
+        interval = self.initial_interval
+        while True:
+            yield interval
+            interval = min(interval * self.factor, self.max_interval)
+
+
+class JitteredPolling(ExponentialPolling):
+    """
+    Like the exponential strategy, but each interval is randomly shortened.
+    Parallel streams, that wait for the same remote grid, do not send their checks at the same time.
+    """
+
+    def intervals(self) -> Iterator[float]:
+        for interval in super().intervals():
+            yield random.uniform(self.initial_interval, interval)
+
+
+POLLING_STRATEGIES = ("fixed", "exponential", "jittered")
+
+
+def create_polling_strategy(name: str, interval: float, initial_interval: float) -> PollingStrategy:
+    """Creates a strategy by its name. The interval is the fixed or the maximum interval."""
+    if name == "fixed":
+        return FixedPolling(interval)
+    if name == "exponential":
+        return ExponentialPolling(initial_interval, interval)
+    if name == "jittered":
+        return JitteredPolling(initial_interval, interval)
+    raise ValueError(f"unknown polling strategy '{name}', expected one of {', '.join(POLLING_STRATEGIES)}")
+
+
+@dataclass
+class PollStats:
+    """How often a condition was checked, how long it was waited for in total and how much of it the checks took."""
+    polls: int = 0
+    waited: float = 0.0
+    checking: float = 0.0
+
+
+def poll(
+        condition: Callable[[], T],
+        timeout: float,
+        strategy: PollingStrategy,
+        message: str = "",
+        stats: PollStats = None
+) -> T:
+    """
+    Checks the condition until it returns a truthy value, which is returned, or the timeout is reached.
+    The condition is checked at least once. WebDriver errors count as unmet condition, like with *WebDriverWait*.
+    """
+    stats = stats if stats is not None else PollStats()
+    start = time.monotonic()
+    end = start + timeout
+    screen = None
+    stacktrace = None
+    for interval in strategy.intervals():
+        stats.polls += 1
+        check_start = time.monotonic()
+        try:
+            value = condition()
+            if value:
+                return value
+        except WebDriverException as e:
+            screen = getattr(e, "screen", None)
+            stacktrace = getattr(e, "stacktrace", None)
+        finally:
+            now = time.monotonic()
+            stats.checking += now - check_start
+            stats.waited = now - start
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            break
+        time.sleep(min(interval, remaining))
+    raise TimeoutException(message, screen, stacktrace)
@@ -47,6 +47,9 @@ class Report(object):
         Include an image into the gauge report.
         The relative path from the report to the image will be used in the created html.
         """
+        if self.context is None:
+            # outside of a spec, f.i. in deferred comparisons, there is no report to include the image into
+            return
         spec_report_dir = self._spec_html_report_dir()
         rel_path_report_to_image = os.path.relpath(image_file_path, spec_report_dir)
         html_rel_path = rel_path_report_to_image.replace('\\', '/')
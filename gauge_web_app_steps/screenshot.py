@@ -3,22 +3,44 @@
 # SPDX-License-Identifier: MIT
 #
 
+import base64
+import imageio.v3 as iio
+import io
+import numpy as np
 import os
+import tempfile
 import time
 
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from getgauge.python import data_store
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver import Remote
-from typing import Iterable
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.remote.webelement import WebElement
+from skimage import img_as_ubyte
+from skimage import io as skimg_io
+from skimage import transform as skimg_transform
+from typing import Callable, Iterable
 
-from .app_context import app_context_key
+from .app_context import app_context_key, step_context_key
 from .config import common_config as config
+from .deferred_comparison import DeferredComparison, deferred_comparisons
+from .driver import Browser
 from .imagepaths import ImagePath
 from .images import Images
+from .keymapper import KeyMapper
+from .manifest import file_sha256
+from .report import Report
+from .verdict_cache import verdict_cache
+
+# appends the failures of comparing an expected and an actual screenshot with a threshold and optionally the expected hash
+Comparator = Callable[[list, str, str, float, str | None], float | None]
 
 
 def create_screenshot(image_file_name: str) -> str:
     screenshot_file_path = _image_path().create_screenshot_file_path(image_file_name)
-    _driver().save_screenshot(screenshot_file_path)
+    _save_screenshot(screenshot_file_path)
     return screenshot_file_path
 
 
@@ -28,58 +50,383 @@ def create_failure_screenshot() -> str:
     return screenshot_path
 
 
-def ssim_screenshot_noscrolling(image_file_name: str, threshold: float) -> Iterable[str]:
-    failed_asserts = []
-    actual_screenshot_full_path = _image_path().create_actual_screenshot_file_path(image_file_name)
-    _driver().save_full_page_screenshot(actual_screenshot_full_path)
-    expected_screenshot_full_path = _image_path().create_expected_screenshot_file_path(image_file_name)
-    if not os.path.isfile(expected_screenshot_full_path):
-        failed_asserts.append("screenshot {} does not exist".format(expected_screenshot_full_path))
+def create_full_page_screenshot(image_file_name: str) -> str:
+    screenshot_file_path = _image_path().create_screenshot_file_path(image_file_name)
+    save_full_page_screenshot(screenshot_file_path)
+    return screenshot_file_path
+
+
+def is_full_page_screenshot_supported() -> bool:
+    """
+    Whether a screenshot of the whole page can be taken without scrolling.
+    Firefox supports it natively, Chromium based browsers via the Chrome DevTools Protocol.
+    """
+    if not config.is_whole_page_screenshot():
+        return False
+    browser = config.get_browser()
+    if browser == Browser.FIREFOX:
+        return True
+    # remote drivers do not offer the Chrome DevTools Protocol
+    return browser.is_chromium() and hasattr(_driver(), "execute_cdp_cmd")
+
+
+def save_full_page_screenshot(screenshot_file_path: str) -> None:
+    if config.get_browser() == Browser.FIREFOX:
+        png = _driver().get_full_page_screenshot_as_png()
     else:
-        append_structured_similarity(failed_asserts, expected_screenshot_full_path, actual_screenshot_full_path, threshold)
+        png = _chromium_full_page_screenshot_as_png()
+    with open(screenshot_file_path, "wb") as screenshot_file:
+        screenshot_file.write(_to_css_pixels(png))
+
+
+def _chromium_full_page_screenshot_as_png() -> bytes:
+    metrics = _driver().execute_cdp_cmd("Page.getLayoutMetrics", {})
+    # cssContentSize is reported by newer browser versions, contentSize is deprecated
+    content_size = metrics.get("cssContentSize", metrics.get("contentSize"))
+    screenshot = _driver().execute_cdp_cmd("Page.captureScreenshot", {
+        "format": "png",
+        "captureBeyondViewport": True,
+        "clip": {
+            "x": 0,
+            "y": 0,
+            "width": content_size["width"],
+            "height": content_size["height"],
+            "scale": 1,
+        },
+    })
+    return base64.b64decode(screenshot["data"])
+
+
+def ssim_screenshot_noscrolling(image_file_name: str, threshold: float, compare: Comparator = None) -> Iterable[str]:
+    failed_asserts = []
+    actual_screenshot_full_path = _capture(image_file_name, None, save_full_page_screenshot)
+    _compare(failed_asserts, image_file_name, None, actual_screenshot_full_path, threshold, compare)
     return failed_asserts
 
 
-def ssim_screenshot_scrolling(image_file_name: str, threshold: float) -> Iterable[str]:
+class FailureBudget(object):
+    """
+    Decides when a multi-page screenshot assertion should stop early:
+    after a maximum number of failed pages, or when a page falls below a hard SSIM floor.
+    """
+
+    def __init__(self, max_failed_pages: int, ssim_floor: float) -> None:
+        self.max_failed_pages = max_failed_pages
+        self.ssim_floor = ssim_floor
+        self.failed_pages = 0
+
+    @staticmethod
+    def from_config() -> "FailureBudget":
+        return FailureBudget(config.get_max_failed_pages(), config.get_ssim_floor())
+
+    def is_exceeded(self, page_failed: bool, ssim: float | None) -> bool:
+        if page_failed:
+            self.failed_pages += 1
+        if 0 < self.max_failed_pages <= self.failed_pages:
+            return True
+        return ssim is not None and ssim < self.ssim_floor
+
+
+def ssim_screenshot_scrolling(image_file_name: str, threshold: float, compare: Comparator = None) -> Iterable[str]:
     failed_asserts = []
+    budget = FailureBudget.from_config()
     postfix = 1
     should_continue = True
     while should_continue:
-        actual_screenshot_full_path = _image_path().create_actual_screenshot_file_path(image_file_name, postfix)
-        _driver().save_screenshot(actual_screenshot_full_path)
-        expected_screenshot_full_path = _image_path().create_expected_screenshot_file_path(image_file_name, postfix)
+        actual_screenshot_full_path = _capture(image_file_name, postfix, _save_screenshot)
         should_continue = _scroll() and postfix <= 32
+        failures_before = len(failed_asserts)
+        ssim = _compare(failed_asserts, image_file_name, postfix, actual_screenshot_full_path, threshold, compare)
+        if should_continue and budget.is_exceeded(len(failed_asserts) > failures_before, ssim):
+            failed_asserts.append(f"failure budget exceeded on page {postfix}, the remaining pages were skipped")
+            break
         postfix += 1
-        if not os.path.isfile(expected_screenshot_full_path):
-            failed_asserts.append("screenshot {} does not exist".format(expected_screenshot_full_path))
-        else:
-            append_structured_similarity(failed_asserts, expected_screenshot_full_path, actual_screenshot_full_path, threshold)
+    else:
+        _check_page_count(failed_asserts, image_file_name, postfix - 1)
+    return failed_asserts
+
+
+def _check_page_count(failed_asserts: list, image_file_name: str, captured_pages: int) -> None:
+    """Reports baseline pages, that were not reached by scrolling. This is only known from the baseline manifest."""
+    manifest = _image_path().baseline_manifest()
+    if manifest is None:
+        return
+    expected_pages = manifest.page_count(_image_path().create_expected_screenshot_file_path(image_file_name, 1))
+    if expected_pages > captured_pages:
+        failed_asserts.append(f"the baseline has {expected_pages} pages, but only {captured_pages} pages were captured")
+
+
+def ssim_screenshot_pages(image_file_name: str, threshold: float, pages: int) -> Iterable[str]:
+    """
+    Takes screenshots of the given number of pages, while scrolling with the PAGE_DOWN key.
+    This is meant for front-end frameworks, which do not support scrolling by Javascript.
+    """
+    failed_asserts = []
+    budget = FailureBudget.from_config()
+    page_down = KeyMapper.map_keys("PAGE_DOWN")
+    for page in range(1, pages + 1):
+        actual_screenshot_full_path = _capture(image_file_name, page, _save_screenshot)
+        ActionChains(_driver()).send_keys(page_down).perform()
+        settle_scrolling()
+        failures_before = len(failed_asserts)
+        ssim = _compare(failed_asserts, image_file_name, page, actual_screenshot_full_path, threshold)
+        if page < pages and budget.is_exceeded(len(failed_asserts) > failures_before, ssim):
+            failed_asserts.append(f"failure budget exceeded on page {page}, pages {page + 1}-{pages} were skipped")
+            break
     return failed_asserts
 
 
-def append_structured_similarity(asserts: list, expected_screenshot: str, actual_screenshot: str, threshold: float) -> Iterable[str]:
+def ssim_screenshot_of_element(
+        image_file_name: str,
+        location: dict,
+        size: dict,
+        pixel_ratio: int,
+        viewport_offset: int,
+        threshold: float,
+        compare: Comparator = None
+) -> Iterable[str]:
+    failed_asserts = []
+    def save_cropped_screenshot(screenshot_file_path: str) -> None:
+        _save_screenshot(screenshot_file_path)
+        crop_image(screenshot_file_path, location, size, pixel_ratio, viewport_offset)
+    actual_screenshot_full_path = _capture(image_file_name, None, save_cropped_screenshot)
+    _compare(failed_asserts, image_file_name, None, actual_screenshot_full_path, threshold, compare)
+    return failed_asserts
+
+
+@dataclass
+class RegionAssertion:
+    """An element, whose screenshot is compared to a baseline, as part of a batch of regions."""
+    element: WebElement
+    image_file_name: str
+    threshold: float
+
+
+# Returns the geometry of all elements at once, which spares several round trips per element
+_REGIONS_GEOMETRY_SCRIPT = """
+var rects = [];
+for (var i = 0; i < arguments.length; i++) {
+    var rect = arguments[i].getBoundingClientRect();
+    rects.push({x: rect.left + window.pageXOffset, y: rect.top + window.pageYOffset, width: rect.width, height: rect.height});
+}
+return {pixelRatio: window.devicePixelRatio, viewportOffset: window.pageYOffset, rects: rects};
+"""
+
+
+def ssim_screenshots_of_regions(regions: list[RegionAssertion]) -> Iterable[str]:
+    """
+    Takes one screenshot, crops the regions of all elements out of it and compares them in parallel.
+    The elements must be visible in the current viewport.
+    """
+    geometry = _driver().execute_script(_REGIONS_GEOMETRY_SCRIPT, *[region.element for region in regions])
+    pixel_ratio = 1 if config.is_css_pixel_screenshots() else int(geometry["pixelRatio"])
+    viewport_offset = int(geometry["viewportOffset"])
+    screenshot = skimg_io.imread(io.BytesIO(_screenshot_as_png()))
+
+    def assert_region(region: RegionAssertion, rect: dict) -> list[str]:
+        failed_asserts = []
+        location = {"x": rect["x"], "y": rect["y"]}
+        size = {"width": rect["width"], "height": rect["height"]}
+        cropped = _images().crop_image(screenshot, location, size, pixel_ratio, viewport_offset)
+        def save_cropped_screenshot(screenshot_file_path: str) -> None:
+            skimg_io.imsave(screenshot_file_path, cropped, check_contrast=False)
+        actual_screenshot_full_path = _capture(region.image_file_name, None, save_cropped_screenshot)
+        _compare(failed_asserts, region.image_file_name, None, actual_screenshot_full_path, region.threshold)
+        return failed_asserts
+
+    # one thread per region, but not more than there are cores to compare on
+    with ThreadPoolExecutor(max_workers=max(1, min(len(regions), os.cpu_count() or 1))) as executor:
+        results = list(executor.map(assert_region, regions, geometry["rects"]))
+    return [failed_assert for failed_asserts in results for failed_assert in failed_asserts]
+
+
+def _save_screenshot(screenshot_file_path: str) -> None:
+    """
+    Saves a screenshot of the viewport. It is taken when rendering has settled, if a stable capture is configured,
+    and downsampled to CSS pixels, if configured.
+    """
+    if config.get_stable_capture_timeout() <= 0 and not config.is_css_pixel_screenshots():
+        _driver().save_screenshot(screenshot_file_path)
+        return
+    with open(screenshot_file_path, "wb") as screenshot_file:
+        screenshot_file.write(_screenshot_as_png())
+
+
+def _screenshot_as_png() -> bytes:
+    timeout = config.get_stable_capture_timeout()
+    png = _driver().get_screenshot_as_png() if timeout <= 0 else _stable_screenshot_as_png(timeout)
+    return _to_css_pixels(png)
+
+
+def _to_css_pixels(png: bytes) -> bytes:
+    """Downsamples a screenshot of a HiDPI display, so that it has one pixel per CSS pixel, if configured."""
+    if not config.is_css_pixel_screenshots():
+        return png
+    # Chromium based browsers already render at a device scale factor of 1, unless a new window was opened
+    pixel_ratio = _driver().execute_script("return window.devicePixelRatio")
+    if not pixel_ratio or pixel_ratio <= 1:
+        return png
+    img = skimg_io.imread(io.BytesIO(png))
+    if float(pixel_ratio).is_integer():
+        factors = (int(pixel_ratio), int(pixel_ratio), 1) if img.ndim == 3 else (int(pixel_ratio), int(pixel_ratio))
+        downsampled = skimg_transform.downscale_local_mean(img, factors)
+        downsampled = np.round(downsampled).astype(np.uint8)
+    else:
+        channel_axis = 2 if img.ndim == 3 else None
+        downsampled = img_as_ubyte(skimg_transform.rescale(img, 1 / pixel_ratio, channel_axis=channel_axis, anti_aliasing=True))
+    _report().log_debug(f"downsampled screenshot by pixel ratio {pixel_ratio}")
+    return iio.imwrite("<bytes>", downsampled, extension=".png")
+
+
+def _stable_screenshot_as_png(timeout: float) -> bytes:
+    """
+    Takes screenshots until two successive ones are equal or the timeout is reached.
+    Two screenshots are equal, if their PNG data is identical, so that even a blinking caret or a single late glyph counts.
+    """
+    deadline = time.monotonic() + timeout
+    previous = _driver().get_screenshot_as_png()
+    captures = 1
+    while time.monotonic() < deadline:
+        current = _driver().get_screenshot_as_png()
+        captures += 1
+        if current == previous:
+            _report().log_debug(f"rendering settled after {captures} screenshots")
+            return current
+        previous = current
+    _report().log_debug(f"rendering did not settle within {timeout}s and {captures} screenshots")
+    return previous
+
+
+def _capture(image_file_name: str, postfix: int | None, save: Callable[[str], None]) -> str | None:
+    """
+    Saves a screenshot into the actual screenshot directory and returns its path.
+    When baselines are updated, the screenshot replaces the expected screenshot instead and None is returned.
+    """
+    if config.is_update_baselines():
+        expected_screenshot_full_path = _image_path().create_expected_screenshot_file_path(image_file_name, postfix)
+        _replace_atomically(expected_screenshot_full_path, save)
+        _report().log(f"updated baseline {expected_screenshot_full_path}")
+        return None
+    actual_screenshot_full_path = _image_path().create_actual_screenshot_file_path(image_file_name, postfix)
+    save(actual_screenshot_full_path)
+    return actual_screenshot_full_path
+
+
+def _replace_atomically(file_path: str, save: Callable[[str], None]) -> None:
+    """Saves into a temporary file first, so that a parallel reader never sees a partially written file."""
+    # the suffix is kept, because the drivers check it before they save a screenshot
+    handle, tmp_file_path = tempfile.mkstemp(prefix=".", suffix=".png", dir=os.path.dirname(file_path))
+    os.close(handle)
+    try:
+        save(tmp_file_path)
+        os.replace(tmp_file_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_file_path):
+            os.remove(tmp_file_path)
+        raise
+
+
+def _compare(
+        failed_asserts: list,
+        image_file_name: str,
+        postfix: int | None,
+        actual_screenshot_full_path: str | None,
+        threshold: float,
+        compare: Comparator = None
+) -> float | None:
+    """
+    Compares the actual screenshot to its baseline with the given comparator, which is SSIM by default.
+    Returns the SSIM, if there is one.
+    """
+    if actual_screenshot_full_path is None:
+        # the baseline has been updated, there is nothing to compare
+        return None
+    expected_screenshot_full_path = _image_path().create_expected_screenshot_file_path(image_file_name, postfix)
+    if not _image_path().expected_screenshot_exists(expected_screenshot_full_path):
+        failed_asserts.append("screenshot {} does not exist".format(expected_screenshot_full_path))
+        return None
+    baseline = _image_path().expected_screenshot_entry(expected_screenshot_full_path)
+    expected_sha256 = baseline.sha256 if baseline is not None else None
+    compare = compare or append_structured_similarity
+    return compare(failed_asserts, expected_screenshot_full_path, actual_screenshot_full_path, threshold, expected_sha256)
+
+
+def append_structured_similarity(
+        asserts: list,
+        expected_screenshot: str,
+        actual_screenshot: str,
+        threshold: float,
+        expected_sha256: str = None
+) -> float | None:
+    """
+    Compares the screenshots and appends a message to the asserts, if the SSIM is below the threshold.
+    Returns the SSIM or None, if the comparison is deferred to the end of the suite.
+    """
     diff_formats = config.get_diff_formats()
-    ssim = _images().adapt_and_compare_images(expected_screenshot, actual_screenshot, diff_formats)
+    if config.is_deferred_comparison():
+        _defer_comparison(expected_screenshot, actual_screenshot, threshold, diff_formats)
+        return None
+    ssim = _compare_images(expected_screenshot, actual_screenshot, diff_formats, threshold, expected_sha256)
     if ssim < threshold:
         asserts.append("SSIM {} is less than threshold {} for {}".format(ssim, threshold, actual_screenshot))
+    return ssim
 
 
-def get_structured_similarity_to_expected(image_file_name: str, location: int, size: int, pixel_ratio: int, viewport_offset: int):
+def append_pixel_difference(
+        asserts: list,
+        expected_screenshot: str,
+        actual_screenshot: str,
+        tolerance: float,
+        expected_sha256: str = None
+) -> None:
     """
-    Get the structured similarity of a croped screenshot to an existing one.
+    Compares the screenshots pixel by pixel and appends a message to the asserts,
+    if the percentage of differing pixels exceeds the tolerance.
+    Returns None, because there is no SSIM to stop multi-page assertions early.
     """
-    actual_screenshot_full_path = _image_path().create_actual_screenshot_file_path(image_file_name)
-    _driver().save_screenshot(actual_screenshot_full_path)
-    crop_image(
-        actual_screenshot_full_path,
-        location,
-        size,
-        pixel_ratio,
-        viewport_offset
-    )
-    expected_screenshot_full_path = _image_path().create_expected_screenshot_file_path(image_file_name)
-    diff_formats = config.get_diff_formats()
-    return _images().adapt_and_compare_images(expected_screenshot_full_path, actual_screenshot_full_path, diff_formats)
+    difference = _images().adapt_and_compare_pixels(
+        expected_screenshot, actual_screenshot, config.get_diff_formats(), expected_sha256=expected_sha256)
+    if difference > tolerance:
+        asserts.append("{}% of the pixels differ, which is more than the tolerance of {}% for {}".format(difference, tolerance, actual_screenshot))
+    return None
+
+
+def _defer_comparison(expected_screenshot: str, actual_screenshot: str, threshold: float, diff_formats: str) -> None:
+    exe_ctx = data_store.scenario.get(step_context_key)
+    comparison = DeferredComparison(expected_screenshot, actual_screenshot, threshold, diff_formats)
+    if exe_ctx is not None:
+        comparison.spec = exe_ctx.specification.name if exe_ctx.specification else ""
+        comparison.scenario = exe_ctx.scenario.name if exe_ctx.scenario else ""
+        comparison.step = exe_ctx.step.text if exe_ctx.step else ""
+    deferred_comparisons().register(comparison)
+    _report().log_debug(f"deferred comparison of {actual_screenshot} to the end of the suite")
+
+
+def _compare_images(
+        expected_screenshot: str,
+        actual_screenshot: str,
+        diff_formats: str,
+        threshold: float = None,
+        expected_sha256: str = None
+) -> float:
+    """
+    Compares the screenshots or takes the SSIM from the verdict cache, if both were compared before.
+    Cached scores below the threshold are computed again, so that the diff images are created.
+    """
+    cache = verdict_cache()
+    if cache is None:
+        return _images().adapt_and_compare_images(
+            expected_screenshot, actual_screenshot, diff_formats, expected_sha256=expected_sha256, threshold=threshold)
+    # the actual screenshot might be rescaled during the comparison, so its hash is taken before
+    key = (expected_sha256 or file_sha256(expected_screenshot), file_sha256(actual_screenshot), _images().comparison_key(threshold))
+    ssim = cache.get(*key)
+    if ssim is not None and (threshold is None or ssim >= threshold):
+        _report().log_debug(f"cached SSIM {ssim} for {actual_screenshot}")
+        return ssim
+    ssim = _images().adapt_and_compare_images(
+        expected_screenshot, actual_screenshot, diff_formats, expected_sha256=key[0], threshold=threshold)
+    cache.put(*key, ssim)
+    return ssim
 
 
 def crop_image(screenshot_path: str, location: int, size: int, pixel_ratio: int, viewport_offset: int):
@@ -91,32 +438,86 @@ def crop_image(screenshot_path: str, location: int, size: int, pixel_ratio: int,
         viewport_offset
     )
 
-def _scroll() -> int:
+# Resolves with the page offsets before and after scrolling, as soon as the browser reports the end of the scroll
+# or the offset did not change for a number of animation frames. The maximum wait time is a safety cap.
+_SCROLL_SETTLE_SCRIPT = """
+var scrollByViewport = arguments[0];
+var maxWaitMillis = arguments[1];
+var requiredStableFrames = arguments[2];
+var done = arguments[arguments.length - 1];
+var before = window.pageYOffset;
+var finished = false;
+var lastOffset = null;
+var stableFrames = 0;
+function finish() {
+    if (finished) { return; }
+    finished = true;
+    window.removeEventListener('scrollend', finish);
+    done([before, window.pageYOffset]);
+}
+function onFrame() {
+    if (finished) { return; }
+    var offset = window.pageYOffset;
+    stableFrames = offset === lastOffset ? stableFrames + 1 : 0;
+    lastOffset = offset;
+    if (stableFrames >= requiredStableFrames) {
+        finish();
+    } else {
+        window.requestAnimationFrame(onFrame);
+    }
+}
+window.addEventListener('scrollend', finish);
+setTimeout(finish, maxWaitMillis);
+if (scrollByViewport) {
+    window.scrollBy(0, window.innerHeight);
+}
+window.requestAnimationFrame(onFrame);
+"""
+
+
+def _scroll(max_wait: float = None) -> bool:
     """
     Scrolls down the size of the current window height and returns True, if scrolling down is still possible
     (The page is not ended yet)
     """
-    current_offset: int = _driver().execute_script("return window.pageYOffset")
-    _driver().execute_script("window.scrollBy(0, window.innerHeight)")
-    wait_time = config.get_scroll_wait_time()
-    time.sleep(wait_time)
-    after_scroll_offset: int = _driver().execute_script("return window.pageYOffset")
+    current_offset, after_scroll_offset = settle_scrolling(scroll=True, max_wait=max_wait)
     return after_scroll_offset > current_offset
 
-def create_actual_screenshot_file_path(image_file_name: str, page: int) -> str:
-    path = _image_path().create_actual_screenshot_file_path(image_file_name, page)
-    _driver().save_screenshot(path)
-    return path
 
-
-def create_expected_screenshot_file_path(image_file_name: str, page: int) -> str:
-    return _image_path().create_expected_screenshot_file_path(image_file_name, page)
+def settle_scrolling(scroll: bool = False, max_wait: float = None) -> tuple[int, int]:
+    """
+    Optionally scrolls down by the window height and waits until scrolling has come to an end.
+    The configured scroll wait time is the maximum time to wait.
+    Returns the page offsets before and after scrolling.
+    """
+    wait_time = config.get_scroll_wait_time() if max_wait is None else max_wait
+    # the offset before scrolling tells, whether a failed script has scrolled already
+    before_offset = _driver().execute_script("return window.pageYOffset") if scroll else None
+    try:
+        current_offset, after_scroll_offset = _driver().execute_async_script(
+            _SCROLL_SETTLE_SCRIPT, scroll, int(wait_time * 1000), config.get_scroll_stable_frames())
+    except WebDriverException as e:
+        # some drivers do not support asynchronous scripts or the scrollend event
+        _report().log_debug(f"waiting {wait_time}s for scrolling, because the scroll detection failed: {e}")
+        current_offset = _driver().execute_script("return window.pageYOffset")
+        if scroll and not isinstance(e, TimeoutException) and current_offset == before_offset:
+            _driver().execute_script("window.scrollBy(0, window.innerHeight)")
+        elif scroll:
+            # the script has started and scrolled, scrolling again would skip a part of the page
+            current_offset = before_offset
+        time.sleep(wait_time)
+        after_scroll_offset = _driver().execute_script("return window.pageYOffset")
+    return current_offset, after_scroll_offset
 
 
 def _driver() -> Remote:
     return data_store.spec[app_context_key].driver
 
 
+def _report() -> Report:
+    return data_store.spec[app_context_key].report
+
+
 def _image_path() -> ImagePath:
     return data_store.spec[app_context_key].image_path
 
@@ -0,0 +1,139 @@
+#
+# Copyright IBM Corp. 2019-
+# SPDX-License-Identifier: MIT
+#
+
+import numexpr
+import numpy as np
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+K1 = 0.01
+K2 = 0.03
+
+# the number of squared 8 bit values, whose sum still fits into an int32
+_INT32_MAX_SQUARES = np.iinfo(np.int32).max // (255 * 255)
+
+# smaller tiles would spend more time on their halos than on their own rows
+MIN_TILE_ROWS = 128
+
+
+def structural_similarity(
+        im1: np.ndarray,
+        im2: np.ndarray,
+        win_size: int = 7,
+        data_range: float = 255,
+        channel_axis: int = None,
+        full: bool = False
+):
+    """
+    Computes the SSIM with a uniform window like skimage's *structural_similarity* with its default parameters,
+    i.e. with sample covariances and the image mirrored at its borders.
+    The windowed sums are computed from summed-area tables (integral images),
+    so they cost the same for every pixel, regardless of the window size.
+    Returns the mean SSIM and, if full is True, also the SSIM image.
+    """
+    if im1.shape != im2.shape:
+        raise ValueError("Input images must have the same dimensions.")
+    if channel_axis is not None:
+        # all channels are processed at once, the channel axis becomes the last one
+        im1 = np.moveaxis(im1, channel_axis, -1)
+        im2 = np.moveaxis(im2, channel_axis, -1)
+    if win_size % 2 == 0 or min(im1.shape[:2]) < win_size:
+        raise ValueError(f"win_size must be odd and not exceed the image size, but it is {win_size}")
+    pad = win_size // 2
+    if full:
+        pad_width = ((pad, pad), (pad, pad)) + ((0, 0),) * (im1.ndim - 2)
+        im1 = np.pad(im1, pad_width, mode="symmetric")
+        im2 = np.pad(im2, pad_width, mode="symmetric")
+    # without the full image, only the pixels are computed, that are not influenced by the mirrored border
+    s = _ssim_image(im1, im2, win_size, data_range)
+    mssim = float(s[pad:-pad, pad:-pad].mean()) if full else float(s.mean())
+    if not full:
+        return mssim
+    if channel_axis is not None:
+        s = np.moveaxis(s, -1, channel_axis)
+    return mssim, s
+
+
+def _ssim_image(im1: np.ndarray, im2: np.ndarray, win_size: int, data_range: float) -> np.ndarray:
+    dtype = _sum_dtype(im1, im2, win_size)
+    x = im1.astype(dtype, copy=False)
+    y = im2.astype(dtype, copy=False)
+    sx = _window_sums(x, win_size, dtype)
+    sy = _window_sums(y, win_size, dtype)
+    sxx = _window_sums(x * x, win_size, dtype)
+    syy = _window_sums(y * y, win_size, dtype)
+    sxy = _window_sums(x * y, win_size, dtype)
+    n = float(win_size ** 2)
+    # the sums are converted to means first, so that integer sums can not overflow in the products
+    return numexpr.evaluate(
+        "((2 * (sx / n) * (sy / n) + c1) * (2 * cov_norm * (sxy / n - (sx / n) * (sy / n)) + c2))"
+        " / (((sx / n) ** 2 + (sy / n) ** 2 + c1)"
+        " * (cov_norm * (sxx / n - (sx / n) ** 2 + syy / n - (sy / n) ** 2) + c2))",
+        local_dict={
+            "sx": sx, "sy": sy, "sxx": sxx, "syy": syy, "sxy": sxy, "n": n,
+            "cov_norm": n / (n - 1.0),  # sample covariance, like skimage
+            "c1": (K1 * data_range) ** 2,
+            "c2": (K2 * data_range) ** 2,
+        })
+
+
+def _sum_dtype(im1: np.ndarray, im2: np.ndarray, win_size: int) -> type:
+    """8 bit images are summed up exactly, in int32 as long as they are small enough. Others in double precision."""
+    if im1.dtype == np.uint8 and im2.dtype == np.uint8:
+        # columns are summed up over the whole height, rows over the whole width of the window sums
+        fits_int32 = im1.shape[0] <= _INT32_MAX_SQUARES and im1.shape[1] * win_size <= _INT32_MAX_SQUARES
+        return np.int32 if fits_int32 else np.int64
+    return np.float64
+
+
+def _window_sums(img: np.ndarray, win_size: int, dtype: type) -> np.ndarray:
+    """The sums of all complete windows. The summed-area table is built separably, first along columns, then rows."""
+    cumulated = np.cumsum(img, axis=0, dtype=dtype)
+    rows = cumulated[win_size - 1:].copy()
+    rows[1:] -= cumulated[:-win_size]
+    np.cumsum(rows, axis=1, out=rows)
+    sums = rows[:, win_size - 1:].copy()
+    sums[:, 1:] -= rows[:, :-win_size]
+    return sums
+
+
+def tiled_structural_similarity(
+        ssim_function: Callable,
+        im1: np.ndarray,
+        im2: np.ndarray,
+        workers: int,
+        win_size: int = 7,
+        data_range: float = 255,
+        channel_axis: int = None,
+        full: bool = False
+):
+    """
+    Splits the images into horizontal tiles, computes their SSIM images with the given function in a thread pool
+    and merges them. The filters of numpy and scipy release the GIL, so the tiles are computed on several cores.
+    Each tile is extended by half a window of rows on both sides, so the merged SSIM image and the mean SSIM are exact.
+    The channel axis must not be the first axis.
+    """
+    height = im1.shape[0]
+    pad = win_size // 2
+    tiles = min(workers, height // MIN_TILE_ROWS)
+    if tiles < 2 or channel_axis == 0:
+        return ssim_function(im1, im2, win_size=win_size, data_range=data_range, channel_axis=channel_axis, full=full)
+    bounds = np.linspace(0, height, tiles + 1, dtype=int)
+
+    def tile_ssim_image(start: int, end: int) -> np.ndarray:
+        halo_start = max(0, start - pad)
+        halo_end = min(height, end + pad)
+        _, s = ssim_function(im1[halo_start:halo_end], im2[halo_start:halo_end],
+                             win_size=win_size, data_range=data_range, channel_axis=channel_axis, full=True)
+        return s[start - halo_start:s.shape[0] - (halo_end - end)]
+
+    with ThreadPoolExecutor(max_workers=tiles) as executor:
+        s = np.concatenate(list(executor.map(tile_ssim_image, bounds[:-1], bounds[1:])), axis=0)
+    # like skimage, the border is left out of the mean
+    mssim = float(s[pad:-pad, pad:-pad].mean())
+    if full:
+        return mssim, s
+    return mssim
@@ -30,29 +30,51 @@ def substitute(gauge_param: str) -> str:
     The third example shows placeholders and mathematical expressions combined.
     Generally, placeholders are substituted first, expressions are evaluated sencond.
     """
-    template = Template(gauge_param)
     #pipe operator for sets does not work on windows
-    substituted = template.safe_substitute(os.environ)
-    template = Template(substituted)
-    substituted = template.safe_substitute(data_store.scenario)
+    substituted = _substitute_placeholders(gauge_param, os.environ)
+    substituted = _substitute_placeholders(substituted, data_store.scenario)
     substituted = _substitute_expressions('#', substituted, lambda expression: array2string(numexpr.evaluate(expression)) )
     substituted = _substitute_expressions('!', substituted, lambda expression: _evaluate_expression(expression))
     return substituted
 
 
+def _substitute_placeholders(text: str, mapping) -> str:
+    # most parameters contain no placeholders and need not be scanned by the template
+    if "$" not in text:
+        return text
+    return Template(text).safe_substitute(mapping)
+
+
 def _substitute_expressions(marker_char: str, text: str, evaluator: Callable[[str], str]) -> str:
-    substituted = text
+    """
+    Replaces the expressions from left to right. The pieces are joined once at the end,
+    so long texts with many expressions are not copied for each expression.
+    """
+    opening = marker_char + '{'
+    pieces = []
+    preceding = ""
+    position = 0
     while True:
-        start = substituted.find(marker_char + '{')
-        end = substituted.find('}', start)
+        start = text.find(opening, position)
+        end = text.find('}', start)
         if start < 0 or end < 0:
             break
-        expression = substituted[start + 2:end]
-        before = substituted[0:start]
-        after = substituted[end + 1:len(substituted)]
-        value = evaluator(expression)
-        substituted = before + value + after
-    return substituted
+        value = evaluator(text[start + 2:end])
+        if start > position:
+            preceding = text[start - 1]
+        if opening in preceding + value + text[end + 1:end + 2]:
+            # the value forms a new expression with the text around it, so the whole text is searched again
+            text = "".join(pieces) + text[position:start] + value + text[end + 1:]
+            pieces = []
+            preceding = ""
+            position = 0
+            continue
+        pieces.append(text[position:start])
+        pieces.append(value)
+        preceding = value[-1:] or preceding
+        position = end + 1
+    pieces.append(text[position:])
+    return "".join(pieces)
 
 
 def _evaluate_expression(expression: str) -> str:
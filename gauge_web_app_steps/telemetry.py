@@ -0,0 +1,114 @@
+#
+# Copyright IBM Corp. 2019-
+# SPDX-License-Identifier: MIT
+#
+
+import csv
+import json
+import os
+
+from dataclasses import asdict, dataclass, fields
+from getgauge.python import data_store
+
+from .config import common_config as config
+
+locator_telemetry_key = "_locator_telemetry"
+
+
+@dataclass
+class LocatorStats:
+    """Aggregated lookups of one locator. Times are in seconds."""
+    by: str
+    by_value: str
+    lookups: int = 0
+    attempts: int = 0
+    found: int = 0
+    timeouts: int = 0
+    misses: int = 0
+    total_time: float = 0.0
+    time_to_success: float = 0.0
+    max_time_to_success: float = 0.0
+    driver_time: float = 0.0
+
+    @property
+    def mean_time_to_success(self) -> float:
+        return self.time_to_success / self.found if self.found else 0.0
+
+    @property
+    def mean_driver_time(self) -> float:
+        return self.driver_time / self.attempts if self.attempts else 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self) | {"mean_time_to_success": self.mean_time_to_success, "mean_driver_time": self.mean_driver_time}
+
+
+class LocatorTelemetry:
+    """
+    Collects the lookups of all locators during the suite run: how often they were tried until the element was found,
+    how long that took and how much of it the driver calls took. Waits, that timed out, and immediate lookups,
+    that found nothing, are counted separately.
+    """
+
+    def __init__(self) -> None:
+        self.locators: dict[tuple[str, str], LocatorStats] = {}
+
+    def record(self, marker: tuple[str, str], attempts: int, elapsed: float, driver_time: float, found: bool, waited: bool) -> None:
+        stats = self.locators.get(marker)
+        if stats is None:
+            stats = LocatorStats(*marker)
+            self.locators[marker] = stats
+        stats.lookups += 1
+        stats.attempts += attempts
+        stats.total_time += elapsed
+        stats.driver_time += driver_time
+        if found:
+            stats.found += 1
+            stats.time_to_success += elapsed
+            stats.max_time_to_success = max(stats.max_time_to_success, elapsed)
+        elif waited:
+            stats.timeouts += 1
+        else:
+            stats.misses += 1
+
+    def slowest(self) -> list[LocatorStats]:
+        return sorted(self.locators.values(), key=lambda s: s.total_time, reverse=True)
+
+    def save(self, file_path_without_extension: str) -> None:
+        """Writes the locators, the slowest first, as JSON and CSV file."""
+        rows = [s.to_dict() for s in self.slowest()]
+        os.makedirs(os.path.dirname(file_path_without_extension), exist_ok=True)
+        with open(f"{file_path_without_extension}.json", "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=1)
+        with open(f"{file_path_without_extension}.csv", "w", encoding="utf-8", newline="") as f:
+            field_names = [f.name for f in fields(LocatorStats)] + ["mean_time_to_success", "mean_driver_time"]
+            writer = csv.DictWriter(f, fieldnames=field_names)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def record_lookup(marker: tuple[str, str], attempts: int, elapsed: float, driver_time: float, found: bool, waited: bool) -> None:
+    """Records a lookup of the marker, if telemetry is enabled."""
+    if not config.is_locator_telemetry():
+        return
+    telemetry = data_store.suite.get(locator_telemetry_key)
+    if telemetry is None:
+        telemetry = LocatorTelemetry()
+        data_store.suite[locator_telemetry_key] = telemetry
+    telemetry.record(marker, attempts, elapsed, driver_time, found, waited)
+
+
+def write_locator_telemetry() -> None:
+    telemetry: LocatorTelemetry = data_store.suite.get(locator_telemetry_key)
+    if telemetry is None or not telemetry.locators:
+        return
+    file_path = _telemetry_file_path()
+    telemetry.save(file_path)
+    print(f"Recorded lookups of {len(telemetry.locators)} locators: {file_path}.json")
+
+
+def _telemetry_file_path() -> str:
+    reports_dir = os.environ.get("gauge_reports_dir", "reports")
+    if not os.path.isabs(reports_dir):
+        reports_dir = os.path.join(os.environ.get("GAUGE_PROJECT_ROOT", ""), reports_dir)
+    # parallel streams run in separate processes and write separate reports
+    return os.path.join(reports_dir, "locator-telemetry", f"locators_{os.getpid()}")
@@ -0,0 +1,80 @@
+#
+# Copyright IBM Corp. 2019-
+# SPDX-License-Identifier: MIT
+#
+
+import os
+import sqlite3
+import threading
+import time
+
+from .config import common_config as config
+
+# the cache is opened once per process and shared by all specs of a stream
+_verdict_caches: dict[str, "VerdictCache"] = {}
+
+
+class VerdictCache(object):
+    """
+    A persistent cache of comparison results, kept in a SQLite database.
+    Results are keyed by the content hashes of both images and the parameters of the comparison,
+    so unchanged pages do not need to be compared again in later runs.
+    The least recently used results are evicted, when the cache grows beyond its maximum size.
+    """
+
+    def __init__(self, file_path: str, max_entries: int) -> None:
+        self.max_entries = max_entries
+        # comparisons of regions run in threads, which share the connection
+        self.lock = threading.Lock()
+        # parallel streams share the database file, so writers wait for each other
+        self.connection = sqlite3.connect(file_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS verdicts ("
+            "expected_hash TEXT, actual_hash TEXT, comparison TEXT, ssim REAL, last_used REAL, "
+            "PRIMARY KEY (expected_hash, actual_hash, comparison))")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS verdicts_last_used ON verdicts (last_used)")
+
+    def get(self, expected_hash: str, actual_hash: str, comparison: str) -> float | None:
+        key = (expected_hash, actual_hash, comparison)
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT ssim FROM verdicts WHERE expected_hash = ? AND actual_hash = ? AND comparison = ?", key).fetchone()
+            if row is None:
+                return None
+            self.connection.execute(
+                "UPDATE verdicts SET last_used = ? WHERE expected_hash = ? AND actual_hash = ? AND comparison = ?",
+                (time.time(),) + key)
+        return row[0]
+
+    def put(self, expected_hash: str, actual_hash: str, comparison: str, ssim: float) -> None:
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?)",
+                (expected_hash, actual_hash, comparison, ssim, time.time()))
+            self.connection.execute(
+                "DELETE FROM verdicts WHERE rowid IN (SELECT rowid FROM verdicts ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,))
+
+    def size(self) -> int:
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def verdict_cache() -> VerdictCache | None:
+    """The configured verdict cache or None, if caching is disabled."""
+    file_path = config.get_verdict_cache_file()
+    if not file_path:
+        return None
+    if not os.path.isabs(file_path):
+        file_path = os.path.join(os.environ.get("GAUGE_PROJECT_ROOT", ""), file_path)
+    file_path = os.path.abspath(file_path)
+    cache = _verdict_caches.get(file_path)
+    if cache is None:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        cache = VerdictCache(file_path, config.get_verdict_cache_size())
+        _verdict_caches[file_path] = cache
+    return cache
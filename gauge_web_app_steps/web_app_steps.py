@@ -4,7 +4,6 @@
 #
 
 import base64
-import os
 import re
 import sys
 import time
@@ -14,7 +13,7 @@ from uuid import uuid4
 
 from itertools import filterfalse
 from typing import Tuple
-from getgauge.python import data_store, step, before_spec, after_spec, custom_screenshot_writer, before_suite, after_suite, before_step, ExecutionContext
+from getgauge.python import data_store, step, before_spec, after_spec, custom_screenshot_writer, before_suite, after_suite, before_step, ExecutionContext, Table
 from selenium.common.exceptions import JavascriptException, NoSuchWindowException, TimeoutException, WebDriverException
 from selenium.webdriver import Remote
 from appium.webdriver import Remote as AppiumRemote
@@ -22,18 +21,24 @@ from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as EC
 
-from .app_context import AppContext, app_context_key, timeout_key
+from .app_context import AppContext, app_context_key, polling_key, step_context_key, timeout_key
 from .config import common_config as config
-from .driver.browsers import Browser
-from .element_lookup import find_element, find_elements, find_attribute, get_text_from_element, get_marker, wait_until, wait_for_idle_element
+from .deferred_comparison import evaluate_deferred_comparisons
+from .element_assertions import ElementAssertion, assert_elements, check_property_and_operator
+from .element_lookup import (find_element, find_attribute, get_css_property, get_selected_value, get_text_from_element, get_marker, invalidate_element_cache,
+                             is_element_enabled, is_element_focused, is_element_selected, wait_until, wait_for_idle_element)
 from .keymapper import KeyMapper
+from .polling import POLLING_STRATEGIES
+from .page_wait import (PageCondition, ATTRIBUTE_CONTAINS, ATTRIBUTE_EQUALS, ATTRIBUTE_EXISTS, ATTRIBUTE_NOT_CONTAINS, INVISIBLE, TEXT_CONTAINS,
+                        TEXT_EQUALS, TEXT_NOT_CONTAINS, TEXT_NOT_EQUALS, VISIBLE)
 from .report import Report
 from .sauce_tunnel import SauceTunnel
 from .selector import SelectKey, Selector
-from .screenshot import (append_structured_similarity, create_screenshot, create_failure_screenshot, 
-                        create_actual_screenshot_file_path, create_expected_screenshot_file_path, crop_image,
-                        get_structured_similarity_to_expected, ssim_screenshot_scrolling, ssim_screenshot_noscrolling)
+from .screenshot import (RegionAssertion, append_pixel_difference, create_screenshot, create_failure_screenshot, create_full_page_screenshot, crop_image,
+                        is_full_page_screenshot_supported, settle_scrolling,
+                        ssim_screenshot_of_element, ssim_screenshots_of_regions, ssim_screenshot_pages, ssim_screenshot_scrolling, ssim_screenshot_noscrolling)
 from .substitute import substitute
+from .telemetry import write_locator_telemetry
 
 
 # Repeat an action a number of times before failing
@@ -64,6 +69,10 @@ def after_suite_hook() -> None:
         print(f"An exception occured while SauceConnect terminated: {str(e)}", file=sys.stderr)
         traceback.print_exception(e)
         raise e
+    finally:
+        write_locator_telemetry()
+        # after the tunnel is closed, so that no remote session waits for the comparisons
+        evaluate_deferred_comparisons()
 
 
 @before_spec
@@ -95,6 +104,7 @@ def after_spec_hook() -> None:
 
 @before_step
 def before_step_hook(exe_ctx:  ExecutionContext) -> None:
+    data_store.scenario[step_context_key] = exe_ctx
     step_text = exe_ctx.step.text
     def warn_using_deprecated_step(step_text: str, mapping: Tuple[str]) -> None:
         match = re.fullmatch(mapping[0], step_text)
@@ -306,12 +316,14 @@ def switch_to_window(window_param: str) -> None:
         except TimeoutException:
             #switch back to default when we did not find the desired window
             driver().switch_to.window(original_window)
+            invalidate_element_cache()
             raise AssertionError(f"did not find window {target_window}")
 
 
 @step("Switch to default content")
 def switch_to_default_content() -> None:
     driver().switch_to.default_content()
+    invalidate_element_cache()
 
 
 @step("Switch to frame <frame_param>")
@@ -319,20 +331,27 @@ def switch_to_frame(frame_name_or_index_param: str) -> None:
     frame_param = substitute(frame_name_or_index_param)
     if frame_param.isdigit():
         index = int(frame_param)
-        frames = find_elements("tag name", "frame")
-        if len(frames) == 0:
-            frames = find_elements("tag name", "iframe")
+        # frames and iframes are looked up at once, so that the implicit wait is not paid twice
+        def find_frames(driver: Remote) -> list[WebElement] | bool:
+            frames = driver.find_elements("css selector", "frame, iframe")
+            return frames if len(frames) > index else False
+        try:
+            frames = wait_until(find_frames)
+        except TimeoutException:
+            frames = driver().find_elements("css selector", "frame, iframe")
         assert len(frames) > 0, "no frames or iframes found in current page."
-        assert len(frames) >= index, f"frame index {index} is higher than number of frames in current page: {len(frames)}"
+        assert len(frames) > index, f"frame index {index} is higher than number of frames in current page: {len(frames)}"
         driver().switch_to.frame(frames[index])
     else:
-        driver().switch_to.frame(frame_param)
+        wait_until(EC.frame_to_be_available_and_switch_to_it(frame_param), f"frame {frame_param} is not available")
+    invalidate_element_cache()
 
 
 @step("Switch to frame <by> = <by_value>")
 def switch_to_frame_by_selector(by: str, by_value: str) -> None:
-    frame = find_element(by, by_value)
+    frame = find_element(by, by_value, cached=False)
     driver().switch_to.frame(frame)
+    invalidate_element_cache()
 
 
 @step("Switch to context <context_regexp>")
@@ -346,18 +365,21 @@ def switch_to_context(context_regexp_param) -> None:
     target_context = wait_until(find_context, f"no context found that matches {context_regexp}")
     report().log(f"Switching to context '{target_context}'")
     driver().switch_to.context(target_context)
+    invalidate_element_cache()
 
 
 @step("Dismiss alert")
 def dismiss_alert() -> None:
     wait_until(EC.alert_is_present()).dismiss()
     driver().switch_to.default_content()
+    invalidate_element_cache()
 
 
 @step("Accept alert")
 def accept_alert() -> None:
     wait_until(EC.alert_is_present()).accept()
     driver().switch_to.default_content()
+    invalidate_element_cache()
 
 
 @step("Answer in prompt <text>")
@@ -367,6 +389,7 @@ def answer_in_prompt(text: str) -> None:
     alert.send_keys(prompt_text)
     alert.accept()
     driver().switch_to.default_content()
+    invalidate_element_cache()
 
 
 @step("Take a screenshot <file>")
@@ -395,9 +418,9 @@ def take_screenshot_of_element(by: str, by_value: str, image_file_name_param: st
 
 @step("Take screenshots of whole page <file>")
 def take_screenshots_of_whole_page(image_file_name_param: str) -> None:
-    if _is_firefox_page_screenshot_no_scrolling():
+    if is_full_page_screenshot_supported():
         image_file_name = substitute(image_file_name_param)
-        screenshot_file_path = create_screenshot(image_file_name)
+        screenshot_file_path = create_full_page_screenshot(image_file_name)
         report().log_image(screenshot_file_path)
     else:
         image_file_name = substitute(image_file_name_param)
@@ -411,10 +434,7 @@ def _screenshot_of_whole_page_with_scrolling(image_file_name: str) -> None:
         filename_with_postfix = "".join((image_file_name, "_", str(postfix)))
         postfix += 1
         take_screenshot(filename_with_postfix)
-        current_offset = driver().execute_script("return window.pageYOffset")
-        driver().execute_script("window.scrollBy(0, window.innerHeight)")
-        time.sleep(0.3)
-        after_scroll_offset = driver().execute_script("return window.pageYOffset")
+        current_offset, after_scroll_offset = settle_scrolling(scroll=True, max_wait=0.3)
         if after_scroll_offset <= current_offset or postfix > 32:
             should_continue = False
 
@@ -611,7 +631,7 @@ def mouse_up(by: str, by_value: str) -> None:
 
 @step(["Move to <by> = <by_value>", "Scroll <by> = <by_value> into view"])
 def move_into_view(by: str, by_value: str) -> None:
-    element = find_element(by, by_value)
+    element = find_element(by, by_value, cached=False)
     # the following script is needed for some browsers
     driver().execute_script("arguments[0].scrollIntoView(true);", element)
     try:
@@ -619,25 +639,25 @@ def move_into_view(by: str, by_value: str) -> None:
     except WebDriverException as e:
         # in some mobile browsers it fails
         report().log_debug(f"received exception while moving to {element}: {e}")
-    wait_for_idle_element(by, by_value)
+    wait_for_idle_element(by, by_value, element)
 
 
 @step("Move to and center <by> = <by_value>")
 def move_into_view_and_center(by: str, by_value: str) -> None:
-    element = find_element(by, by_value)
+    element = find_element(by, by_value, cached=False)
     driver().execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'nearest'});", element)
-    wait_for_idle_element(by, by_value)
+    wait_for_idle_element(by, by_value, element)
 
 
 @step("Move out")
 def move_out_of_view() -> None:
-    element = find_element("css selector", "body")
+    element = find_element("css selector", "body", cached=False)
     ActionChains(driver()).move_to_element_with_offset(element, 0, 0).perform()
 
 
 @step(["Move over <by> = <by_value>", "Hover over <by> = <by_value>"])
 def hover_over(by: str, by_value: str) -> None:
-    element = find_element(by, by_value)
+    element = find_element(by, by_value, cached=False)
     ActionChains(driver()).move_to_element(element).perform()
 
 
@@ -677,7 +697,7 @@ def execute_script_on_element(script_param: str, by: str, by_value: str, elem_pa
     script = substitute(script_param)
     elem = substitute(elem_param)
     assert elem in script, f"no element with name '{elem}' is referred to in the script"
-    found = find_element(by, by_value)
+    found = find_element(by, by_value, cached=False)
     driver().execute_script(f"var {elem}=arguments[0]; {script}", found)
 
 
@@ -687,7 +707,7 @@ def execute_script_on_element_save_result(script_param: str, by: str, by_value:
     elem = substitute(elem_param)
     placeholder_name = substitute(placeholder_name_param)
     assert elem in script, f"no element with name '{elem}' is referred to in the script"
-    found = find_element(by, by_value)
+    found = find_element(by, by_value, cached=False)
     res = driver().execute_script(f"var {elem}=arguments[0]; {script}", found)
     data_store.scenario[placeholder_name] = res
 
@@ -713,7 +733,7 @@ def execute_async_script_on_element(script_param: str, by: str, by_value: str, e
     script = substitute(script_param)
     elem = substitute(elem_param)
     assert elem in script, f"no element with name '{elem}' is referred to in the script"
-    found = find_element(by, by_value)
+    found = find_element(by, by_value, cached=False)
     driver().execute_async_script(f"var {elem}=arguments[0]; {script}", found)
 
 
@@ -732,7 +752,7 @@ def execute_async_script_on_element_save_result(
     callback = substitute(callback_param)
     assert elem in script, f"no element with name '{elem}' is referred to in the script"
     assert callback in script, f"no callback with name '{callback}' is invoked in the script"
-    found = find_element(by, by_value)
+    found = find_element(by, by_value, cached=False)
     res = driver().execute_async_script(f"var {elem}=arguments[0]; var {callback}=arguments[arguments.length-1]; {script}", found)
     data_store.scenario[placeholder_name] = res
 
@@ -784,6 +804,19 @@ def reset_timeout():
     del data_store.scenario[timeout_key]
 
 
+@step("Set polling <strategy>")
+def set_polling(strategy_param: str):
+    strategy = substitute(strategy_param)
+    assert strategy in POLLING_STRATEGIES,\
+        _err_msg(f"argument '{strategy_param}' should be one of {', '.join(POLLING_STRATEGIES)}")
+    data_store.scenario[polling_key] = strategy
+
+
+@step("Reset polling")
+def reset_polling():
+    data_store.scenario.pop(polling_key, None)
+
+
 # Steps Asserts ------------------------------------------------
 
 
@@ -870,7 +903,7 @@ def assert_url_contains(expected_url_param: str) -> None:
 def assert_element_exists(by: str, by_value: str) -> None:
     marker = get_marker(substitute(by), substitute(by_value))
     try:
-        wait_until(EC.visibility_of_element_located(marker))
+        wait_until(EC.visibility_of_element_located(marker), page_condition=PageCondition(marker, VISIBLE))
     except TimeoutException:
         raise AssertionError(_err_msg(f"element {by} = {by_value} does not exist"))
 
@@ -882,7 +915,7 @@ def assert_element_does_not_exist(by_param: str, by_value_param: str) -> None:
     by_value = substitute(by_value_param)
     marker = get_marker(by, by_value)
     try:
-        wait_until(EC.invisibility_of_element(marker))
+        wait_until(EC.invisibility_of_element(marker), page_condition=PageCondition(marker, INVISIBLE))
     except TimeoutException:
         raise AssertionError(_err_msg(f"element {by} = {by_value} exists"))
 
@@ -890,7 +923,7 @@ def assert_element_does_not_exist(by_param: str, by_value_param: str) -> None:
 @step("Assert <by> = <by_value> is enabled")
 def assert_element_is_enabled(by: str, by_value: str) -> None:
     try:
-        wait_until(lambda _: find_element(by, by_value).is_enabled())
+        wait_until(lambda _: is_element_enabled(by, by_value))
     except TimeoutException:
         raise AssertionError(_err_msg(f"element {by} = {by_value} is disabled"))
 
@@ -898,7 +931,7 @@ def assert_element_is_enabled(by: str, by_value: str) -> None:
 @step("Assert <by> = <by_value> is disabled")
 def assert_element_is_disabled(by: str, by_value: str) -> None:
     try:
-        wait_until(lambda _: not find_element(by, by_value).is_enabled())
+        wait_until(lambda _: not is_element_enabled(by, by_value))
     except TimeoutException:
         raise AssertionError(_err_msg(f"element {by} = {by_value} is enabled"))
 
@@ -906,7 +939,7 @@ def assert_element_is_disabled(by: str, by_value: str) -> None:
 @step("Assert <by> = <by_value> is selected")
 def assert_element_is_selected(by: str, by_value: str) -> None:
     try:
-        wait_until(lambda _: find_element(by, by_value).is_selected())
+        wait_until(lambda _: is_element_selected(by, by_value))
     except TimeoutException:
         element = find_element(by, by_value, immediately=True)
         if element is None:
@@ -918,7 +951,7 @@ def assert_element_is_selected(by: str, by_value: str) -> None:
 def assert_selected_option(by: str, by_value: str, expected_param: str) -> None:
     expected = substitute(expected_param)
     try:
-        wait_until(lambda _: Selector.get_selected_value(find_element(by, by_value)) == expected)
+        wait_until(lambda _: get_selected_value(by, by_value) == expected)
     except TimeoutException:
         element = find_element(by, by_value, immediately=True)
         if element is None:
@@ -930,7 +963,7 @@ def assert_selected_option(by: str, by_value: str, expected_param: str) -> None:
 @step("Assert <by> = <by_value> is not selected")
 def assert_element_is_not_selected(by: str, by_value: str) -> None:
     try:
-        wait_until(lambda _: not find_element(by, by_value).is_selected())
+        wait_until(lambda _: not is_element_selected(by, by_value))
     except TimeoutException:
         element = find_element(by, by_value, immediately=True)
         if element is None:
@@ -942,7 +975,8 @@ def assert_element_is_not_selected(by: str, by_value: str) -> None:
 def assert_text_equals(by: str, by_value: str, expected_text_param: str) -> None:
     expected_text = substitute(expected_text_param)
     try:
-        wait_until(lambda _: get_text_from_element(by, by_value) == expected_text)
+        wait_until(lambda _: get_text_from_element(by, by_value) == expected_text,
+                   page_condition=PageCondition(_marker(by, by_value), TEXT_EQUALS, expected_text))
     except TimeoutException:
         text = get_text_from_element(by, by_value, immediately=True)
         raise AssertionError(_err_msg(f"element {by} = {by_value} expected text {expected_text}, actual {text}"))
@@ -952,7 +986,8 @@ def assert_text_equals(by: str, by_value: str, expected_text_param: str) -> None
 def assert_text_does_not_equal(by: str, by_value: str, expected_text_param: str) -> None:
     expected_text = substitute(expected_text_param)
     try:
-        wait_until(lambda _: get_text_from_element(by, by_value) != expected_text)
+        wait_until(lambda _: get_text_from_element(by, by_value) != expected_text,
+                   page_condition=PageCondition(_marker(by, by_value), TEXT_NOT_EQUALS, expected_text))
     except TimeoutException:
         text = get_text_from_element(by, by_value, immediately=True)
         raise AssertionError(_err_msg(f"element {by} = {by_value} has unexpected text {text}"))
@@ -972,7 +1007,8 @@ def assert_regexp_in_element(by: str, by_value: str, regexp_param: str) -> None:
 def assert_text_contains(by: str, by_value: str, contains_text_param: str) -> None:
     contains_text = substitute(contains_text_param)
     try:
-        wait_until(lambda _: contains_text in get_text_from_element(by, by_value))
+        wait_until(lambda _: contains_text in get_text_from_element(by, by_value),
+                   page_condition=PageCondition(_marker(by, by_value), TEXT_CONTAINS, contains_text))
     except TimeoutException:
         text = get_text_from_element(by, by_value, immediately=True)
         raise AssertionError(_err_msg(f"element {by} = {by_value} expected actual {text} to contain {contains_text}"))
@@ -982,7 +1018,8 @@ def assert_text_contains(by: str, by_value: str, contains_text_param: str) -> No
 def assert_text_does_not_contain(by: str, by_value: str, contains_text_param: str) -> None:
     contains_text = substitute(contains_text_param)
     try:
-        wait_until(lambda _: contains_text not in get_text_from_element(by, by_value))
+        wait_until(lambda _: contains_text not in get_text_from_element(by, by_value),
+                   page_condition=PageCondition(_marker(by, by_value), TEXT_NOT_CONTAINS, contains_text))
     except TimeoutException:
         text = get_text_from_element(by, by_value, immediately=True)
         raise AssertionError(_err_msg(f"element {by} = {by_value} expected actual {text} to not contain {contains_text}"))
@@ -993,17 +1030,39 @@ def assert_css_property(by: str, by_value: str, css_property_name_param: str, cs
     css_property_name = substitute(css_property_name_param)
     css_expected_value = substitute(css_expected_value_param)
     try:
-        wait_until(lambda _: css_expected_value == find_element(by, by_value).value_of_css_property(css_property_name))
+        wait_until(lambda _: css_expected_value == get_css_property(by, by_value, css_property_name))
     except TimeoutException:
         element = find_element(by, by_value, immediately=True)
         css_actual_value = element.value_of_css_property(css_property_name) if element is not None else "None"
         raise AssertionError(_err_msg(f"element {by} = {by_value}: css property {css_property_name} expected: {css_expected_value}, actual: {css_actual_value}"))
 
 
+@step("Assert elements <table>")
+def assert_elements_table(table: Table) -> None:
+    assert not config.is_app_test(), "this step is not supported for native apps"
+    assertions = []
+    for by_param, by_value_param, property_param, operator_param, expected_param in zip(
+            table.get_column_values_with_name("by"),
+            table.get_column_values_with_name("by_value"),
+            table.get_column_values_with_name("property"),
+            table.get_column_values_with_name("operator"),
+            table.get_column_values_with_name("expected")):
+        by = substitute(by_param)
+        by_value = substitute(by_value_param)
+        prop = substitute(property_param)
+        operator = substitute(operator_param)
+        expected = substitute(expected_param)
+        check_property_and_operator(prop, operator, expected)
+        assertions.append(ElementAssertion(by, by_value, get_marker(by, by_value), prop, operator, expected))
+    failed_asserts = assert_elements(assertions)
+    assert len(failed_asserts) == 0,\
+            _err_msg("Assertions failed:\n\t{}".format("\n\t".join(failed_asserts)))
+
+
 @step("Assert <by> = <by_value> is focused")
 def assert_element_is_focused(by: str, by_value: str) -> None:
     try:
-        wait_until(lambda _: find_element(by, by_value) == _focused_element())
+        wait_until(lambda _: is_element_focused(by, by_value))
     except TimeoutException:
         raise AssertionError(_err_msg(f"element {by} = {by_value} is not in focus"))
 
@@ -1012,7 +1071,8 @@ def assert_element_is_focused(by: str, by_value: str) -> None:
 def assert_attribute_exists(by: str, by_value: str, attribute_param: str) -> None:
     attribute = substitute(attribute_param)
     try:
-        wait_until(lambda _: find_attribute(by, by_value, attribute))
+        wait_until(lambda _: find_attribute(by, by_value, attribute),
+                   page_condition=PageCondition(_marker(by, by_value), ATTRIBUTE_EXISTS, attribute=attribute))
     except TimeoutException:
         raise AssertionError(_err_msg(f"element {by} = {by_value} has no attribute {attribute}"))
 
@@ -1025,7 +1085,7 @@ def assert_attribute_contains(by: str, by_value: str, attribute_param: str, valu
         found = find_attribute(by, by_value, attribute)
         return isinstance(found, str) and value in found
     try:
-        wait_until(attribute_contains_value)
+        wait_until(attribute_contains_value, page_condition=PageCondition(_marker(by, by_value), ATTRIBUTE_CONTAINS, value, attribute))
     except TimeoutException:
         found_value = find_attribute(by, by_value, attribute, immediately=True)
         if found_value is None:
@@ -1042,7 +1102,8 @@ def assert_attribute_equals(by: str, by_value: str, attribute_param: str, value_
     attribute = substitute(attribute_param)
     value = substitute(value_param)
     try:
-        wait_until(lambda _: value == find_attribute(by, by_value, attribute))
+        wait_until(lambda _: value == find_attribute(by, by_value, attribute),
+                   page_condition=PageCondition(_marker(by, by_value), ATTRIBUTE_EQUALS, value, attribute))
     except TimeoutException:
         found_value = find_attribute(by, by_value, attribute, immediately=True)
         if found_value is None:
@@ -1062,7 +1123,8 @@ def assert_attribute_does_not_contain(by: str, by_value: str, attribute_param: s
         found = find_attribute(by, by_value, attribute)
         return isinstance(found, str) and value not in found
     try:
-        wait_until(attribute_does_not_contain_value)
+        wait_until(attribute_does_not_contain_value,
+                   page_condition=PageCondition(_marker(by, by_value), ATTRIBUTE_NOT_CONTAINS, value, attribute))
     except TimeoutException:
         found_value = find_attribute(by, by_value, attribute, immediately=True)
         raise AssertionError(_err_msg(f"attribute {attribute} in element {by} = {by_value} contains {value} - found: {found_value}"))
@@ -1076,9 +1138,40 @@ def assert_image_resembles(by: str, by_value: str, image_file_name_param: str, t
     pixel_ratio = _device_pixel_ratio()
     viewport_offset = _viewport_offset()
     image_file_name = substitute(image_file_name_param)
-    ssim = get_structured_similarity_to_expected(image_file_name, element.location, element.size, pixel_ratio, viewport_offset)
-    assert ssim >= threshold, \
-        _err_msg(f"SSIM {ssim} is less than threshold {threshold}")
+    failed_asserts = ssim_screenshot_of_element(image_file_name, element.location, element.size, pixel_ratio, viewport_offset, threshold)
+    assert len(failed_asserts) == 0,\
+            _err_msg("Assertions failed:\n\t{}".format("\n\t".join(failed_asserts)))
+
+
+@step("Assert <by> = <by_value> screenshot matches <file> with tolerance <pct>")
+def assert_image_matches(by: str, by_value: str, image_file_name_param: str, tolerance_param: str) -> None:
+    element = find_element(by, by_value)
+    tolerance = float(substitute(tolerance_param))
+    assert 0.0 <= tolerance <= 100.0, "tolerance must be between 0.0 and 100.0"
+    pixel_ratio = _device_pixel_ratio()
+    viewport_offset = _viewport_offset()
+    image_file_name = substitute(image_file_name_param)
+    failed_asserts = ssim_screenshot_of_element(
+        image_file_name, element.location, element.size, pixel_ratio, viewport_offset, tolerance, append_pixel_difference)
+    assert len(failed_asserts) == 0,\
+            _err_msg("Assertions failed:\n\t{}".format("\n\t".join(failed_asserts)))
+
+
+@step("Assert screenshot regions resemble <table>")
+def assert_regions_resemble(table: Table) -> None:
+    regions = []
+    for by, by_value, image_file_name_param, threshold_param in zip(
+            table.get_column_values_with_name("by"),
+            table.get_column_values_with_name("by_value"),
+            table.get_column_values_with_name("file"),
+            table.get_column_values_with_name("threshold")):
+        threshold = float(substitute(threshold_param))
+        assert 0.0 <= threshold <= 1.0, "threshold must be between 0.0 and 1.0"
+        element = find_element(by, by_value, cached=False)
+        regions.append(RegionAssertion(element, substitute(image_file_name_param), threshold))
+    failed_asserts = ssim_screenshots_of_regions(regions)
+    assert len(failed_asserts) == 0,\
+            _err_msg("Assertions failed:\n\t{}".format("\n\t".join(failed_asserts)))
 
 
 @step("Assert page screenshots resemble <file> with SSIM more than <threshold>")
@@ -1086,7 +1179,7 @@ def assert_whole_page_resembles(image_file_name_param: str, threshold_param: str
     threshold = float(substitute(threshold_param))
     assert 0.0 <= threshold <= 1.0, "threshold must be between 0.0 and 1.0"
     image_file_name = substitute(image_file_name_param)
-    if _is_firefox_page_screenshot_no_scrolling():
+    if is_full_page_screenshot_supported():
         failed_asserts = ssim_screenshot_noscrolling(image_file_name, threshold)
     else:
         failed_asserts = ssim_screenshot_scrolling(image_file_name, threshold)
@@ -1094,6 +1187,19 @@ def assert_whole_page_resembles(image_file_name_param: str, threshold_param: str
             _err_msg("Assertions failed:\n\t{}".format("\n\t".join(failed_asserts)))
 
 
+@step("Assert page screenshots match <file> with tolerance <pct>")
+def assert_whole_page_matches(image_file_name_param: str, tolerance_param: str) -> None:
+    tolerance = float(substitute(tolerance_param))
+    assert 0.0 <= tolerance <= 100.0, "tolerance must be between 0.0 and 100.0"
+    image_file_name = substitute(image_file_name_param)
+    if is_full_page_screenshot_supported():
+        failed_asserts = ssim_screenshot_noscrolling(image_file_name, tolerance, append_pixel_difference)
+    else:
+        failed_asserts = ssim_screenshot_scrolling(image_file_name, tolerance, append_pixel_difference)
+    assert len(failed_asserts) == 0,\
+            _err_msg("Assertions failed:\n\t{}".format("\n\t".join(failed_asserts)))
+
+
 @step("Assert page screenshots resemble <file> with SSIM more than <threshold> for <pages> pages")
 def assert_pages_resemble(image_file_name_param: str, threshold_param: str, pages_param: str) -> None:
     """This step exists in case the upper step does not work, f.i. due to framework restrictions"""
@@ -1101,18 +1207,7 @@ def assert_pages_resemble(image_file_name_param: str, threshold_param: str, page
     assert 0.0 <= threshold <= 1.0, "threshold must be between 0.0 and 1.0"
     image_file_name = substitute(image_file_name_param)
     pages = int(substitute(pages_param))
-    failed_asserts = []
-    for page in range(1, pages + 1):
-        actual_screenshot_full_path = create_actual_screenshot_file_path(image_file_name, page)
-        expected_screenshot_full_path = create_expected_screenshot_file_path(image_file_name, page)
-        page += 1
-        send_keys("PAGE_DOWN")
-        wait_time = config.get_scroll_wait_time()
-        time.sleep(wait_time)
-        if not os.path.isfile(expected_screenshot_full_path):
-            failed_asserts.append("screenshot {} does not exist".format(expected_screenshot_full_path))
-        else:
-            append_structured_similarity(failed_asserts, expected_screenshot_full_path, actual_screenshot_full_path, threshold)
+    failed_asserts = ssim_screenshot_pages(image_file_name, threshold, pages)
     assert len(failed_asserts) == 0,\
             _err_msg("Assertions failed:\n\t{}".format("\n\t".join(failed_asserts)))
 
@@ -1157,6 +1252,8 @@ def _init_opened_page(page) -> None:
 
 
 def _page_ready() -> None:
+    # the page or window might have changed, so cached elements are not valid anymore
+    invalidate_element_cache()
     if config.is_app_test():
         # cannot execute script in native apps
         return
@@ -1167,6 +1264,10 @@ def _page_ready() -> None:
         pass
 
 
+def _marker(by: str, by_value: str) -> tuple[str, str]:
+    return get_marker(substitute(by), substitute(by_value))
+
+
 def _ready_for_interaction(element: WebElement) -> None:
     try:
         wait_until(EC.element_to_be_clickable(element))
@@ -1176,16 +1277,15 @@ def _ready_for_interaction(element: WebElement) -> None:
 
 
 def _device_pixel_ratio() -> int:
+    if config.is_css_pixel_screenshots():
+        # screenshots are taken or downsampled to CSS pixels
+        return 1
     return int(driver().execute_script("return window.devicePixelRatio"))
 
 
 def _viewport_offset() -> int:
     return int(driver().execute_script("return window.pageYOffset"))
 
-def _is_firefox_page_screenshot_no_scrolling() -> bool:
-    return config.get_browser() == Browser.FIREFOX and config.is_whole_page_screenshot()
-
-
 def _is_mobile_operating_system() -> bool:
     return config.get_operating_system().is_mobile()
 
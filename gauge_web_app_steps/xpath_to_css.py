@@ -0,0 +1,104 @@
+#
+# Copyright IBM Corp. 2019-
+# SPDX-License-Identifier: MIT
+#
+
+import functools
+import re
+
+_NAME = r"[A-Za-z_][\w-]*"
+_LITERAL = r"'[^']*'|\"[^\"]*\""
+_STEP = re.compile(rf"\s*(?P<axis>//|/)\s*(?P<name>\*|{_NAME})")
+_PREDICATE_START = re.compile(r"\s*\[")
+_CONDITION = re.compile(
+    rf"\s*(?:"
+    rf"(?P<function>contains|starts-with)\s*\(\s*@(?P<function_attribute>{_NAME})\s*,\s*(?P<function_literal>{_LITERAL})\s*\)"
+    rf"|@(?P<attribute>{_NAME})(?:\s*=\s*(?P<literal>{_LITERAL}))?"
+    rf")\s*")
+_AND = re.compile(r"and\s")
+_PREDICATE_END = re.compile(r"\]")
+
+# Browsers match the values of these attributes case-insensitively in CSS, but not in XPath.
+_CASE_INSENSITIVE_ATTRIBUTES = {
+    "accept", "accept-charset", "align", "alink", "axis", "bgcolor", "charset", "checked", "clear", "codetype", "color",
+    "compact", "declare", "defer", "dir", "direction", "disabled", "enctype", "face", "frame", "hreflang", "http-equiv",
+    "lang", "language", "link", "media", "method", "multiple", "nohref", "noresize", "noshade", "nowrap", "readonly",
+    "rel", "rev", "rules", "scope", "scrolling", "selected", "shape", "target", "text", "type", "valign", "valuetype",
+    "vlink",
+}
+
+# In HTML documents, XPath names without prefix do not match SVG and MathML elements, but CSS names do.
+_FOREIGN_ELEMENTS = {
+    "svg", "g", "path", "circle", "ellipse", "line", "polyline", "polygon", "rect", "text", "tspan", "textpath", "use",
+    "defs", "symbol", "marker", "mask", "pattern", "clippath", "image", "foreignobject", "lineargradient",
+    "radialgradient", "stop", "filter", "desc", "metadata", "switch", "view", "math", "mi", "mn", "mo", "ms", "mtext",
+    "mrow", "mfrac", "msqrt", "mroot",
+    # SVG elements with the names of HTML elements
+    "a", "title", "style", "script",
+}
+
+_CSS_OPERATORS = {None: "=", "contains": "*=", "starts-with": "^="}
+
+
+@functools.lru_cache(maxsize=1024)
+def xpath_to_css(xpath: str) -> str | None:
+    """
+    Translates an XPath to a CSS selector, that finds exactly the same elements, or returns None.
+    Only descendant and child steps with element names or `*` are translated,
+    with predicates on attributes: `@a`, `@a='v'`, `contains(@a, 'v')`, `starts-with(@a, 'v')`, also joined by `and`.
+    """
+    if not xpath.lstrip().startswith("//"):
+        # absolute and relative paths depend on the context node
+        return None
+    selector = []
+    position = 0
+    while position < len(xpath):
+        step = _STEP.match(xpath, position)
+        if step is None:
+            return None
+        name = step.group("name")
+        # names are matched case-insensitively in HTML documents, but only to some extent in XPath
+        if name != name.lower() or name in _FOREIGN_ELEMENTS:
+            return None
+        if selector:
+            selector.append(" > " if step.group("axis") == "/" else " ")
+        selector.append(name)
+        position = step.end()
+        while (start := _PREDICATE_START.match(xpath, position)) is not None:
+            position = start.end()
+            while True:
+                condition = _CONDITION.match(xpath, position)
+                if condition is None:
+                    return None
+                css_condition = _css_condition(condition)
+                if css_condition is None:
+                    return None
+                selector.append(css_condition)
+                position = condition.end()
+                conjunction = _AND.match(xpath, position)
+                if conjunction is None:
+                    break
+                position = conjunction.end()
+            end = _PREDICATE_END.match(xpath, position)
+            if end is None:
+                return None
+            position = end.end()
+        if not xpath[position:].strip():
+            break
+    return "".join(selector)
+
+
+def _css_condition(condition: re.Match) -> str | None:
+    function = condition.group("function")
+    attribute = condition.group("function_attribute") if function else condition.group("attribute")
+    literal = condition.group("function_literal") if function else condition.group("literal")
+    if attribute != attribute.lower() or attribute in _CASE_INSENSITIVE_ATTRIBUTES:
+        return None
+    if literal is None:
+        return f"[{attribute}]"
+    value = literal[1:-1]
+    if function and not value:
+        # an empty string is contained in any string, even in missing attributes
+        return None
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\a ")
+    return f'[{attribute}{_CSS_OPERATORS[function]}"{escaped}"]'
@@ -0,0 +1,54 @@
+#
+# Copyright IBM Corp. 2019-
+# SPDX-License-Identifier: MIT
+#
+
+import os
+import shutil
+import unittest
+
+from getgauge.python import data_store
+
+from gauge_web_app_steps.deferred_comparison import DeferredComparison, DeferredComparisons, deferred_comparisons
+from tests import TEST_RESOURCES_DIR, TEST_OUT_DIR
+
+
+class TestDeferredComparison(unittest.TestCase):
+
+    def setUp(self) -> None:
+        data_store.suite.clear()
+        self.out_dir = os.path.join(TEST_OUT_DIR, "deferred")
+        os.makedirs(self.out_dir, exist_ok=True)
+        self.actual_image = os.path.join(self.out_dir, "actual_rgba.png")
+        self.expected_image = os.path.join(TEST_RESOURCES_DIR, "expected_rgba.png")
+        shutil.copy(os.path.join(TEST_RESOURCES_DIR, "actual_rgba.png"), self.actual_image)
+
+    def test_deferred_comparisons_are_kept_per_suite(self):
+        deferred_comparisons().register(DeferredComparison("expected.png", "actual.png", 0.9, "full"))
+        self.assertEqual(1, len(deferred_comparisons().comparisons))
+
+    def test_evaluate(self):
+        comparisons = DeferredComparisons([
+            DeferredComparison(self.expected_image, self.actual_image, 0.5, "full", "spec", "scenario", "step 1"),
+            DeferredComparison(self.expected_image, self.actual_image, 1.0, "full", "spec", "scenario", "step 2"),
+        ])
+        failed = comparisons.evaluate(workers=1)
+        self.assertEqual(1, len(failed))
+        self.assertEqual("step 2", failed[0].step)
+        self.assertIn("spec / scenario / step 2: SSIM", failed[0].failure_message())
+
+    def test_evaluate_missing_file(self):
+        comparisons = DeferredComparisons([DeferredComparison("missing.png", self.actual_image, 0.5, "full")])
+        failed = comparisons.evaluate(workers=1)
+        self.assertEqual(1, len(failed))
+        self.assertIsNotNone(failed[0].error)
+
+    def test_save_and_load(self):
+        file_path = os.path.join(self.out_dir, "deferred_comparisons.json")
+        DeferredComparisons([DeferredComparison("expected.png", "actual.png", 0.9, "full", step="step")]).save(file_path)
+        loaded = DeferredComparisons.load(file_path)
+        self.assertEqual([DeferredComparison("expected.png", "actual.png", 0.9, "full", step="step")], loaded.comparisons)
+
+
+if __name__ == '__main__':
+    unittest.main()
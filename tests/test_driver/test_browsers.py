@@ -47,6 +47,14 @@ class TestBrowsers(unittest.TestCase):
         self.assertTrue(Browser.OPERA.is_supported(OperatingSystem.ANDROID))
         self.assertFalse(Browser.SAFARI.is_supported(OperatingSystem.ANDROID))
 
+    def test_is_chromium(self):
+        self.assertTrue(Browser.CHROME.is_chromium())
+        self.assertTrue(Browser.EDGE.is_chromium())
+        self.assertTrue(Browser.OPERA.is_chromium())
+        self.assertFalse(Browser.FIREFOX.is_chromium())
+        self.assertFalse(Browser.INTERNET_EXPLORER.is_chromium())
+        self.assertFalse(Browser.SAFARI.is_chromium())
+
 
 if __name__ == '__main__':
     unittest.main()
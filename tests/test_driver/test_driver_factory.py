@@ -25,6 +25,14 @@ class TestLocalDriverFactory(unittest.TestCase):
             # act & assert
             self.assertRaises(AssertionError, lambda: LocalDriverFactory().create_driver())
 
+    @parameterized.expand([("true", 0), ("false", 7.0)])
+    def test_implicit_wait(self, explicit_waits_only: str, expected: float):
+        with patch.dict(os.environ, {
+            "driver_explicit_waits_only": explicit_waits_only,
+            "driver_implicit_timeout": "7"
+        }):
+            self.assertEqual(expected, LocalDriverFactory()._implicit_wait())
+
 
 class TestSaucelabsDriverFactory(unittest.TestCase):
 
@@ -0,0 +1,84 @@
+#
+# Copyright IBM Corp. 2019-
+# SPDX-License-Identifier: MIT
+#
+
+import unittest
+import os
+
+from getgauge.python import data_store
+from unittest.mock import Mock
+
+from gauge_web_app_steps.app_context import app_context_key
+from gauge_web_app_steps.element_assertions import ElementAssertion, assert_elements, check_property_and_operator
+
+
+class TestElementAssertions(unittest.TestCase):
+
+    def setUp(self):
+        data_store.scenario.clear()
+        self.app_context = Mock()
+        self.driver = Mock()
+        self.app_context.driver = self.driver
+        data_store.spec[app_context_key] = self.app_context
+        os.environ["driver_implicit_timeout"] = "1"
+
+    def _assertion(self, by_value: str, prop: str = "text", operator: str = "equals", expected: str = "foo") -> ElementAssertion:
+        return ElementAssertion("id", by_value, ("css selector", f"#{by_value}"), prop, operator, expected)
+
+    def test_assert_elements_polls_only_pending_assertions(self):
+        self.driver.execute_script.side_effect = [
+            [{"passed": True, "actual": "foo", "error": None}, {"passed": False, "actual": "bar", "error": None}],
+            [{"passed": True, "actual": "foo", "error": None}],
+        ]
+        failures = assert_elements([self._assertion("a"), self._assertion("b")])
+        self.assertEqual(failures, [])
+        first_rows = self.driver.execute_script.call_args_list[0].args[1]
+        second_rows = self.driver.execute_script.call_args_list[1].args[1]
+        self.assertEqual(first_rows, [["css selector", "#a", "text", "equals", "foo"], ["css selector", "#b", "text", "equals", "foo"]])
+        self.assertEqual(second_rows, [["css selector", "#b", "text", "equals", "foo"]])
+
+    def test_assert_elements_reports_all_failures(self):
+        os.environ["driver_implicit_timeout"] = "0"
+        self.driver.execute_script.return_value = [
+            {"passed": False, "actual": "bar", "error": None},
+            {"passed": False, "actual": None, "error": "not found"},
+            {"passed": False, "actual": None, "error": None},
+            {"passed": True, "actual": "true", "error": None},
+        ]
+        failures = assert_elements([
+            self._assertion("a", operator="contains"),
+            self._assertion("b"),
+            self._assertion("c", prop="attribute:name"),
+            self._assertion("d", prop="enabled", expected="true"),
+        ])
+        self.assertEqual(failures, [
+            "element id = a: text expected to contain foo, actual bar",
+            "element id = b: not found",
+            "element id = c: attribute:name not found",
+        ])
+
+    def test_assert_elements_matches_regexp_in_python(self):
+        os.environ["driver_implicit_timeout"] = "0"
+        self.driver.execute_script.return_value = [
+            {"passed": None, "actual": "Saved 3 items", "error": None},
+            {"passed": None, "actual": "Not saved", "error": None},
+            {"passed": None, "actual": "Saved", "error": None},
+        ]
+        failures = assert_elements([
+            self._assertion("a", operator="regexp", expected=r"Saved \d+"),
+            self._assertion("b", operator="regexp", expected="Saved"),
+            self._assertion("c", operator="regexp", expected="Saved$"),
+        ])
+        self.assertEqual(failures, ["element id = b: text expected to match Saved, actual Not saved"])
+
+    def test_check_property_and_operator(self):
+        check_property_and_operator("css:color", "regexp")
+        check_property_and_operator("text", "regexp", "Saved.*")
+        self.assertRaises(AssertionError, lambda: check_property_and_operator("colour", "equals"))
+        self.assertRaises(AssertionError, lambda: check_property_and_operator("text", "is"))
+        self.assertRaises(AssertionError, lambda: check_property_and_operator("text", "regexp", "Saved ("))
+
+
+if __name__ == '__main__':
+    unittest.main()
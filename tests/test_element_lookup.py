@@ -0,0 +1,228 @@
+#
+# Copyright IBM Corp. 2019-
+# SPDX-License-Identifier: MIT
+#
+
+import unittest
+import os
+
+from appium.webdriver.webelement import WebElement as AppiumElement
+from getgauge.python import data_store
+from selenium.common.exceptions import JavascriptException, NoSuchElementException, StaleElementReferenceException, TimeoutException
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webelement import WebElement
+from unittest.mock import Mock
+
+from gauge_web_app_steps.app_context import app_context_key, element_cache_key
+from gauge_web_app_steps.element_lookup import (element_snapshot, find_attribute, find_element, get_css_property, get_marker,
+                                                get_text_from_element, invalidate_element_cache, is_element_enabled, wait_for_idle_element, wait_until)
+from gauge_web_app_steps.page_wait import PageCondition, VISIBLE
+
+
+class TestElementLookup(unittest.TestCase):
+
+    def setUp(self):
+        data_store.scenario.clear()
+        data_store.spec.clear()
+        self.app_context = Mock()
+        self.driver = Mock()
+        self.app_context.driver = self.driver
+        data_store.spec[app_context_key] = self.app_context
+        self.ids = iter(["id-1", "id-2", "id-3"])
+        self.driver.find_element.side_effect = lambda by, value: WebElement(self.driver, next(self.ids))
+        self.driver.execute.return_value = {"value": True}
+        os.environ["driver_implicit_timeout"] = "0"
+        os.environ["driver_element_cache"] = "true"
+
+    def tearDown(self):
+        del os.environ["driver_element_cache"]
+        os.environ.pop("driver_in_page_wait", None)
+        os.environ.pop("driver_element_snapshot", None)
+        os.environ.pop("driver_app_location", None)
+        os.environ.pop("driver_xpath_to_css", None)
+        data_store.spec.clear()
+
+    def test_find_element_without_cache(self):
+        os.environ["driver_element_cache"] = "false"
+        first = find_element("id", "foo")
+        second = find_element("id", "foo")
+        self.assertEqual(first.id, "id-1")
+        self.assertEqual(second.id, "id-2")
+        self.assertIsNone(data_store.spec.get(element_cache_key))
+
+    def test_find_element_reuses_cached_element(self):
+        first = find_element("id", "foo")
+        second = find_element("id", "foo")
+        self.assertIs(first, second)
+        self.assertIsInstance(first, WebElement)
+        self.driver.find_element.assert_called_once_with("css selector", "#foo")
+
+    def test_find_attribute_uses_cached_element(self):
+        self.driver.execute.return_value = {"value": "bar"}
+        find_element("id", "foo")
+        self.assertEqual(find_attribute("id", "foo", "name"), "bar")
+        self.driver.find_element.assert_called_once()
+
+    def test_find_element_immediately_bypasses_cache(self):
+        find_element("id", "foo")
+        immediate = find_element("id", "foo", immediately=True)
+        self.assertEqual(immediate.id, "id-2")
+        self.assertEqual(find_element("id", "foo").id, "id-1")
+
+    def test_find_element_not_cached(self):
+        find_element("id", "foo")
+        self.assertEqual(find_element("id", "foo", cached=False).id, "id-2")
+
+    def test_invalidate_element_cache(self):
+        first = find_element("id", "foo")
+        invalidate_element_cache()
+        second = find_element("id", "foo")
+        self.assertIsNot(first, second)
+        self.assertEqual(second.id, "id-2")
+
+    def test_stale_element_is_resolved_again(self):
+        def execute(command, params):
+            if params.get("id") == "id-1":
+                raise StaleElementReferenceException("stale")
+            return {"value": True}
+        self.driver.execute.side_effect = execute
+        element = find_element("id", "foo")
+        self.assertTrue(element.is_enabled())
+        self.assertEqual(element.id, "id-2")
+        self.driver.execute.assert_called_with(Command.IS_ELEMENT_ENABLED, {"id": "id-2"})
+        self.assertIs(find_element("id", "foo"), element)
+
+    def test_wait_until_in_page(self):
+        os.environ["driver_in_page_wait"] = "true"
+        self.driver.execute_async_script.return_value = True
+        condition = Mock(return_value="found")
+        res = wait_until(condition, page_condition=PageCondition(("css selector", "#foo"), VISIBLE))
+        self.assertEqual(res, "found")
+        condition.assert_called_once_with(self.driver)
+        args = self.driver.execute_async_script.call_args.args
+        self.assertEqual(args[1:], (["css selector", "#foo"], "visible", None, None, 0))
+
+    def test_wait_until_in_page_timed_out(self):
+        os.environ["driver_in_page_wait"] = "true"
+        self.driver.execute_async_script.return_value = False
+        condition = Mock(return_value=False)
+        with self.assertRaises(TimeoutException):
+            wait_until(condition, page_condition=PageCondition(("css selector", "#foo"), VISIBLE))
+        condition.assert_called_once()
+
+    def test_wait_until_in_page_not_supported(self):
+        os.environ["driver_in_page_wait"] = "true"
+        self.driver.execute_async_script.return_value = None
+        condition = Mock(side_effect=[False, "found"])
+        os.environ["driver_implicit_timeout"] = "1"
+        res = wait_until(condition, page_condition=PageCondition(("accessibility id", "foo"), VISIBLE))
+        self.assertEqual(res, "found")
+
+    def test_wait_until_in_page_fails(self):
+        os.environ["driver_in_page_wait"] = "true"
+        self.driver.execute_async_script.side_effect = JavascriptException("document unloaded")
+        condition = Mock(return_value="found")
+        self.assertEqual(wait_until(condition, page_condition=PageCondition(("css selector", "#foo"), VISIBLE)), "found")
+        self.app_context.report.log_debug.assert_called()
+
+    def test_wait_until_without_in_page_wait(self):
+        condition = Mock(return_value="found")
+        self.assertEqual(wait_until(condition, page_condition=PageCondition(("css selector", "#foo"), VISIBLE)), "found")
+        self.driver.execute_async_script.assert_not_called()
+
+    def _snapshot_state(self, **state):
+        snapshot = {
+            "tagName": "input", "text": "", "value": "bar", "selectedValue": None, "enabled": True, "selected": False,
+            "displayed": True, "focused": False, "rect": {"x": 0, "y": 0, "width": 10, "height": 10}, "attributes": {}, "css": {},
+        }
+        snapshot.update(state)
+        return snapshot
+
+    def test_element_snapshot(self):
+        self.driver.execute_script.return_value = self._snapshot_state(attributes={"name": "foo"}, css={"color": "red"})
+        snapshot = element_snapshot("id", "foo", attributes=["name"], css_properties=["color"])
+        self.assertEqual(snapshot.input_text, "bar")
+        self.assertEqual(snapshot.attributes["name"], "foo")
+        self.assertEqual(snapshot.css["color"], "red")
+        args = self.driver.execute_script.call_args.args
+        self.assertEqual(args[1].id, "id-1")
+        self.assertEqual(args[2:], (["name"], ["color"]))
+
+    def test_element_snapshot_of_missing_element(self):
+        self.driver.find_element.side_effect = NoSuchElementException("missing")
+        self.assertIsNone(element_snapshot("id", "foo", immediately=True))
+
+    def test_element_snapshot_resolves_stale_element(self):
+        states = [StaleElementReferenceException("stale"), self._snapshot_state()]
+        def execute_script(script, element, attributes, css_properties):
+            self.assertEqual(element.id, "id-2" if len(states) == 1 else "id-1")
+            state = states.pop(0)
+            if isinstance(state, Exception):
+                raise state
+            return state
+        self.driver.execute_script.side_effect = execute_script
+        self.assertEqual(element_snapshot("id", "foo").value, "bar")
+
+    def test_assertion_helpers_use_snapshot(self):
+        os.environ["driver_element_snapshot"] = "true"
+        self.driver.execute_script.return_value = self._snapshot_state(
+            tagName="div", text="text", enabled=False, attributes={"name": None})
+        self.assertEqual(get_text_from_element("id", "foo"), "text")
+        self.assertFalse(is_element_enabled("id", "foo"))
+        self.assertIsNone(find_attribute("id", "foo", "name", immediately=True))
+        self.driver.execute.assert_not_called()
+
+    def test_css_property_is_read_by_driver_with_snapshot(self):
+        os.environ["driver_element_snapshot"] = "true"
+        self.driver.execute.return_value = {"value": "rgba(255, 0, 0, 1)"}
+        self.assertEqual(get_css_property("id", "foo", "color"), "rgba(255, 0, 0, 1)")
+        self.assertEqual(self.driver.execute.call_args.args[0], Command.GET_ELEMENT_VALUE_OF_CSS_PROPERTY)
+        self.driver.execute_script.assert_not_called()
+
+    def test_assertion_helpers_without_snapshot(self):
+        self.driver.execute.return_value = {"value": False}
+        self.assertFalse(is_element_enabled("id", "foo"))
+        self.driver.execute_script.assert_not_called()
+
+    def test_wait_for_idle_element_in_page(self):
+        self.driver.execute_async_script.return_value = True
+        element = WebElement(self.driver, "element")
+        wait_for_idle_element("id", "foo", element)
+        self.assertEqual(self.driver.execute_async_script.call_args.args[1:], (element, 3, 0))
+        self.driver.find_element.assert_not_called()
+        self.driver.execute_script.assert_not_called()
+
+    def test_wait_for_idle_element_polls_stale_element(self):
+        self.driver.execute_async_script.side_effect = StaleElementReferenceException("stale")
+        self.driver.execute_script.return_value = {"top": 10, "left": 0}
+        os.environ["driver_implicit_timeout"] = "1"
+        wait_for_idle_element("id", "foo")
+        self.assertEqual(self.driver.execute_script.call_count, 2)
+
+    def test_wait_for_idle_element_in_app(self):
+        os.environ["driver_app_location"] = "app.apk"
+        os.environ["driver_implicit_timeout"] = "1"
+        element = Mock(spec=AppiumElement)
+        element.location_in_view = {"x": 0, "y": 10}
+        self.driver.find_element.side_effect = None
+        self.driver.find_element.return_value = element
+        wait_for_idle_element("id", "foo")
+        self.driver.execute_async_script.assert_not_called()
+        self.assertEqual(self.driver.find_element.call_count, 2)
+
+    def test_get_marker_keeps_xpath(self):
+        self.assertEqual(get_marker("xpath", "//div[@id='foo']"), ("xpath", "//div[@id='foo']"))
+
+    def test_get_marker_rewrites_xpath_to_css(self):
+        os.environ["driver_xpath_to_css"] = "true"
+        self.assertEqual(get_marker("xpath", "//div[@id='foo']"), ("css selector", 'div[id="foo"]'))
+        self.assertEqual(get_marker("xpath", "//div[text()='foo']"), ("xpath", "//div[text()='foo']"))
+
+    def test_get_marker_keeps_xpath_in_app(self):
+        os.environ["driver_xpath_to_css"] = "true"
+        os.environ["driver_app_location"] = "app.apk"
+        self.assertEqual(get_marker("xpath", "//div[@id='foo']"), ("xpath", "//div[@id='foo']"))
+
+
+if __name__ == '__main__':
+    unittest.main()
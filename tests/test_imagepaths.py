@@ -0,0 +1,60 @@
+#
+# Copyright IBM Corp. 2019-
+# SPDX-License-Identifier: MIT
+#
+
+import os
+import unittest
+
+from unittest.mock import patch
+
+from gauge_web_app_steps.imagepaths import ImagePath
+from tests import TEST_OUT_DIR
+
+
+class TestImagePath(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.env_patcher = patch.dict(os.environ, {"GAUGE_PROJECT_ROOT": TEST_OUT_DIR})
+        self.env_patcher.start()
+
+    def tearDown(self) -> None:
+        self.env_patcher.stop()
+
+    def test_create_expected_screenshot_file_path(self):
+        result = ImagePath("chrome", True).create_expected_screenshot_file_path("page.png", 2)
+        self.assertEqual(os.path.join(TEST_OUT_DIR, "expected_screenshots", "headless_chrome_page_2.png"), result)
+
+    def test_create_expected_screenshot_file_path_in_css_pixels(self):
+        with patch.dict(os.environ, {"screenshot_css_pixels": "true"}):
+            result = ImagePath("chrome", False).create_expected_screenshot_file_path("page", 1)
+        self.assertEqual("chrome@1x_page_1.png", os.path.basename(result))
+
+    def test_directories_are_created_once(self):
+        image_path = ImagePath("chrome", False)
+        with patch("os.makedirs") as patched_makedirs:
+            image_path.create_actual_screenshot_file_path("a")
+            image_path.create_actual_screenshot_file_path("b")
+            patched_makedirs.assert_called_once()
+
+    def test_create_screenshot_file_path_with_pattern(self):
+        with patch.dict(os.environ, {"filename_pattern": "%{name}-%{browser}.%{ext}"}):
+            result = ImagePath("firefox", False).create_screenshot_file_path("shot")
+        self.assertEqual("shot-firefox.png", os.path.basename(result))
+
+    def test_sharding_by_spec(self):
+        with patch.dict(os.environ, {"screenshot_dir_sharding": "spec"}):
+            image_path = ImagePath("chrome", False, "My Spec: login")
+            actual = image_path.create_actual_screenshot_file_path("page")
+            expected = image_path.create_expected_screenshot_file_path("page")
+        self.assertEqual(os.path.join(TEST_OUT_DIR, "actual_screenshots", "My_Spec_login", "chrome_page.png"), actual)
+        self.assertEqual(os.path.join(TEST_OUT_DIR, "expected_screenshots", "chrome_page.png"), expected)
+
+    def test_sharding_by_stream(self):
+        with patch.dict(os.environ, {"screenshot_dir_sharding": "stream"}):
+            result = ImagePath("chrome", False).create_actual_screenshot_file_path("page")
+        self.assertEqual(f"stream_{os.getpid()}", os.path.basename(os.path.dirname(result)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,10 +9,11 @@ import shutil
 import unittest
 from numpy import uint8
 from skimage import img_as_ubyte, io
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 from parameterized import parameterized
 
 from gauge_web_app_steps.images import Images
+from gauge_web_app_steps.manifest import file_sha256
 from tests import TEST_RESOURCES_DIR, TEST_OUT_DIR
 
 
@@ -49,6 +50,125 @@ class TestImages(unittest.TestCase):
         self.assertFalse(os.path.exists(mergefile))
         self.assertTrue(os.path.exists(expected_diff_file), f"{expected_diff_file} does not exist")
 
+    @patch('gauge_web_app_steps.images.skimg_io.imread')
+    def test_adapt_and_compare_images_identical_hash(self, patched_imread):
+        ssim = self.test_instance.adapt_and_compare_images(
+            expected_screenshot_full_path=self.expected_image,
+            actual_screenshot_full_path=self.actual_image,
+            expected_sha256=file_sha256(self.actual_image))
+        self.assertEqual(1.0, ssim)
+        patched_imread.assert_not_called()
+
+    def test_adapt_and_compare_images_integral_engine(self):
+        reference = self.test_instance.adapt_and_compare_images(self.expected_image, self.actual_image, output_path=self.diffs_dir)
+        with patch.dict(os.environ, {"ssim_engine": "integral"}):
+            ssim = self.test_instance.adapt_and_compare_images(self.expected_image, self.actual_image, output_path=self.diffs_dir)
+        self.assertAlmostEqual(reference, ssim, places=9)
+
+    @patch.dict(os.environ, {"ssim_pyramid": "true"})
+    def test_adapt_and_compare_images_pyramid_decides_clear_pass(self):
+        ssim = self.test_instance.adapt_and_compare_images(
+            expected_screenshot_full_path=self.expected_image,
+            actual_screenshot_full_path=self.actual_image,
+            output_path=self.diffs_dir,
+            threshold=0.5)
+        self.assertGreater(ssim, 0.5)
+        self.test_instance.report.log_debug.assert_any_call(f"SSIM {ssim} at 1/4 resolution decided the comparison")
+
+    @patch.dict(os.environ, {"ssim_pyramid": "true"})
+    def test_adapt_and_compare_images_pyramid_compares_uncertain_at_full_resolution(self):
+        expected_diff_file = os.path.join(self.diffs_dir, "actual_rgba_full.png")
+        self._remove_image_if_it_exists(expected_diff_file)
+        ssim = self.test_instance.adapt_and_compare_images(
+            expected_screenshot_full_path=self.expected_image,
+            actual_screenshot_full_path=self.actual_image,
+            output_path=self.diffs_dir,
+            threshold=0.99)
+        self.assertLess(ssim, 1.0)
+        self.test_instance.report.log_debug.assert_any_call("full resolution decides the comparison")
+        self.assertTrue(os.path.exists(expected_diff_file))
+
+    @patch.dict(os.environ, {"ssim_pyramid": "true"})
+    def test_adapt_and_compare_images_pyramid_decides_clear_failure(self):
+        inverted_image = os.path.join(TEST_OUT_DIR, "actual_screenshots", "inverted_rgb.png")
+        io.imsave(inverted_image, 255 - io.imread(self.expected_image_rgb), check_contrast=False)
+        expected_diff_file = os.path.join(self.diffs_dir, "inverted_rgb_full.png")
+        self._remove_image_if_it_exists(expected_diff_file)
+        ssim = self.test_instance.adapt_and_compare_images(
+            expected_screenshot_full_path=self.expected_image_rgb,
+            actual_screenshot_full_path=inverted_image,
+            output_path=self.diffs_dir,
+            threshold=0.9)
+        self.assertLess(ssim, 0.9)
+        self.test_instance.report.log_debug.assert_any_call(f"SSIM {ssim} at 1/4 resolution decided the comparison")
+        self.assertTrue(os.path.exists(expected_diff_file))
+
+    def test_comparison_key_of_pyramid_depends_on_threshold(self):
+        self.assertEqual(self.test_instance.comparison_key(0.9), self.test_instance.comparison_key(0.99))
+        with patch.dict(os.environ, {"ssim_pyramid": "true"}):
+            self.assertNotEqual(self.test_instance.comparison_key(0.9), self.test_instance.comparison_key(0.99))
+
+    def test_adapt_and_compare_pixels(self):
+        diff_file = os.path.join(self.diffs_dir, "actual_rgba_pixels.png")
+        self._remove_image_if_it_exists(diff_file)
+        difference = self.test_instance.adapt_and_compare_pixels(self.expected_image, self.actual_image, output_path=self.diffs_dir)
+        self.assertGreater(difference, 0.0)
+        self.assertLess(difference, 5.0)
+        self.assertTrue(os.path.exists(diff_file))
+
+    def test_adapt_and_compare_pixels_ignores_antialiasing(self):
+        expected = np.zeros((20, 20, 3), dtype=uint8)
+        expected[:, 10:] = 255
+        actual = expected.copy()
+        # a blended edge, as it results from anti-aliasing
+        actual[:, 10] = 128
+        expected_file = os.path.join(self.crop_dir, "expected_edge.png")
+        actual_file = os.path.join(self.crop_dir, "actual_edge.png")
+        io.imsave(expected_file, expected, check_contrast=False)
+        io.imsave(actual_file, actual, check_contrast=False)
+        self.assertEqual(0.0, self.test_instance.adapt_and_compare_pixels(expected_file, actual_file))
+        with patch.dict(os.environ, {"pixel_tolerance_antialiasing": "false"}):
+            self.assertEqual(5.0, self.test_instance.adapt_and_compare_pixels(expected_file, actual_file))
+
+    def test_adapt_and_compare_pixels_of_identical_images(self):
+        difference = self.test_instance.adapt_and_compare_pixels(self.expected_image, self.expected_image)
+        self.assertEqual(0.0, difference)
+        self.test_instance.report.log_image.assert_not_called()
+
+    def test_adapt_and_compare_pixels_detects_shift(self):
+        expected = io.imread(self.expected_image_rgb)
+        shifted_file = os.path.join(self.crop_dir, "shifted_rgb.png")
+        io.imsave(shifted_file, np.roll(expected, 1, axis=1), check_contrast=False)
+        difference = self.test_instance.adapt_and_compare_pixels(self.expected_image_rgb, shifted_file)
+        with patch.dict(os.environ, {"pixel_tolerance_antialiasing": "false"}):
+            unfiltered = self.test_instance.adapt_and_compare_pixels(self.expected_image_rgb, shifted_file)
+        self.assertGreater(difference, 1.0)
+        self.assertLessEqual(difference, unfiltered)
+
+    def test__is_anti_aliased(self):
+        expected = np.array([[0, 0, 0, 255, 255]] * 5, dtype=np.uint8)
+        actual = expected.copy()
+        actual[:, 2] = 128
+        ys, xs = np.array([2, 2]), np.array([2, 3])
+        result = self.test_instance._is_anti_aliased(actual, expected, ys, xs)
+        self.assertEqual([True, False], result.tolist())
+
+    def test__is_anti_aliased_with_one_flat_extreme(self):
+        # the dark neighbours on the left are flat, the bright neighbours on the right are a checkerboard
+        expected = np.zeros((5, 5), dtype=np.uint8)
+        expected[:, 3] = [200, 255, 200, 255, 200]
+        expected[:, 4] = [255, 200, 255, 200, 255]
+        actual = expected.copy()
+        actual[:, 2] = 128
+        result = self.test_instance._is_anti_aliased(actual, expected, np.array([2]), np.array([2]))
+        self.assertEqual([True], result.tolist())
+
+    def test__is_anti_aliased_isolated_pixel(self):
+        img = np.zeros((5, 5), dtype=np.uint8)
+        img[2, 2] = 128
+        result = self.test_instance._is_anti_aliased(img, np.zeros((5, 5), dtype=np.uint8), np.array([2]), np.array([2]))
+        self.assertEqual([False], result.tolist())
+
     def test__align_alpha_channel_of_actual_image__no_change(self):
         img_expected = io.imread(self.expected_image)
         img_actual = io.imread(self.actual_image)
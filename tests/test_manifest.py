@@ -0,0 +1,91 @@
+#
+# Copyright IBM Corp. 2019-
+# SPDX-License-Identifier: MIT
+#
+
+import os
+import shutil
+import time
+import unittest
+
+from unittest.mock import patch
+
+from gauge_web_app_steps.manifest import MANIFEST_FILE_NAME, BaselineManifest, _LOCK_FILE_NAME, _LOCK_STALE_SECONDS, file_sha256
+from tests import TEST_OUT_DIR, TEST_RESOURCES_DIR
+
+
+class TestBaselineManifest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.baseline_dir = os.path.join(TEST_OUT_DIR, "manifest_baselines")
+        shutil.rmtree(self.baseline_dir, ignore_errors=True)
+        os.makedirs(self.baseline_dir)
+        for file_name in ("headless_chrome_page_1.png", "headless_chrome_page_2.png", "firefox_logo.png"):
+            shutil.copy(os.path.join(TEST_RESOURCES_DIR, "expected_rgba.png"), os.path.join(self.baseline_dir, file_name))
+
+    def test_load_indexes_baselines(self):
+        manifest = BaselineManifest.load(self.baseline_dir)
+        self.assertTrue(os.path.isfile(os.path.join(self.baseline_dir, MANIFEST_FILE_NAME)))
+        entry = manifest.get(os.path.join(self.baseline_dir, "headless_chrome_page_2.png"))
+        self.assertEqual(("headless_chrome", "page", 2), (entry.key, entry.name, entry.page))
+        self.assertEqual(4, entry.channels)
+        self.assertEqual(file_sha256(os.path.join(TEST_RESOURCES_DIR, "expected_rgba.png")), entry.sha256)
+        logo = manifest.get("firefox_logo.png")
+        self.assertEqual(("firefox", "logo", None), (logo.key, logo.name, logo.page))
+        self.assertEqual(entry.phash, logo.phash)
+        self.assertFalse(manifest.contains("chrome_page_1.png"))
+
+    def test_load_indexes_only_changed_files(self):
+        BaselineManifest.load(self.baseline_dir)
+        shutil.copy(os.path.join(TEST_RESOURCES_DIR, "expected_rgb.png"), os.path.join(self.baseline_dir, "firefox_logo.png"))
+        os.remove(os.path.join(self.baseline_dir, "headless_chrome_page_2.png"))
+        with patch.object(BaselineManifest, "_index", wraps=BaselineManifest(self.baseline_dir)._index) as patched_index:
+            manifest = BaselineManifest.load(self.baseline_dir)
+            patched_index.assert_called_once()
+        self.assertEqual(3, manifest.get("firefox_logo.png").channels)
+        self.assertFalse(manifest.contains("headless_chrome_page_2.png"))
+
+    def test_page_count(self):
+        manifest = BaselineManifest.load(self.baseline_dir)
+        self.assertEqual(2, manifest.page_count("headless_chrome_page_1.png"))
+        self.assertEqual(0, manifest.page_count("firefox_logo.png"))
+        self.assertEqual(0, manifest.page_count("safari_page_1.png"))
+
+    def test_numeric_suffix_without_first_page(self):
+        shutil.copy(os.path.join(TEST_RESOURCES_DIR, "expected_rgba.png"), os.path.join(self.baseline_dir, "firefox_logo_2.png"))
+        manifest = BaselineManifest.load(self.baseline_dir)
+        logo = manifest.get("firefox_logo_2.png")
+        self.assertEqual(("firefox", "logo_2", None), (logo.key, logo.name, logo.page))
+        self.assertEqual(0, manifest.page_count("firefox_logo_2.png"))
+
+    def test_removed_first_page(self):
+        BaselineManifest.load(self.baseline_dir)
+        os.remove(os.path.join(self.baseline_dir, "headless_chrome_page_1.png"))
+        manifest = BaselineManifest.load(self.baseline_dir)
+        page = manifest.get("headless_chrome_page_2.png")
+        self.assertEqual(("page_2", None), (page.name, page.page))
+
+    def test_load_up_to_date_manifest_without_lock(self):
+        BaselineManifest.load(self.baseline_dir)
+        lock_path = os.path.join(self.baseline_dir, _LOCK_FILE_NAME)
+        open(lock_path, "w").close()
+        try:
+            with patch.object(BaselineManifest, "_index") as patched_index:
+                manifest = BaselineManifest.load(self.baseline_dir)
+                patched_index.assert_not_called()
+            self.assertEqual(3, len(manifest.entries))
+        finally:
+            os.remove(lock_path)
+
+    def test_load_breaks_stale_lock(self):
+        lock_path = os.path.join(self.baseline_dir, _LOCK_FILE_NAME)
+        open(lock_path, "w").close()
+        stale = time.time() - _LOCK_STALE_SECONDS - 1
+        os.utime(lock_path, (stale, stale))
+        manifest = BaselineManifest.load(self.baseline_dir)
+        self.assertEqual(3, len(manifest.entries))
+        self.assertFalse(os.path.exists(lock_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
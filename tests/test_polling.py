@@ -0,0 +1,64 @@
+#
+# Copyright IBM Corp. 2019-
+# SPDX-License-Identifier: MIT
+#
+
+import unittest
+
+from itertools import islice
+from parameterized import parameterized
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from unittest.mock import Mock
+
+from gauge_web_app_steps.polling import (ExponentialPolling, FixedPolling, JitteredPolling, PollStats,
+                                         create_polling_strategy, poll)
+
+
+class TestPolling(unittest.TestCase):
+
+    def test_fixed_intervals(self):
+        self.assertEqual(list(islice(FixedPolling(0.25).intervals(), 3)), [0.25, 0.25, 0.25])
+
+    def test_exponential_intervals(self):
+        intervals = list(islice(ExponentialPolling(0.005, 0.03).intervals(), 5))
+        self.assertEqual(intervals, [0.005, 0.01, 0.02, 0.03, 0.03])
+
+    def test_jittered_intervals(self):
+        strategy = JitteredPolling(0.005, 0.03)
+        for interval, maximum in zip(strategy.intervals(), [0.005, 0.01, 0.02, 0.03, 0.03]):
+            self.assertTrue(0.005 <= interval <= maximum)
+
+    @parameterized.expand([
+        ("fixed", FixedPolling),
+        ("exponential", ExponentialPolling),
+        ("jittered", JitteredPolling),
+    ])
+    def test_create_polling_strategy(self, name, strategy_class):
+        self.assertIsInstance(create_polling_strategy(name, 0.25, 0.005), strategy_class)
+
+    def test_create_unknown_polling_strategy(self):
+        self.assertRaises(ValueError, lambda: create_polling_strategy("sometimes", 0.25, 0.005))
+
+    def test_poll_checks_at_least_once(self):
+        stats = PollStats()
+        self.assertEqual(poll(lambda: "done", 0, FixedPolling(1), stats=stats), "done")
+        self.assertEqual(stats.polls, 1)
+
+    def test_poll_ignores_webdriver_exceptions(self):
+        condition = Mock(side_effect=[NoSuchElementException("not yet"), False, "done"])
+        stats = PollStats()
+        self.assertEqual(poll(condition, 1, ExponentialPolling(0.001, 0.01), stats=stats), "done")
+        self.assertEqual(stats.polls, 3)
+        self.assertLess(stats.waited, 0.5)
+
+    def test_poll_timeout(self):
+        stats = PollStats()
+        with self.assertRaises(TimeoutException) as cm:
+            poll(lambda: False, 0.05, FixedPolling(0.01), "never", stats)
+        self.assertEqual(cm.exception.msg, "never")
+        self.assertGreater(stats.polls, 1)
+        self.assertGreaterEqual(stats.waited, 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
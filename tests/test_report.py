@@ -27,6 +27,11 @@ class TestReport(unittest.TestCase):
             result = self.report._spec_html_report_dir()
             self.assertIn(os.path.join("reports", "html-report", "resources"), result)
 
+    @patch("gauge_web_app_steps.report.Messages")
+    def test_log_image_without_context(self, messages):
+        Report().log_image("actual.png", "actual")
+        messages.write_message.assert_not_called()
+
 
 if __name__ == '__main__':
     unittest.main()
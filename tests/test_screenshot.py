@@ -0,0 +1,284 @@
+#
+# Copyright IBM Corp. 2019-
+# SPDX-License-Identifier: MIT
+#
+
+import base64
+import imageio.v3 as iio
+import numpy as np
+import os
+import unittest
+
+from getgauge.python import data_store
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from skimage import io
+from unittest.mock import Mock, call, patch
+
+from gauge_web_app_steps.app_context import app_context_key, step_context_key
+from gauge_web_app_steps.deferred_comparison import deferred_comparisons
+from gauge_web_app_steps.imagepaths import ImagePath
+from gauge_web_app_steps.images import Images
+from gauge_web_app_steps.screenshot import (
+    FailureBudget, RegionAssertion, _save_screenshot, _screenshot_as_png, _scroll, _stable_screenshot_as_png,
+    append_pixel_difference, append_structured_similarity, is_full_page_screenshot_supported,
+    save_full_page_screenshot, settle_scrolling, ssim_screenshot_pages, ssim_screenshot_scrolling,
+    ssim_screenshots_of_regions)
+from tests import TEST_OUT_DIR, TEST_RESOURCES_DIR
+
+
+class TestScreenshot(unittest.TestCase):
+
+    def setUp(self):
+        data_store.scenario.clear()
+        data_store.suite.clear()
+        self.app_context = Mock()
+        self.app_context.driver = Mock()
+        self.app_context.report = Mock()
+        data_store.spec[app_context_key] = self.app_context
+
+    def test_scroll_returns_true_when_page_moved(self):
+        self.app_context.driver.execute_async_script.return_value = [0, 600]
+        self.assertTrue(_scroll())
+
+    def test_scroll_returns_false_at_end_of_page(self):
+        self.app_context.driver.execute_async_script.return_value = [600, 600]
+        self.assertFalse(_scroll())
+
+    def test_settle_scrolling_passes_wait_time_as_cap(self):
+        self.app_context.driver.execute_async_script.return_value = [0, 0]
+        settle_scrolling(scroll=True, max_wait=0.3)
+        args = self.app_context.driver.execute_async_script.call_args.args
+        self.assertEqual((True, 300, 3), args[1:])
+
+    @patch('time.sleep', return_value=None)
+    def test_settle_scrolling_falls_back_to_sleep(self, patched_time_sleep):
+        self.app_context.driver.execute_async_script.side_effect = WebDriverException("unsupported")
+        self.app_context.driver.execute_script.side_effect = [0, 0, None, 600]
+        result = settle_scrolling(scroll=True, max_wait=0.5)
+        self.assertEqual((0, 600), result)
+        patched_time_sleep.assert_called_once_with(0.5)
+        self.app_context.driver.execute_script.assert_has_calls([call("window.scrollBy(0, window.innerHeight)")])
+
+    @patch('time.sleep', return_value=None)
+    def test_settle_scrolling_does_not_scroll_twice_after_timeout(self, patched_time_sleep):
+        self.app_context.driver.execute_async_script.side_effect = TimeoutException("timeout")
+        self.app_context.driver.execute_script.side_effect = [0, 0, 600]
+        result = settle_scrolling(scroll=True, max_wait=0.5)
+        self.assertEqual((0, 600), result)
+        self.assertNotIn(call("window.scrollBy(0, window.innerHeight)"), self.app_context.driver.execute_script.call_args_list)
+
+    @patch('time.sleep', return_value=None)
+    def test_settle_scrolling_does_not_scroll_twice_after_script_scrolled(self, patched_time_sleep):
+        self.app_context.driver.execute_async_script.side_effect = WebDriverException("failed")
+        self.app_context.driver.execute_script.side_effect = [0, 300, 600]
+        result = settle_scrolling(scroll=True, max_wait=0.5)
+        self.assertEqual((0, 600), result)
+        self.assertNotIn(call("window.scrollBy(0, window.innerHeight)"), self.app_context.driver.execute_script.call_args_list)
+
+    def test_is_full_page_screenshot_supported(self):
+        with patch.dict(os.environ, {"screenshot_whole_page_no_scroll": "true", "driver_browser": "chrome"}):
+            self.assertTrue(is_full_page_screenshot_supported())
+        with patch.dict(os.environ, {"screenshot_whole_page_no_scroll": "true", "driver_browser": "safari"}):
+            self.assertFalse(is_full_page_screenshot_supported())
+        with patch.dict(os.environ, {"screenshot_whole_page_no_scroll": "false", "driver_browser": "firefox"}):
+            self.assertFalse(is_full_page_screenshot_supported())
+
+    def test_is_full_page_screenshot_supported_without_devtools(self):
+        self.app_context.driver = Mock(spec=["save_screenshot"])
+        with patch.dict(os.environ, {"screenshot_whole_page_no_scroll": "true", "driver_browser": "chrome"}):
+            self.assertFalse(is_full_page_screenshot_supported())
+
+    def test_save_full_page_screenshot_chromium(self):
+        os.makedirs(TEST_OUT_DIR, exist_ok=True)
+        path = os.path.join(TEST_OUT_DIR, "full_page.png")
+        self.app_context.driver.execute_cdp_cmd.side_effect = [
+            {"cssContentSize": {"width": 800, "height": 5000}},
+            {"data": base64.b64encode(b"png").decode("ascii")},
+        ]
+        with patch.dict(os.environ, {"driver_browser": "chrome"}):
+            save_full_page_screenshot(path)
+        capture_params = self.app_context.driver.execute_cdp_cmd.call_args.args[1]
+        self.assertTrue(capture_params["captureBeyondViewport"])
+        self.assertEqual(5000, capture_params["clip"]["height"])
+        with open(path, "rb") as f:
+            self.assertEqual(b"png", f.read())
+
+    def test_append_structured_similarity_deferred(self):
+        data_store.scenario[step_context_key] = Mock(
+            specification=Mock(), scenario=Mock(), step=Mock(text="Assert page screenshots resemble"))
+        asserts = []
+        with patch.dict(os.environ, {"screenshot_deferred_comparison": "true"}):
+            result = append_structured_similarity(asserts, "expected.png", "actual.png", 0.9)
+        self.assertIsNone(result)
+        self.assertEqual([], asserts)
+        self.app_context.images.adapt_and_compare_images.assert_not_called()
+        registered = deferred_comparisons().comparisons
+        self.assertEqual(1, len(registered))
+        self.assertEqual("Assert page screenshots resemble", registered[0].step)
+
+    def test_append_structured_similarity(self):
+        self.app_context.images.adapt_and_compare_images.return_value = 0.8
+        asserts = []
+        result = append_structured_similarity(asserts, "expected.png", "actual.png", 0.9)
+        self.assertEqual(0.8, result)
+        self.assertEqual(["SSIM 0.8 is less than threshold 0.9 for actual.png"], asserts)
+
+    @patch('gauge_web_app_steps.screenshot.file_sha256', side_effect=lambda path: f"hash of {path}")
+    @patch('gauge_web_app_steps.screenshot.verdict_cache')
+    def test_append_structured_similarity_cached(self, patched_verdict_cache, patched_file_sha256):
+        patched_verdict_cache.return_value.get.return_value = 0.95
+        self.app_context.images.comparison_key.return_value = "ssim"
+        asserts = []
+        result = append_structured_similarity(asserts, "expected.png", "actual.png", 0.9)
+        self.assertEqual(0.95, result)
+        self.assertEqual([], asserts)
+        patched_verdict_cache.return_value.get.assert_called_once_with("hash of expected.png", "hash of actual.png", "ssim")
+        self.app_context.images.adapt_and_compare_images.assert_not_called()
+
+    @patch('gauge_web_app_steps.screenshot.file_sha256', side_effect=lambda path: f"hash of {path}")
+    @patch('gauge_web_app_steps.screenshot.verdict_cache')
+    def test_append_structured_similarity_cached_failure_is_compared_again(self, patched_verdict_cache, patched_file_sha256):
+        patched_verdict_cache.return_value.get.return_value = 0.8
+        self.app_context.images.comparison_key.return_value = "ssim"
+        self.app_context.images.adapt_and_compare_images.return_value = 0.8
+        asserts = []
+        append_structured_similarity(asserts, "expected.png", "actual.png", 0.9)
+        self.assertEqual(1, len(asserts))
+        self.app_context.images.adapt_and_compare_images.assert_called_once()
+        patched_verdict_cache.return_value.put.assert_called_once_with("hash of expected.png", "hash of actual.png", "ssim", 0.8)
+
+    def test_append_pixel_difference(self):
+        self.app_context.images.adapt_and_compare_pixels.return_value = 0.5
+        asserts = []
+        result = append_pixel_difference(asserts, "expected.png", "actual.png", 0.1)
+        self.assertIsNone(result)
+        self.assertEqual(["0.5% of the pixels differ, which is more than the tolerance of 0.1% for actual.png"], asserts)
+        asserts = []
+        append_pixel_difference(asserts, "expected.png", "actual.png", 1.0)
+        self.assertEqual([], asserts)
+
+    def test_ssim_screenshot_scrolling_updates_baselines(self):
+        self.app_context.image_path = ImagePath("chrome", True)
+        self.app_context.driver.execute_async_script.side_effect = [[0, 600], [600, 600]]
+        def save_screenshot(path):
+            with open(path, "wb") as f:
+                f.write(b"png")
+        self.app_context.driver.save_screenshot.side_effect = save_screenshot
+        expected_dir = os.path.join(TEST_OUT_DIR, "expected_baselines")
+        with patch.dict(os.environ, {
+            "GAUGE_PROJECT_ROOT": TEST_OUT_DIR,
+            "expected_screenshot_dir": "expected_baselines",
+            "screenshot_update_baselines": "true",
+        }):
+            failed_asserts = ssim_screenshot_scrolling("page", 0.9)
+        self.assertEqual([], failed_asserts)
+        self.app_context.images.adapt_and_compare_images.assert_not_called()
+        self.assertTrue(os.path.isfile(os.path.join(expected_dir, "headless_chrome_page_1.png")))
+        self.assertTrue(os.path.isfile(os.path.join(expected_dir, "headless_chrome_page_2.png")))
+        self.assertEqual([], [f for f in os.listdir(expected_dir) if f.startswith(".")])
+
+    def test_ssim_screenshot_scrolling_reports_missing_baseline_pages(self):
+        self.app_context.driver.execute_async_script.return_value = [600, 600]
+        self.app_context.image_path.expected_screenshot_exists.return_value = True
+        self.app_context.image_path.expected_screenshot_entry.return_value = None
+        self.app_context.image_path.baseline_manifest.return_value.page_count.return_value = 3
+        self.app_context.images.adapt_and_compare_images.return_value = 1.0
+        failed_asserts = ssim_screenshot_scrolling("page", 0.9)
+        self.assertEqual(["the baseline has 3 pages, but only 1 pages were captured"], failed_asserts)
+
+    def test_ssim_screenshots_of_regions(self):
+        self.app_context.image_path = ImagePath("chrome", False)
+        self.app_context.images = Images(Mock())
+        with open(os.path.join(TEST_RESOURCES_DIR, "expected_rgb.png"), "rb") as f:
+            self.app_context.driver.get_screenshot_as_png.return_value = f.read()
+        self.app_context.driver.execute_script.return_value = {"pixelRatio": 1, "viewportOffset": 0, "rects": [
+            {"x": 0, "y": 0, "width": 100, "height": 50},
+            {"x": 100, "y": 50, "width": 80, "height": 60},
+        ]}
+        regions = [RegionAssertion(Mock(), "region_a", 0.99), RegionAssertion(Mock(), "region_b", 0.99)]
+        env = {"GAUGE_PROJECT_ROOT": TEST_OUT_DIR, "expected_screenshot_dir": "expected_regions"}
+        with patch.dict(os.environ, dict(env, screenshot_update_baselines="true")):
+            self.assertEqual([], ssim_screenshots_of_regions(regions))
+        with patch.dict(os.environ, env):
+            self.assertEqual([], ssim_screenshots_of_regions(regions))
+        self.assertEqual(2, self.app_context.driver.get_screenshot_as_png.call_count)
+        self.assertEqual(2, self.app_context.driver.execute_script.call_count)
+        expected = io.imread(os.path.join(TEST_OUT_DIR, "expected_regions", "chrome_region_b.png"))
+        self.assertEqual((60, 80), expected.shape[:2])
+
+    def test_save_screenshot_waits_for_equal_screenshots(self):
+        frames = [self._png(0), self._png(255), self._png(255)]
+        self.app_context.driver.get_screenshot_as_png.side_effect = frames
+        screenshot_file = os.path.join(TEST_OUT_DIR, "stable.png")
+        with patch.dict(os.environ, {"screenshot_stable_capture_timeout": "10"}):
+            _save_screenshot(screenshot_file)
+        with open(screenshot_file, "rb") as f:
+            self.assertEqual(frames[2], f.read())
+        self.assertEqual(3, self.app_context.driver.get_screenshot_as_png.call_count)
+        self.app_context.driver.save_screenshot.assert_not_called()
+
+    def test_stable_screenshot_waits_for_small_changes(self):
+        # a single changed pixel, f.i. of a blinking caret
+        img = np.zeros((16, 16, 3), dtype=np.uint8)
+        img[5, 3] = 1
+        caret = iio.imwrite("<bytes>", img, extension=".png")
+        self.app_context.driver.get_screenshot_as_png.side_effect = [self._png(0), caret, caret]
+        result = _stable_screenshot_as_png(10)
+        self.assertEqual(caret, result)
+        self.assertEqual(3, self.app_context.driver.get_screenshot_as_png.call_count)
+
+    @patch('gauge_web_app_steps.screenshot.time.monotonic', side_effect=[0.0, 0.5, 1.5])
+    def test_stable_screenshot_stops_at_timeout(self, patched_monotonic):
+        self.app_context.driver.get_screenshot_as_png.side_effect = [self._png(0), self._png(255)]
+        result = _stable_screenshot_as_png(1.0)
+        self.assertEqual(self._png(255), result)
+        self.assertEqual(2, self.app_context.driver.get_screenshot_as_png.call_count)
+
+    def test_save_screenshot_without_stable_capture(self):
+        _save_screenshot("shot.png")
+        self.app_context.driver.save_screenshot.assert_called_once_with("shot.png")
+
+    def test_save_screenshot_downsamples_to_css_pixels(self):
+        self.app_context.driver.get_screenshot_as_png.return_value = self._png(255, 32)
+        self.app_context.driver.execute_script.return_value = 2
+        screenshot_file = os.path.join(TEST_OUT_DIR, "css_pixels.png")
+        with patch.dict(os.environ, {"screenshot_css_pixels": "true"}):
+            _save_screenshot(screenshot_file)
+        self.assertEqual((16, 16, 3), io.imread(screenshot_file).shape)
+
+    def test_screenshot_in_css_pixels_is_kept_at_pixel_ratio_1(self):
+        png = self._png(255, 32)
+        self.app_context.driver.get_screenshot_as_png.return_value = png
+        self.app_context.driver.execute_script.return_value = 1
+        with patch.dict(os.environ, {"screenshot_css_pixels": "true"}):
+            self.assertIs(png, _screenshot_as_png())
+
+    def _png(self, value: int, size: int = 16) -> bytes:
+        return iio.imwrite("<bytes>", np.full((size, size, 3), value, dtype=np.uint8), extension=".png")
+
+    def test_failure_budget_max_failed_pages(self):
+        budget = FailureBudget(max_failed_pages=2, ssim_floor=0.0)
+        self.assertFalse(budget.is_exceeded(True, 0.5))
+        self.assertFalse(budget.is_exceeded(False, 0.99))
+        self.assertTrue(budget.is_exceeded(True, 0.5))
+
+    def test_failure_budget_ssim_floor(self):
+        budget = FailureBudget(max_failed_pages=0, ssim_floor=0.6)
+        self.assertFalse(budget.is_exceeded(True, 0.7))
+        self.assertFalse(budget.is_exceeded(True, None))
+        self.assertTrue(budget.is_exceeded(True, 0.5))
+
+    @patch('gauge_web_app_steps.screenshot.ActionChains')
+    @patch('os.path.isfile', return_value=True)
+    def test_ssim_screenshot_pages_stops_when_budget_exceeded(self, patched_isfile, patched_action_chains):
+        self.app_context.driver.execute_async_script.return_value = [0, 0]
+        self.app_context.images.adapt_and_compare_images.return_value = 0.1
+        with patch.dict(os.environ, {"screenshot_max_failed_pages": "1"}):
+            failed_asserts = ssim_screenshot_pages("page", 0.9, 5)
+        self.assertEqual(2, len(failed_asserts))
+        self.assertEqual("failure budget exceeded on page 1, pages 2-5 were skipped", failed_asserts[1])
+        self.assertEqual(1, self.app_context.driver.save_screenshot.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
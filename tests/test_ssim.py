@@ -0,0 +1,73 @@
+#
+# Copyright IBM Corp. 2019-
+# SPDX-License-Identifier: MIT
+#
+
+import numpy as np
+import os
+import unittest
+
+from parameterized import parameterized
+from skimage import io
+from skimage.metrics import structural_similarity as compare_ssim
+from unittest.mock import Mock
+
+from gauge_web_app_steps.ssim import MIN_TILE_ROWS, structural_similarity, tiled_structural_similarity
+from tests import TEST_RESOURCES_DIR
+
+
+class TestSsim(unittest.TestCase):
+
+    def _images(self, kind: str) -> tuple[np.ndarray, np.ndarray]:
+        expected = io.imread(os.path.join(TEST_RESOURCES_DIR, f"expected_{kind}.png"))
+        actual = io.imread(os.path.join(TEST_RESOURCES_DIR, f"actual_{kind}.png"))
+        return expected, actual
+
+    @parameterized.expand(["rgb", "rgba"])
+    def test_structural_similarity_equals_compare_ssim(self, kind: str):
+        expected, actual = self._images(kind)
+        result = structural_similarity(actual, expected, channel_axis=2, data_range=255)
+        self.assertAlmostEqual(compare_ssim(actual, expected, channel_axis=2, data_range=255), result, places=9)
+
+    def test_structural_similarity_full_equals_compare_ssim(self):
+        expected, actual = self._images("rgba")
+        ssim, full = structural_similarity(actual, expected, channel_axis=2, data_range=255, full=True)
+        reference_ssim, reference_full = compare_ssim(actual, expected, channel_axis=2, data_range=255, full=True)
+        self.assertAlmostEqual(reference_ssim, ssim, places=9)
+        self.assertEqual(reference_full.shape, full.shape)
+        self.assertLess(np.abs(reference_full - full).max(), 1e-9)
+
+    def test_structural_similarity_of_float_grayscale_images(self):
+        expected, actual = self._images("rgb")
+        expected = expected[..., 0] / 3.0
+        actual = actual[..., 0] / 3.0
+        result = structural_similarity(actual, expected, data_range=255, win_size=11)
+        self.assertAlmostEqual(compare_ssim(actual, expected, data_range=255, win_size=11), result, places=9)
+
+    def test_structural_similarity_of_identical_images(self):
+        expected, _ = self._images("rgb")
+        self.assertAlmostEqual(1.0, structural_similarity(expected, expected, channel_axis=2), places=12)
+
+    @parameterized.expand([("skimage", compare_ssim), ("integral", structural_similarity)])
+    def test_tiled_structural_similarity_is_exact(self, _, ssim_function):
+        expected, actual = self._images("rgba")
+        reference_ssim, reference_full = ssim_function(actual, expected, channel_axis=2, data_range=255, full=True)
+        ssim, full = tiled_structural_similarity(ssim_function, actual, expected, 2, channel_axis=2, data_range=255, full=True)
+        self.assertAlmostEqual(reference_ssim, ssim, places=12)
+        self.assertLess(np.abs(reference_full - full).max(), 1e-12)
+
+    def test_tiled_structural_similarity_of_small_images_is_not_tiled(self):
+        expected, actual = self._images("rgb")
+        ssim_function = Mock(return_value=0.5)
+        result = tiled_structural_similarity(ssim_function, actual[:MIN_TILE_ROWS], expected[:MIN_TILE_ROWS], 4, channel_axis=2)
+        self.assertEqual(0.5, result)
+        ssim_function.assert_called_once()
+
+    def test_structural_similarity_needs_same_dimensions(self):
+        expected, actual = self._images("rgb")
+        with self.assertRaises(ValueError):
+            structural_similarity(expected, actual[:-1], channel_axis=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -80,6 +80,53 @@ class TestSubstitute(unittest.TestCase):
     def test_substitute_raises_with_invalid_expression(self):
         self.assertRaises(ValueError, lambda: substitute("!{nonexistent}"))
 
+    def test_substitute_placeholder_in_time_format(self):
+        data_store.scenario["year_format"] = "%Y"
+        result = substitute("!{time:${year_format}}")
+        self.assertTrue(re.fullmatch("[0-9]{4}", result) is not None)
+
+    def test_substitute_keeps_unknown_placeholder(self):
+        result = substitute("${unknown} and $unknown #{1 + 1}")
+        self.assertEqual("${unknown} and $unknown 2", result)
+
+    def test_substitute_escaped_placeholder(self):
+        data_store.scenario["escaped"] = "lala"
+        result = substitute("$${escaped} costs $$5")
+        self.assertEqual("lala costs $5", result)
+
+    def test_substitute_value_with_brackets(self):
+        os.environ["expression_start"] = "#{"
+        result = substitute("${expression_start}1 + 1}")
+        self.assertEqual("2", result)
+
+    def test_substitute_repeatedly_looks_up_values(self):
+        data_store.scenario["counter"] = 1
+        self.assertEqual("#1", substitute("#${counter}"))
+        data_store.scenario["counter"] = 2
+        self.assertEqual("#2", substitute("#${counter}"))
+
+    def test_substitute_long_text(self):
+        os.environ["a"] = "1"
+        result = substitute("${a} + #{1 + 1}, " * 1000)
+        self.assertEqual("1 + 2, " * 1000, result)
+
+    def test_substitute_empty_value_before_bracket(self):
+        os.environ["empty_env"] = ""
+        data_store.scenario["empty_value"] = ""
+        data_store.scenario["two"] = "2"
+        self.assertEqual("!{2", substitute("!$empty_env{${two}"))
+        self.assertEqual("2", substitute("#${empty_value}{1 + 1}"))
+        self.assertRaises(SyntaxError, substitute, "#${empty_value}{}x")
+        self.assertRaises(ValueError, substitute, "!${empty_value}{}")
+
+    def test_substitute_nested_placeholder(self):
+        data_store.scenario["two"] = "2"
+        self.assertEqual("1${2}{#two", substitute("1${${two}}{#two"))
+
+    def test_substitute_expression_value_forms_new_expression(self):
+        self.assertRegex(substitute("!!{time:{}uuid}"), "^[0-9a-f]{8}.[0-9a-f]{4}.[0-9a-f]{4}.[0-9a-f]{4}.[0-9a-f]{12}$")
+        self.assertRegex(substitute("!!{time:}{uuid}"), "^[0-9a-f]{8}.[0-9a-f]{4}.[0-9a-f]{4}.[0-9a-f]{4}.[0-9a-f]{12}$")
+
 
     def _datetime_valid(self, dt_str: str) -> bool:
         try:
@@ -0,0 +1,81 @@
+#
+# Copyright IBM Corp. 2019-
+# SPDX-License-Identifier: MIT
+#
+
+import csv
+import json
+import os
+import tempfile
+import unittest
+
+from getgauge.python import data_store
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from unittest.mock import Mock, patch
+
+from gauge_web_app_steps.app_context import app_context_key
+from gauge_web_app_steps.element_lookup import find_element
+from gauge_web_app_steps.telemetry import LocatorTelemetry, locator_telemetry_key, write_locator_telemetry
+
+
+class TestLocatorTelemetry(unittest.TestCase):
+
+    def setUp(self):
+        data_store.suite.clear()
+        data_store.scenario.clear()
+        self.app_context = Mock()
+        data_store.spec[app_context_key] = self.app_context
+        os.environ["driver_implicit_timeout"] = "1"
+        os.environ["driver_polling"] = "exponential"
+        os.environ["driver_locator_telemetry"] = "true"
+
+    def tearDown(self):
+        del os.environ["driver_polling"]
+        del os.environ["driver_locator_telemetry"]
+        data_store.suite.clear()
+
+    def test_record(self):
+        telemetry = LocatorTelemetry()
+        telemetry.record(("xpath", "//a"), 3, 0.5, 0.3, found=True, waited=True)
+        telemetry.record(("xpath", "//a"), 1, 0.1, 0.1, found=True, waited=True)
+        telemetry.record(("xpath", "//a"), 5, 1.0, 0.5, found=False, waited=True)
+        telemetry.record(("css selector", "#b"), 1, 0.05, 0.05, found=False, waited=False)
+        slowest, fastest = telemetry.slowest()
+        self.assertEqual((slowest.by, slowest.by_value), ("xpath", "//a"))
+        self.assertEqual((slowest.lookups, slowest.attempts, slowest.found, slowest.timeouts, slowest.misses), (3, 9, 2, 1, 0))
+        self.assertAlmostEqual(slowest.total_time, 1.6)
+        self.assertAlmostEqual(slowest.mean_time_to_success, 0.3)
+        self.assertAlmostEqual(slowest.max_time_to_success, 0.5)
+        self.assertAlmostEqual(slowest.mean_driver_time, 0.1)
+        self.assertEqual(fastest.misses, 1)
+
+    def test_find_element_records_attempts(self):
+        self.app_context.driver.find_element.side_effect = [NoSuchElementException("not yet"), Mock()]
+        find_element("id", "foo", cached=False)
+        stats = data_store.suite[locator_telemetry_key].locators[("css selector", "#foo")]
+        self.assertEqual((stats.lookups, stats.attempts, stats.found), (1, 2, 1))
+
+    def test_find_element_records_timeout(self):
+        os.environ["driver_implicit_timeout"] = "0"
+        self.app_context.driver.find_element.side_effect = NoSuchElementException("missing")
+        self.assertRaises(TimeoutException, lambda: find_element("id", "foo", cached=False))
+        self.assertIsNone(find_element("id", "foo", immediately=True))
+        stats = data_store.suite[locator_telemetry_key].locators[("css selector", "#foo")]
+        self.assertEqual((stats.lookups, stats.found, stats.timeouts, stats.misses), (2, 0, 1, 1))
+
+    def test_write_locator_telemetry(self):
+        telemetry = LocatorTelemetry()
+        telemetry.record(("xpath", "//a"), 3, 0.5, 0.3, found=True, waited=True)
+        data_store.suite[locator_telemetry_key] = telemetry
+        with tempfile.TemporaryDirectory() as reports_dir, patch.dict(os.environ, {"gauge_reports_dir": reports_dir}):
+            write_locator_telemetry()
+            telemetry_dir = os.path.join(reports_dir, "locator-telemetry")
+            json_file, csv_file = sorted(os.listdir(telemetry_dir))[::-1]
+            with open(os.path.join(telemetry_dir, json_file)) as f:
+                self.assertEqual(json.load(f)[0]["by_value"], "//a")
+            with open(os.path.join(telemetry_dir, csv_file)) as f:
+                self.assertEqual(next(csv.DictReader(f))["attempts"], "3")
+
+
+if __name__ == '__main__':
+    unittest.main()
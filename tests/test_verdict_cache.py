@@ -0,0 +1,45 @@
+#
+# Copyright IBM Corp. 2019-
+# SPDX-License-Identifier: MIT
+#
+
+import os
+import unittest
+
+from gauge_web_app_steps.verdict_cache import VerdictCache
+from tests import TEST_OUT_DIR
+
+
+class TestVerdictCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.file_path = os.path.join(TEST_OUT_DIR, "verdicts.sqlite")
+        os.makedirs(TEST_OUT_DIR, exist_ok=True)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.file_path + suffix):
+                os.remove(self.file_path + suffix)
+
+    def test_put_and_get(self):
+        cache = VerdictCache(self.file_path, 10)
+        cache.put("e", "a", "ssim", 0.95)
+        self.assertEqual(0.95, cache.get("e", "a", "ssim"))
+        self.assertIsNone(cache.get("e", "a", "other"))
+        cache.close()
+        reopened = VerdictCache(self.file_path, 10)
+        self.assertEqual(0.95, reopened.get("e", "a", "ssim"))
+        reopened.close()
+
+    def test_least_recently_used_are_evicted(self):
+        cache = VerdictCache(self.file_path, 2)
+        cache.put("e", "a1", "ssim", 1.0)
+        cache.put("e", "a2", "ssim", 1.0)
+        cache.get("e", "a1", "ssim")
+        cache.put("e", "a3", "ssim", 1.0)
+        self.assertEqual(2, cache.size())
+        self.assertIsNone(cache.get("e", "a2", "ssim"))
+        self.assertEqual(1.0, cache.get("e", "a1", "ssim"))
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
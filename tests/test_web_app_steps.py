@@ -3,23 +3,28 @@
 # SPDX-License-Identifier: MIT
 #
 
+import numpy as np
 import unittest
 import os
 import time
 
 from getgauge.python import data_store
+from selenium.common.exceptions import NoSuchFrameException
+from skimage import io
 from unittest.mock import Mock, call, patch
 
-from gauge_web_app_steps.app_context import app_context_key, timeout_key
+from gauge_web_app_steps.app_context import app_context_key, polling_key, timeout_key
+from gauge_web_app_steps.images import Images
 from gauge_web_app_steps.web_app_steps import (
-    answer_in_prompt,
+    answer_in_prompt, assert_whole_page_matches,
     assert_element_does_not_exist, assert_element_exists, assert_element_is_enabled,
-    before_step_hook,
+    after_suite_hook, before_step_hook,
     execute_async_script, execute_async_script_on_element, execute_async_script_on_element_save_result, execute_async_script_save_result,
     execute_script, execute_script_on_element, execute_script_on_element_save_result, execute_script_save_result,
-    reset_timeout, save_placeholder, save_window_handles, save_window_title, set_timeout, switch_to_frame,
+    reset_polling, reset_timeout, save_placeholder, save_window_handles, save_window_title, set_polling, set_timeout, switch_to_frame,
     wait_for_window
 )
+from tests import TEST_OUT_DIR, TEST_RESOURCES_DIR
 
 
 class TestWebAppSteps(unittest.TestCase):
@@ -45,6 +50,14 @@ class TestWebAppSteps(unittest.TestCase):
         before_step_hook(ctx)
         self.app_context.report.assert_has_calls([call.log(f"The step '{step_text}' is deprecated, please use '{new_step_text}'")])
 
+    @patch("gauge_web_app_steps.web_app_steps.evaluate_deferred_comparisons")
+    @patch("gauge_web_app_steps.web_app_steps.write_locator_telemetry")
+    @patch("gauge_web_app_steps.web_app_steps.SauceTunnel.terminate", side_effect=RuntimeError("tunnel"))
+    def test_after_suite_hook_reports_when_tunnel_fails(self, terminate, write_locator_telemetry, evaluate_deferred_comparisons):
+        self.assertRaises(RuntimeError, after_suite_hook)
+        write_locator_telemetry.assert_called_once()
+        evaluate_deferred_comparisons.assert_called_once()
+
     def test_answer_in_prompt(self):
         alert = Mock()
         self.app_context.driver.switch_to.alert = alert
@@ -137,10 +150,51 @@ class TestWebAppSteps(unittest.TestCase):
     def test_set_timeout_error(self):
         self.assertRaises(AssertionError, lambda: set_timeout("id"))
 
+    def test_set_polling(self):
+        set_polling("exponential")
+        self.assertEqual("exponential", data_store.scenario.get(polling_key))
+        reset_polling()
+        self.assertIsNone(data_store.scenario.get(polling_key))
+
+    def test_set_polling_error(self):
+        self.assertRaises(AssertionError, lambda: set_polling("sometimes"))
+
     def test_switch_to_frame_by_index(self):
         self.app_context.driver.find_elements.return_value=[]
         self.assertRaises(AssertionError, lambda: switch_to_frame("1"))
-        self.app_context.driver.assert_has_calls([call.find_elements('tag name', 'frame'), call.find_elements('tag name', 'iframe')])
+        self.app_context.driver.find_elements.assert_called_with('css selector', 'frame, iframe')
+
+    def test_switch_to_iframe_by_index(self):
+        iframe = Mock()
+        self.app_context.driver.find_elements.return_value = [iframe]
+        switch_to_frame("0")
+        self.app_context.driver.find_elements.assert_called_once_with('css selector', 'frame, iframe')
+        self.app_context.driver.switch_to.frame.assert_called_once_with(iframe)
+
+    def test_switch_to_frame_by_index_out_of_range(self):
+        self.app_context.driver.find_elements.return_value = [Mock()]
+        self.assertRaises(AssertionError, lambda: switch_to_frame("1"))
+        self.app_context.driver.switch_to.frame.assert_not_called()
+
+    def test_switch_to_frame_by_name_waits(self):
+        os.environ["driver_implicit_timeout"] = '1'
+        self.app_context.driver.switch_to.frame.side_effect = [NoSuchFrameException("loading"), None]
+        switch_to_frame("content")
+        self.assertEqual([call("content"), call("content")], self.app_context.driver.switch_to.frame.call_args_list)
+
+    @patch("gauge_web_app_steps.web_app_steps.is_full_page_screenshot_supported", return_value=True)
+    def test_assert_whole_page_matches_fails_on_shift(self, patched_full_page):
+        expected_file = os.path.join(TEST_RESOURCES_DIR, "expected_rgb.png")
+        shifted_file = os.path.join(TEST_OUT_DIR, "shifted_page.png")
+        os.makedirs(TEST_OUT_DIR, exist_ok=True)
+        io.imsave(shifted_file, np.roll(io.imread(expected_file), 1, axis=1), check_contrast=False)
+        self.app_context.images = Images(Mock())
+        def compare_shifted(image_file_name, tolerance, compare):
+            failed_asserts = []
+            compare(failed_asserts, expected_file, shifted_file, tolerance, None)
+            return failed_asserts
+        with patch("gauge_web_app_steps.web_app_steps.ssim_screenshot_noscrolling", side_effect=compare_shifted):
+            self.assertRaises(AssertionError, lambda: assert_whole_page_matches("page.png", "1.0"))
 
     def test_execute_script(self):
         execute_script("script")
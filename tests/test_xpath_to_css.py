@@ -0,0 +1,65 @@
+#
+# Copyright IBM Corp. 2019-
+# SPDX-License-Identifier: MIT
+#
+
+import unittest
+
+from parameterized import parameterized
+
+from gauge_web_app_steps.xpath_to_css import xpath_to_css
+
+
+class TestXpathToCss(unittest.TestCase):
+
+    @parameterized.expand([
+        ("//div", "div"),
+        ("//*", "*"),
+        ("//div/span", "div > span"),
+        ("//form//input", "form input"),
+        ("//div[@id='foo']", 'div[id="foo"]'),
+        ('//div[@data-test="foo"]', 'div[data-test="foo"]'),
+        ("//img[@src]", "img[src]"),
+        ("//div[contains(@class, 'foo')]", 'div[class*="foo"]'),
+        ("//div[starts-with(@id,'foo')]", 'div[id^="foo"]'),
+        ("//img[@src and @title='foo']", 'img[src][title="foo"]'),
+        ("//img[@src][@title='foo']", 'img[src][title="foo"]'),
+        ("//div[@id='foo']/span[@class='bar']//img", 'div[id="foo"] > span[class="bar"] img'),
+        ("  // div [ @id = 'foo' ] ", 'div[id="foo"]'),
+        ("//div[@title='say \"hi\"']", 'div[title="say \\"hi\\""]'),
+        ("//div[@title='C:\\temp']", 'div[title="C:\\\\temp"]'),
+    ])
+    def test_translates(self, xpath, css):
+        self.assertEqual(xpath_to_css(xpath), css)
+
+    @parameterized.expand([
+        ("/html/body",),
+        ("div/span",),
+        ("./div",),
+        ("//div[1]",),
+        ("//div[last()]",),
+        ("//div[text()='foo']",),
+        ("//div[contains(text(), 'foo')]",),
+        ("//div[@id='foo' or @id='bar']",),
+        ("//div[not(@id)]",),
+        ("//div/..",),
+        ("//div/following-sibling::span",),
+        ("//div | //span",),
+        ("//div[@id='foo'",),
+        ("//div/",),
+        ("//DIV",),
+        ("//div[@ID='foo']",),
+        ("//input[@type='text']",),
+        ("//link[@rel='next']",),
+        ("//svg",),
+        ("//a[@href='x']",),
+        ("//title",),
+        ("//div[contains(@class, '')]",),
+        ("//svg:rect",),
+    ])
+    def test_refuses(self, xpath):
+        self.assertIsNone(xpath_to_css(xpath))
+
+
+if __name__ == '__main__':
+    unittest.main()